@@ -5,9 +5,12 @@ API FEATURES - DJANGO ADMIN CONFIGURATION
 
 Django Admin interface configuration for the api_features application.
 
-CURRENT STATUS:
-No models are currently registered with Django Admin since the application
-uses in-memory and session-based data storage rather than database models.
+REGISTERED MODELS:
+  RoadmapCacheEntry  - Cached roadmap responses (read-mostly, for inspection)
+  AgentTask          - Background job status (agent runs, calendar syncs)
+  StoredRoadmap      - Generated roadmaps referenced by roadmap_id
+  OAuthCredential    - Per-owner Google credentials (token JSON hidden)
+  CalendarSync       - Roadmaps synced to calendars, with their event links
 
 FUTURE EXTENSIONS:
 When database models are added (see models.py), register them here to enable:
@@ -33,5 +36,51 @@ ACCESS: http://localhost:8000/admin/
 
 from django.contrib import admin
 
-# Register models here as the application grows
-# Models will appear in Django admin interface when registered
+from .models import (
+    AgentTask, CalendarEventLink, CalendarSync, OAuthCredential, RoadmapCacheEntry, StoredRoadmap
+)
+
+
+@admin.register(RoadmapCacheEntry)
+class RoadmapCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['skillset', 'interest', 'goal', 'hit_count', 'created_at', 'last_accessed']
+    search_fields = ['skillset', 'interest', 'goal']
+    readonly_fields = ['cache_key', 'created_at']
+
+
+@admin.register(AgentTask)
+class AgentTaskAdmin(admin.ModelAdmin):
+    list_display = ['task_id', 'kind', 'status', 'message', 'repo_url', 'created_at', 'updated_at']
+    search_fields = ['task_id', 'repo_url']
+    list_filter = ['kind', 'status']
+
+
+@admin.register(StoredRoadmap)
+class StoredRoadmapAdmin(admin.ModelAdmin):
+    list_display = ['roadmap_id', 'skillset', 'interest', 'goal', 'size', 'partial', 'created_at']
+    search_fields = ['roadmap_id', 'skillset', 'interest', 'goal']
+    list_filter = ['partial']
+    exclude = ['data']
+    readonly_fields = ['roadmap_id', 'profile_key', 'size', 'created_at']
+
+
+@admin.register(OAuthCredential)
+class OAuthCredentialAdmin(admin.ModelAdmin):
+    list_display = ['owner', 'expiry', 'version', 'updated_at']
+    search_fields = ['owner']
+    exclude = ['token_json']
+    readonly_fields = ['owner', 'expiry', 'version', 'refresh_lease_until', 'created_at', 'updated_at']
+
+
+class CalendarEventLinkInline(admin.TabularInline):
+    model = CalendarEventLink
+    extra = 0
+    readonly_fields = ['item_key', 'event_id', 'content_hash', 'updated_at']
+
+
+@admin.register(CalendarSync)
+class CalendarSyncAdmin(admin.ModelAdmin):
+    list_display = ['owner', 'roadmap_id', 'start_date', 'calendar_id', 'updated_at']
+    search_fields = ['owner', 'roadmap_id']
+    readonly_fields = ['owner', 'sync_key', 'created_at', 'updated_at']
+    inlines = [CalendarEventLinkInline]
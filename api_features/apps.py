@@ -42,6 +42,9 @@ from django.apps import AppConfig
 class ApiFeaturesConfig(AppConfig):
     # Application name used in INSTALLED_APPS
     name = 'api_features'
+
+    # Primary key type for models that don't declare one explicitly
+    default_auto_field = 'django.db.models.BigAutoField'
     
     # Human-readable application name (appears in admin interface)
     verbose_name = 'API Features - AI Learning & Repository Generation'
@@ -0,0 +1,212 @@
+"""
+================================================================================
+MALUM AI - ASYNC VIEWS MODULE
+================================================================================
+
+Native async counterparts of the main API views, for ASGI deployments.
+
+OVERVIEW:
+The synchronous views in views.py hold a worker thread for the entire Groq
+round trip. Under an ASGI server (uvicorn, daphne, hypercorn) these async
+views yield the event loop while waiting, so one worker process can keep
+hundreds of roadmap generations in flight.
+
+These views are meant to be served by MalumAI.asgi:application. They also
+work under WSGI, but then every request runs on its own short-lived loop.
+
+VIEWS:
+  generate_roadmap()     - Roadmap generation via AsyncGroq
+  run_agent_endpoint()   - Queues the agent run on views.agent_executor
+  run_agent_status()     - Reads the shared task store (services/task_store.py)
+  add_to_calendar()      - Queues a background calendar sync job
+
+WHAT IS ASYNC:
+Only the Groq round trip of generate_roadmap is awaited natively
+(AsyncScheduledGroq). The GitHub and Google Calendar calls deliberately stay
+synchronous, and no async HTTP client is used for them:
+  - Agent runs and calendar syncs outlive the request that started them, so
+    they run as background jobs on the bounded pools in views.py, never on
+    the request's event loop. Awaiting their HTTP calls would not free a
+    request worker, since none is held while they run
+  - run_agent_endpoint and add_to_calendar only validate the request and
+    queue the job, through the same helpers as the WSGI views
+    (views.start_agent_task, views.start_calendar_sync) wrapped in
+    sync_to_async: one bounded worker pool, one 429 when it is full, the
+    same agent_mode, LLM timeouts and progress_url
+  - run_agent_status is a single indexed read, also via sync_to_async
+An earlier httpx-based copy of the agent drifted from the sync one (no
+agent_mode, no timeouts, no queue bound) and was dropped for this reason.
+
+Prompts, parsing and error mapping are shared with views.py so both variants
+always produce identical results.
+
+================================================================================
+"""
+
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from . import views
+from .services import roadmap_cache, task_store
+from .services.providers import LazyProvider
+from .services.rate_limit import PRIORITY_INTERACTIVE, AsyncScheduledGroq
+
+# Share the per-key rate-limit scheduler with the sync client in views.py.
+# Built on first use, like the sync clients (services/providers.py).
+def _build_async_roadmap_client():
+    from groq import AsyncGroq
+    return AsyncScheduledGroq(
+        AsyncGroq(api_key=views.GROQ_API_KEY, base_url=views.GROQ_BASE_URL), views.GROQ_API_KEY,
+        priority=PRIORITY_INTERACTIVE, completion_estimate=4000, name='roadmap'
+    )
+
+
+async_roadmap_client = LazyProvider(_build_async_roadmap_client)
+
+
+def require_http_methods_async(methods):
+    """Async-aware replacement for django's require_http_methods (Django < 5)"""
+    def decorator(view):
+        @functools.wraps(view)
+        async def inner(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+        return inner
+    return decorator
+
+
+# ============================================================================
+# Roadmap Generation
+# ============================================================================
+
+@require_http_methods_async(["POST"])
+async def generate_roadmap(request):
+    """Async variant of views.generate_roadmap (same request and response shape)"""
+    try:
+        try:
+            data = json.loads(request.body)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': 'Invalid JSON body: ' + str(e)
+            }, status=400)
+
+        skillset = data.get('skillset', '').strip()
+        interest = data.get('interest', '').strip()
+        goal = data.get('goal', '').strip()
+
+        if not skillset or not interest:
+            return JsonResponse({
+                'success': False,
+                'error': 'Skillset and Interest fields are required'
+            }, status=400)
+
+        cached, flags = await sync_to_async(views.lookup_cached_roadmap)(skillset, interest, goal)
+        if cached is not None:
+            handle = await sync_to_async(views.roadmap_handle)(request, skillset, interest, goal, cached)
+            return JsonResponse({'success': True, 'data': cached, **flags, **handle})
+
+        prompt, max_tokens = views.roadmap_generation_params(skillset, interest, goal)
+        try:
+            response = await async_roadmap_client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[
+                    {"role": "system", "content": views.ROADMAP_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=max_tokens
+            )
+
+            gpt_response = response.choices[0].message.content
+            if not gpt_response:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Empty response from AI model'
+                }, status=500)
+
+            if response.choices[0].finish_reason == 'length' and views.ROADMAP_CONTINUATION:
+                print("Roadmap hit max_tokens, requesting a continuation")
+                continuation = await _continue_roadmap(prompt, gpt_response)
+                result = views.parse_truncated_roadmap(gpt_response, continuation)
+            else:
+                result = views.parse_roadmap_response(gpt_response)
+
+            if views.is_cacheable_roadmap(result):
+                await sync_to_async(roadmap_cache.store_roadmap)(skillset, interest, goal, result)
+
+            handle = await sync_to_async(views.roadmap_handle)(request, skillset, interest, goal, result)
+            return JsonResponse({'success': True, 'data': result, **handle})
+
+        except Exception as api_error:
+            error_msg, status = views.describe_api_error(api_error)
+            return JsonResponse({'success': False, 'error': error_msg}, status=status)
+
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Server error: {str(e)}'}, status=500)
+
+
+async def _continue_roadmap(prompt, partial):
+    """Async variant of views.continue_roadmap"""
+    try:
+        response = await async_roadmap_client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=views.roadmap_continuation_messages(prompt, partial),
+            temperature=0.2,
+            max_tokens=views.ROADMAP_CONTINUATION_TOKENS
+        )
+        return views.strip_continuation(response.choices[0].message.content or '', partial)
+    except Exception as e:
+        print(f"WARNING: Roadmap continuation failed: {str(e)}")
+        return ''
+
+
+# ============================================================================
+# GitHub Agent
+# ============================================================================
+
+@require_http_methods_async(["POST"])
+async def run_agent_endpoint(request):
+    """Async variant of views.run_agent_endpoint: queues the same background agent job"""
+    try:
+        try:
+            data = json.loads(request.body)
+        except Exception as e:
+            return JsonResponse({'success': False, 'error': f'Invalid JSON body: {str(e)}'}, status=400)
+
+        return await sync_to_async(views.start_agent_task)(
+            request, data, status_route='api_features:async_run_agent_status'
+        )
+
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Agent execution failed: {str(e)}'}, status=500)
+
+
+@require_http_methods_async(["GET"])
+async def run_agent_status(request, task_id):
+    """Poll the status of a background run_agent task"""
+    task = await sync_to_async(task_store.get_task)(task_id)
+    if not task:
+        return JsonResponse({'success': False, 'error': 'Invalid task id'}, status=404)
+    return JsonResponse({'success': True, 'task': task})
+
+
+# ============================================================================
+# Google Calendar Integration
+# ============================================================================
+
+@require_http_methods_async(["POST"])
+async def add_to_calendar(request):
+    """Async variant of views.add_to_calendar: queues the same background sync job"""
+    try:
+        data = json.loads(request.body)
+        # The credential lookup and OAuth branch use request.session, so keep
+        # the session on Django's thread-sensitive executor
+        return await sync_to_async(views.start_calendar_sync)(request, data)
+
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Server error: {str(e)}'}, status=500)
@@ -0,0 +1,33 @@
+"""
+================================================================================
+MANAGEMENT COMMAND - PRUNE AGENT TASKS
+================================================================================
+
+Deletes AgentTask rows that have not been updated within the TTL.
+
+USAGE:
+  python manage.py prune_tasks              # uses TASK_TTL (default 24h)
+  python manage.py prune_tasks --ttl 3600   # anything idle for over an hour
+
+Suitable for cron; the web processes also prune opportunistically.
+
+================================================================================
+"""
+
+from django.core.management.base import BaseCommand
+
+from api_features.services import task_store
+
+
+class Command(BaseCommand):
+    help = 'Delete background agent tasks older than the TTL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ttl', type=int, default=None,
+            help='Age in seconds after which a task is removed (default: TASK_TTL)'
+        )
+
+    def handle(self, *args, **options):
+        removed = task_store.prune_tasks(options['ttl'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} expired tasks'))
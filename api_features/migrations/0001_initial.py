@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:01
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoadmapCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('skillset', models.TextField()),
+                ('interest', models.TextField()),
+                ('goal', models.TextField(blank=True, default='')),
+                ('response_json', models.TextField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'roadmap cache entry',
+                'verbose_name_plural': 'roadmap cache entries',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_features', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.CharField(max_length=32, unique=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('in_progress', 'In progress'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('message', models.TextField(blank=True, default='')),
+                ('repo_url', models.URLField(blank=True, max_length=500, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='api_feature_status_b9a991_idx')],
+            },
+        ),
+    ]
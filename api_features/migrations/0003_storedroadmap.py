@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_features', '0002_agenttask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredRoadmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('roadmap_id', models.CharField(max_length=32, unique=True)),
+                ('profile_key', models.CharField(db_index=True, max_length=64)),
+                ('skillset', models.TextField()),
+                ('interest', models.TextField()),
+                ('goal', models.TextField(blank=True, default='')),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('partial', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'stored roadmap',
+            },
+        ),
+    ]
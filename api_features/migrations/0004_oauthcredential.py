@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_features', '0003_storedroadmap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OAuthCredential',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(max_length=80, unique=True)),
+                ('token_json', models.TextField()),
+                ('expiry', models.DateTimeField(blank=True, null=True)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('refresh_lease_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'OAuth credential',
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_features', '0004_oauthcredential'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarEventLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_key', models.CharField(max_length=120)),
+                ('event_id', models.CharField(max_length=1024)),
+                ('content_hash', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CalendarSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(max_length=80)),
+                ('sync_key', models.CharField(max_length=64)),
+                ('roadmap_id', models.CharField(blank=True, default='', max_length=32)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('calendar_id', models.CharField(default='primary', max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='calendarsync',
+            constraint=models.UniqueConstraint(fields=('owner', 'sync_key'), name='unique_calendar_sync'),
+        ),
+        migrations.AddField(
+            model_name='calendareventlink',
+            name='sync',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='links', to='api_features.calendarsync'),
+        ),
+        migrations.AddConstraint(
+            model_name='calendareventlink',
+            constraint=models.UniqueConstraint(fields=('sync', 'item_key'), name='unique_calendar_event_link'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_features', '0005_calendarsync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenttask',
+            name='kind',
+            field=models.CharField(choices=[('agent', 'Agent'), ('calendar', 'Calendar sync')], default='agent', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='payload',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='progress_done',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='progress_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
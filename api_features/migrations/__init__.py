@@ -40,8 +40,8 @@ REVERTING MIGRATIONS:
   python manage.py migrate api_features zero  # Remove all migrations
 
 CURRENT STATUS:
-No models are currently defined in models.py, so no migrations exist yet.
-When database models are added, migration files will be generated here.
+Migrations are generated from api_features/models.py. Run
+`python manage.py migrate` after pulling changes that add new files here.
 
 ================================================================================
 """
@@ -5,15 +5,25 @@ API FEATURES - DATABASE MODELS
 
 Django ORM Models for the api_features application.
 
-CURRENT STATUS:
-This module is currently not in use. All data is processed in-memory or
-stored as JSON in session/request data.
+CURRENT MODELS:
+  RoadmapCacheEntry  - Cached roadmap responses keyed by a normalized
+                       skillset/interest/goal profile (see
+                       services/roadmap_cache.py)
+  AgentTask          - Status and progress of background jobs (agent runs,
+                       calendar syncs), shared by every worker process
+                       (see services/task_store.py)
+  StoredRoadmap      - Generated roadmaps as compressed blobs, referenced
+                       by roadmap_id from the agent, calendar and results
+                       endpoints (see services/roadmap_store.py)
+  OAuthCredential    - Google Calendar credentials per user or browser
+                       session (see services/calendar_service.py)
+  CalendarSync       - A roadmap synced to one owner's calendar, and
+  CalendarEventLink    the Calendar event behind each roadmap item (see
+                       services/calendar_sync.py)
 
 FUTURE EXTENSIONS:
 Models might be added for:
   - User profiles and authentication
-  - Roadmap storage and history
-  - Calendar event tracking
   - GitHub repository metadata
   - AI prompt/response logging for analytics
 
@@ -24,7 +34,201 @@ Default database: SQLite (db.sqlite3)
 """
 
 from django.db import models
+from django.utils import timezone
 
-# Database models can be added here as the application grows
-# Models should represent persistent data that needs to be stored
 
+class RoadmapCacheEntry(models.Model):
+    """
+    A generated roadmap stored under the hash of its normalized profile.
+
+    FIELDS:
+      cache_key      - sha256 of the canonical profile (unique lookup key)
+      skillset/interest/goal - the normalized profile, kept for inspection
+      response_json  - the parsed roadmap exactly as returned to the client
+      hit_count      - number of times this entry was served from cache
+      last_accessed  - drives LRU-style eviction
+    """
+    cache_key = models.CharField(max_length=64, unique=True)
+    skillset = models.TextField()
+    interest = models.TextField()
+    goal = models.TextField(blank=True, default='')
+    response_json = models.TextField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = 'roadmap cache entry'
+        verbose_name_plural = 'roadmap cache entries'
+
+    def __str__(self):
+        return f"{self.skillset} / {self.interest} ({self.hit_count} hits)"
+
+
+class AgentTask(models.Model):
+    """
+    Progress record for a background job, polled via run_agent_status.
+
+    Lives in the database rather than process memory so that any web worker
+    can answer a status poll, whichever process is running the job.
+
+    FIELDS (besides status/message/error):
+      kind            - 'agent' (repository creation) or 'calendar' (sync)
+      payload         - job input, kept so a failed job can be resumed
+      result          - job output summary (e.g. calendar event counts)
+      progress_done   - units of work finished (calendar: events synced)
+      progress_total  - units of work planned, 0 when not tracked
+    """
+    KIND_AGENT = 'agent'
+    KIND_CALENDAR = 'calendar'
+    KIND_CHOICES = [
+        (KIND_AGENT, 'Agent'),
+        (KIND_CALENDAR, 'Calendar sync'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_IN_PROGRESS = 'in_progress'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_IN_PROGRESS, 'In progress'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    task_id = models.CharField(max_length=32, unique=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_AGENT)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    message = models.TextField(blank=True, default='')
+    repo_url = models.URLField(max_length=500, null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    payload = models.JSONField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Queue position lookups: queued tasks ordered by age
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} ({self.status})"
+
+
+class StoredRoadmap(models.Model):
+    """
+    A generated roadmap, stored once and referenced by its roadmap_id.
+
+    FIELDS:
+      roadmap_id   - content hash of the roadmap JSON, so serving the same
+                     (cached) roadmap twice reuses one row
+      profile_key  - roadmap_cache key of the profile it was generated for
+      skillset/interest/goal - the profile as submitted
+      data         - zlib-compressed JSON
+      size         - uncompressed JSON size in bytes
+      partial      - the roadmap was salvaged from a truncated response
+    """
+    roadmap_id = models.CharField(max_length=32, unique=True)
+    profile_key = models.CharField(max_length=64, db_index=True)
+    skillset = models.TextField()
+    interest = models.TextField()
+    goal = models.TextField(blank=True, default='')
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(default=0)
+    partial = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'stored roadmap'
+
+    def __str__(self):
+        return f"{self.roadmap_id} ({self.skillset} / {self.interest})"
+
+
+class OAuthCredential(models.Model):
+    """
+    Google OAuth credentials of one owner ("user:<pk>" or "session:<id>").
+
+    FIELDS:
+      token_json          - google-auth authorized-user JSON (access and
+                            refresh token, client id/secret, scopes)
+      expiry              - access token expiry (UTC)
+      version             - bumped on every write; a refresh only applies
+                            on top of the version it started from
+      refresh_lease_until - set while one process refreshes the token, so
+                            other processes wait for its result instead of
+                            refreshing too
+    """
+    owner = models.CharField(max_length=80, unique=True)
+    token_json = models.TextField()
+    expiry = models.DateTimeField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=1)
+    refresh_lease_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'OAuth credential'
+
+    def __str__(self):
+        return f"{self.owner} (v{self.version})"
+
+
+class CalendarSync(models.Model):
+    """
+    The roadmap last synced to an owner's calendar for one profile.
+
+    FIELDS:
+      owner        - credential owner (see OAuthCredential)
+      sync_key     - profile key of the roadmap, so a regenerated or edited
+                     roadmap for the same profile updates the same events
+      roadmap_id   - roadmap synced last ('' for roadmaps posted inline)
+      start_date   - start date used last; reused when a sync gives none
+      calendar_id  - target calendar
+    """
+    owner = models.CharField(max_length=80)
+    sync_key = models.CharField(max_length=64)
+    roadmap_id = models.CharField(max_length=32, blank=True, default='')
+    start_date = models.DateField(null=True, blank=True)
+    calendar_id = models.CharField(max_length=200, default='primary')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'sync_key'], name='unique_calendar_sync'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner} / {self.sync_key[:12]}"
+
+
+class CalendarEventLink(models.Model):
+    """
+    One Calendar event created for a roadmap item.
+
+    FIELDS:
+      item_key      - stable name of the roadmap item ("week-3",
+                      "day-3-2", "project-todo-api")
+      event_id      - Calendar event ID
+      content_hash  - hash of the event body last sent; a sync only patches
+                      events whose body changed
+    """
+    sync = models.ForeignKey(CalendarSync, on_delete=models.CASCADE, related_name='links')
+    item_key = models.CharField(max_length=120)
+    event_id = models.CharField(max_length=1024)
+    content_hash = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sync', 'item_key'], name='unique_calendar_event_link'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_key} -> {self.event_id}"
@@ -0,0 +1,224 @@
+"""
+================================================================================
+GOOGLE CALENDAR BATCH REQUESTS
+================================================================================
+
+Groups Calendar events.insert/patch/update/delete calls into batch HTTP
+requests.
+
+PURPOSE:
+A 12-week roadmap produces roughly 75+ events (weekly tasks, daily reminders
+and project milestones). Inserting them one by one costs one blocking HTTPS
+round trip each. The Calendar API accepts up to 50 calls per batch request,
+so the whole roadmap fits in two round trips.
+
+ERROR HANDLING:
+  - Every item gets its own callback, so failures are reported per event
+  - Only retryable failures (429, 5xx, rate-limit 403s, transport errors)
+    are retried, and only the failed items are resent
+  - Retries back off exponentially: CALENDAR_BATCH_BACKOFF * 2**(attempt-1)
+  - An insert that hits 409 (the event ID already exists, e.g. from an
+    earlier sync whose response was lost) is resent as an update; a patch
+    that hits 404/410 is resent as an insert; a delete of an event that is
+    already gone counts as done
+
+METRICS:
+Each batch request is timed as service 'calendar' with the caller's operation
+name ('batch_sync'); resent batches count as retries and
+every call ends up in malumai_calendar_events_total as created, updated,
+deleted or failed (services/metrics.py).
+
+CONFIGURATION:
+  CALENDAR_BATCH_SIZE      - Calls per batch request (max 50, default 50)
+  CALENDAR_BATCH_ATTEMPTS  - Total attempts per item (default 3)
+  CALENDAR_BATCH_BACKOFF   - Base retry delay in seconds (default 1.0)
+
+================================================================================
+"""
+
+import os
+import time
+
+from . import metrics
+
+CALENDAR_BATCH_SIZE = min(int(os.getenv('CALENDAR_BATCH_SIZE', '50')), 50)
+CALENDAR_BATCH_ATTEMPTS = int(os.getenv('CALENDAR_BATCH_ATTEMPTS', '3'))
+CALENDAR_BATCH_BACKOFF = float(os.getenv('CALENDAR_BATCH_BACKOFF', '1.0'))
+
+_OUTCOMES = {'insert': 'created', 'patch': 'updated', 'update': 'updated', 'delete': 'deleted'}
+
+_RETRYABLE_REASONS = ('ratelimitexceeded', 'userratelimitexceeded', 'quotaexceeded', 'backenderror')
+
+
+def is_retryable(error):
+    """Decide whether a failed batch item is worth resending"""
+    if error is None:
+        return False
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, HttpError):
+        status = getattr(error.resp, 'status', None)
+        if status in (429, 500, 502, 503, 504):
+            return True
+        if status == 403:
+            return any(reason in str(error).lower() for reason in _RETRYABLE_REASONS)
+        return False
+    # Socket/transport errors raised outside of an HTTP response
+    return True
+
+
+def _status(error):
+    return getattr(getattr(error, 'resp', None), 'status', None)
+
+
+def _describe(error):
+    return {'status': _status(error), 'error': str(error)}
+
+
+def _fallback(call, error):
+    """The call to resend instead when an error means the event is in another state"""
+    status = _status(error)
+    if call['method'] == 'insert' and status == 409 and call.get('event_id'):
+        # A cancelled event keeps its ID; update brings it back
+        return {**call, 'method': 'update', 'body': {**call['body'], 'status': 'confirmed'}}
+    if call['method'] in ('patch', 'update') and status in (404, 410):
+        return {**call, 'method': 'insert'}
+    return None
+
+
+def _request(events, call, calendar_id):
+    method = call['method']
+    if method == 'insert':
+        body = call['body']
+        if call.get('event_id'):
+            body = {**body, 'id': call['event_id']}
+        return events.insert(calendarId=calendar_id, body=body)
+    if method == 'delete':
+        return events.delete(calendarId=calendar_id, eventId=call['event_id'])
+    return getattr(events, method)(calendarId=calendar_id, eventId=call['event_id'], body=call['body'])
+
+
+def execute_batched(service, calls, calendar_id='primary', operation='batch',
+                    batch_size=None, max_attempts=None, on_batch=None):
+    """
+    Run Calendar event calls through batch requests.
+
+    PARAMETERS:
+      service      - Authorized Calendar v3 service
+      calls        - List of {'method': 'insert'|'patch'|'update'|'delete',
+                     'event_id': str (optional for insert), 'body': dict}
+      calendar_id  - Target calendar (default 'primary')
+      operation    - Operation label for metrics
+      on_batch     - Optional callback run after every batch request with
+                     [(index, method, response)] for the calls it completed
+
+    RETURNS:
+      dict: {
+        'responses': per call, the event resource ({} for deletes), or None
+                     where the call failed,
+        'methods':   per call, the method that finally ran,
+        'failed':    list of {'index', 'summary', 'status', 'error'},
+        'requests':  number of batch HTTP requests issued
+      }
+    """
+    batch_size = batch_size or CALENDAR_BATCH_SIZE
+    max_attempts = max_attempts or CALENDAR_BATCH_ATTEMPTS
+
+    calls = list(calls)
+    responses = [None] * len(calls)
+    errors = {}
+    pending = list(range(len(calls)))
+    requests_made = 0
+    fell_back = set()
+    events = service.events()
+
+    attempt = 0
+    backoff = False
+    while pending and attempt < max_attempts:
+        if backoff:
+            time.sleep(CALENDAR_BATCH_BACKOFF * (2 ** (attempt - 1)))
+            print(f"Retrying {len(pending)} calendar events (attempt {attempt + 1})")
+            metrics.upstream_retries.inc(service='calendar', operation=operation)
+
+        for offset in range(0, len(pending), batch_size):
+            chunk = pending[offset:offset + batch_size]
+
+            def _callback(request_id, response, exception):
+                idx = int(request_id)
+                if exception is not None:
+                    if calls[idx]['method'] == 'delete' and _status(exception) in (404, 410):
+                        errors.pop(idx, None)
+                        responses[idx] = {}
+                    else:
+                        errors[idx] = exception
+                else:
+                    errors.pop(idx, None)
+                    responses[idx] = response or {}
+
+            batch = service.new_batch_http_request(callback=_callback)
+            for idx in chunk:
+                batch.add(_request(events, calls[idx], calendar_id), request_id=str(idx))
+
+            started = time.perf_counter()
+            try:
+                batch.execute()
+                metrics.observe_upstream('calendar', operation, time.perf_counter() - started,
+                                         ok=not any(idx in errors for idx in chunk))
+            except Exception as batch_error:
+                metrics.observe_upstream('calendar', operation, time.perf_counter() - started, ok=False)
+                # The whole batch failed in transit: every item in it is pending
+                for idx in chunk:
+                    if responses[idx] is None:
+                        errors[idx] = batch_error
+            requests_made += 1
+
+            if on_batch is not None:
+                completed = [(idx, calls[idx]['method'], responses[idx])
+                             for idx in chunk if responses[idx] is not None]
+                if completed:
+                    on_batch(completed)
+
+        # Calls that hit a state conflict are resent right away in their
+        # other form; only genuinely retryable failures use up an attempt
+        retry, switched = [], []
+        for idx in pending:
+            if responses[idx] is not None:
+                continue
+            replacement = _fallback(calls[idx], errors.get(idx)) if idx not in fell_back else None
+            if replacement is not None:
+                calls[idx] = replacement
+                fell_back.add(idx)
+                switched.append(idx)
+            elif is_retryable(errors.get(idx)):
+                retry.append(idx)
+        pending = sorted(retry + switched)
+        backoff = bool(retry)
+        if retry or not switched:
+            attempt += 1
+
+    failed = []
+    for idx, response in enumerate(responses):
+        if response is None:
+            failed.append({
+                'index': idx,
+                'summary': (calls[idx].get('body') or {}).get('summary', ''),
+                **_describe(errors.get(idx, 'Unknown error')),
+            })
+
+    done = {}
+    for idx, response in enumerate(responses):
+        if response is not None:
+            outcome = _OUTCOMES[calls[idx]['method']]
+            done[outcome] = done.get(outcome, 0) + 1
+    for outcome, count in done.items():
+        metrics.calendar_events.inc(count, outcome=outcome)
+    if failed:
+        metrics.calendar_events.inc(len(failed), outcome='failed')
+
+    return {
+        'responses': responses,
+        'methods': [call['method'] for call in calls],
+        'failed': failed,
+        'requests': requests_made,
+    }
+
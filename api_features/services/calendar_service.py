@@ -0,0 +1,378 @@
+"""
+================================================================================
+CACHED GOOGLE CALENDAR SERVICES
+================================================================================
+
+Per-owner OAuth credentials and cached Calendar API service objects.
+
+PURPOSE:
+Every calendar request used to read and parse one shared token.json, so the
+deployment was effectively single-user and concurrent refreshes could
+clobber the file. Credentials now live in the OAuthCredential table, one row
+per owner, and stay in memory while their access token is valid.
+
+OWNERS:
+credential_owner(request) returns "user:<pk>" for signed-in users and
+"session:<id>" otherwise. The id is kept in the session rather than
+derived from the session key, so it survives key rotation on login. Calls
+without a request (management commands, benchmarks) use LOCAL_OWNER, which
+imports the legacy config/credentials/token.json once if it exists.
+
+WHAT IS CACHED:
+  - Discovery document: the calendar v3 document bundled with
+    google-api-python-client is loaded and parsed once per process
+    (CALENDAR_API_URL, if set, replaces its API root)
+  - Credentials: up to CALENDAR_CREDENTIAL_CACHE owners. A cached entry is
+    used without touching the database until its access token expires, and
+    is then re-read in case another process already refreshed it
+  - Services: one Resource per (credential identity, thread). httplib2
+    transports are not thread-safe, so each worker thread keeps and reuses its
+    own authorized transport instead of sharing one. A refreshed or
+    re-authorized credential is a new object and gets a new service, and
+    revoked credentials are never handed out, so no explicit invalidation
+    is needed
+
+SINGLE-FLIGHT REFRESH:
+  - In a process, the first thread needing a refresh performs it; concurrent
+    callers for the same owner wait for its result
+  - Across processes, the refresher first claims refresh_lease_until on the
+    row. Others poll the row until its version changes, so one refresh per
+    credential happens however many calendar syncs need it
+  - Tokens within CALENDAR_REFRESH_MARGIN seconds (default 300) of expiry
+    are refreshed in the background while the current one is still served
+  - A revoked refresh token (invalid_grant) deletes the row, so the next
+    request starts the OAuth flow again
+
+================================================================================
+"""
+
+import concurrent.futures
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api_features.models import OAuthCredential
+
+# The google-auth / googleapiclient imports are deferred to the functions that
+# use them: they are heavy and most processes never touch the calendar.
+
+CALENDAR_REFRESH_MARGIN = int(os.getenv('CALENDAR_REFRESH_MARGIN', '300'))
+CALENDAR_CREDENTIAL_CACHE = int(os.getenv('CALENDAR_CREDENTIAL_CACHE', '1000'))
+
+# Seconds a refresh lease is held, and the longest a caller waits for
+# another process's refresh before trying itself
+CALENDAR_REFRESH_LEASE = int(os.getenv('CALENDAR_REFRESH_LEASE', '30'))
+
+# Overrides the API root (e.g. http://127.0.0.1:8765/) for regular and batch
+# requests, so the calendar code can run against a local stand-in
+CALENDAR_API_URL = os.getenv('CALENDAR_API_URL')
+
+LOCAL_OWNER = 'local'
+
+_SESSION_KEY = 'calendar_owner'
+_LEASE_POLL = 0.2
+_MAX_THREAD_SERVICES = 64
+
+_lock = threading.RLock()
+_discovery_doc = None
+_credentials = OrderedDict()   # owner -> (version, Credentials)
+_flights = {}                  # owner -> Future of an in-progress refresh
+_local = threading.local()
+_background = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='calendar-refresh')
+
+
+def get_discovery_document():
+    """Return the bundled calendar v3 discovery document, parsed once"""
+    global _discovery_doc
+    if _discovery_doc is None:
+        with _lock:
+            if _discovery_doc is None:
+                from googleapiclient import discovery_cache
+                doc = json.loads(discovery_cache.get_static_doc('calendar', 'v3'))
+                if CALENDAR_API_URL:
+                    root = CALENDAR_API_URL.rstrip('/') + '/'
+                    doc['rootUrl'] = doc['mtlsRootUrl'] = root
+                    doc['baseUrl'] = root + doc['servicePath']
+                _discovery_doc = doc
+    return _discovery_doc
+
+
+def credential_identity(creds):
+    """Stable identity for a credential: the OAuth client plus its refresh token"""
+    material = f"{creds.client_id}:{creds.refresh_token or creds.token}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+def credential_owner(request):
+    """Owner key for the request's user, or for its browser session"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    owner_id = request.session.get(_SESSION_KEY)
+    if not owner_id:
+        owner_id = request.session[_SESSION_KEY] = uuid.uuid4().hex
+    return f"session:{owner_id}"
+
+
+# ----------------------------------------------------------------------------
+# Credential store
+# ----------------------------------------------------------------------------
+
+def _utc_naive(value):
+    """google-auth keeps expiry as a naive UTC datetime"""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _db_expiry(creds):
+    return creds.expiry.replace(tzinfo=datetime.timezone.utc) if creds.expiry else None
+
+
+def _from_row(token_json, scopes=None):
+    from google.oauth2.credentials import Credentials
+    return Credentials.from_authorized_user_info(json.loads(token_json), scopes)
+
+
+def _remember(owner, version, creds):
+    with _lock:
+        _credentials[owner] = (version, creds)
+        _credentials.move_to_end(owner)
+        while len(_credentials) > CALENDAR_CREDENTIAL_CACHE:
+            _credentials.popitem(last=False)
+
+
+def _forget(owner):
+    with _lock:
+        _credentials.pop(owner, None)
+
+
+def _load(owner):
+    """Read the owner's row into the cache; (version, creds) or None"""
+    row = OAuthCredential.objects.filter(owner=owner).values('version', 'token_json').first()
+    if row is None:
+        return None
+    creds = _from_row(row['token_json'])
+    _remember(owner, row['version'], creds)
+    return row['version'], creds
+
+
+def store_credentials(owner, creds):
+    """Save freshly authorized credentials for owner (replacing any old ones)"""
+    existing = OAuthCredential.objects.filter(owner=owner).values_list('token_json', flat=True).first()
+    if existing and not creds.refresh_token:
+        # Google omits the refresh token on re-consent; keep the one we have
+        from google.oauth2.credentials import Credentials
+        refresh_token = json.loads(existing).get('refresh_token')
+        if refresh_token:
+            creds = Credentials(
+                token=creds.token, refresh_token=refresh_token, token_uri=creds.token_uri,
+                client_id=creds.client_id, client_secret=creds.client_secret,
+                scopes=creds.scopes, expiry=creds.expiry
+            )
+
+    row, created = OAuthCredential.objects.get_or_create(
+        owner=owner,
+        defaults={'token_json': creds.to_json(), 'expiry': _db_expiry(creds)}
+    )
+    version = row.version
+    if not created:
+        OAuthCredential.objects.filter(owner=owner).update(
+            token_json=creds.to_json(), expiry=_db_expiry(creds),
+            version=F('version') + 1, refresh_lease_until=None, updated_at=timezone.now()
+        )
+        version = OAuthCredential.objects.filter(owner=owner).values_list('version', flat=True).first()
+    _remember(owner, version, creds)
+    return creds
+
+
+def delete_credentials(owner):
+    OAuthCredential.objects.filter(owner=owner).delete()
+    _forget(owner)
+
+
+def import_token_file(owner, token_path, scopes):
+    """
+    One-time import of a legacy token.json for owner.
+
+    RETURNS:
+      Credentials | None: None when the file does not exist or is unreadable
+    """
+    try:
+        from google.oauth2.credentials import Credentials
+        creds = Credentials.from_authorized_user_file(token_path, scopes)
+    except (OSError, ValueError):
+        return None
+    print(f"Imported calendar credentials from {token_path} for {owner}")
+    return store_credentials(owner, creds)
+
+
+def get_credentials(owner):
+    """
+    Valid credentials for owner, refreshing them if needed.
+
+    RETURNS:
+      Credentials | None: None when the owner has not authorized the
+                          calendar (or the authorization was revoked)
+    """
+    with _lock:
+        entry = _credentials.get(owner)
+        if entry is not None:
+            _credentials.move_to_end(owner)
+
+    if entry is None or not entry[1].valid:
+        # Expired in memory: another process may already have refreshed it
+        entry = _load(owner)
+        if entry is None:
+            return None
+
+    version, creds = entry
+    if not creds.valid:
+        if not creds.refresh_token:
+            return None
+        return refresh(owner, version)
+
+    if creds.refresh_token and creds.expiry:
+        remaining = (creds.expiry - _utc_naive(timezone.now())).total_seconds()
+        if remaining < CALENDAR_REFRESH_MARGIN:
+            _refresh_in_background(owner, version)
+    return creds
+
+
+# ----------------------------------------------------------------------------
+# Single-flight refresh
+# ----------------------------------------------------------------------------
+
+def refresh(owner, stale_version):
+    """
+    Refresh owner's credentials once, however many callers ask at once.
+
+    stale_version is the row version the caller found expired; if the cache
+    already holds something newer, that is returned without a refresh.
+
+    RETURNS:
+      Credentials | None: None if the row is gone or the grant was revoked
+    """
+    with _lock:
+        entry = _credentials.get(owner)
+        if entry is not None and entry[0] > stale_version and entry[1].valid:
+            return entry[1]
+        flight = _flights.get(owner)
+        leader = flight is None
+        if leader:
+            flight = _flights[owner] = concurrent.futures.Future()
+
+    if not leader:
+        return flight.result(timeout=CALENDAR_REFRESH_LEASE * 2)
+
+    try:
+        creds = _refresh_row(owner, stale_version)
+        flight.set_result(creds)
+        return creds
+    except BaseException as e:
+        flight.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _flights.pop(owner, None)
+
+
+def _refresh_row(owner, stale_version):
+    """Claim the refresh lease (or wait for the process holding it) and refresh"""
+    from google.auth.exceptions import RefreshError
+    from google.auth.transport.requests import Request
+
+    deadline = time.monotonic() + CALENDAR_REFRESH_LEASE
+    while True:
+        now = timezone.now()
+        claimed = OAuthCredential.objects.filter(owner=owner, version=stale_version).filter(
+            Q(refresh_lease_until__isnull=True) | Q(refresh_lease_until__lt=now)
+        ).update(refresh_lease_until=now + datetime.timedelta(seconds=CALENDAR_REFRESH_LEASE))
+        if claimed:
+            break
+
+        entry = _load(owner)
+        if entry is None:
+            return None
+        if entry[0] != stale_version:
+            # Another process refreshed (or the user re-authorized) meanwhile
+            if entry[1].valid or not entry[1].refresh_token:
+                return entry[1] if entry[1].valid else None
+            stale_version = entry[0]
+            continue
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'Timed out waiting for a calendar token refresh for {owner}')
+        time.sleep(_LEASE_POLL)
+
+    row = OAuthCredential.objects.filter(owner=owner).values('token_json').first()
+    if row is None:
+        return None
+    creds = _from_row(row['token_json'])
+    try:
+        creds.refresh(Request())
+    except RefreshError as e:
+        if 'invalid_grant' in str(e):
+            print(f"Calendar authorization for {owner} was revoked: {str(e)}")
+            delete_credentials(owner)
+            return None
+        OAuthCredential.objects.filter(owner=owner).update(refresh_lease_until=None)
+        raise
+    except Exception:
+        OAuthCredential.objects.filter(owner=owner).update(refresh_lease_until=None)
+        raise
+
+    OAuthCredential.objects.filter(owner=owner, version=stale_version).update(
+        token_json=creds.to_json(), expiry=_db_expiry(creds),
+        version=F('version') + 1, refresh_lease_until=None, updated_at=timezone.now()
+    )
+    _remember(owner, stale_version + 1, creds)
+    return creds
+
+
+def _refresh_in_background(owner, version):
+    """Refresh ahead of expiry without holding up the current request"""
+    with _lock:
+        if owner in _flights:
+            return
+
+    def _run():
+        try:
+            refresh(owner, version)
+            print(f"Calendar credentials for {owner} refreshed in background")
+        except Exception as e:
+            print(f"WARNING: Background calendar token refresh failed: {str(e)}")
+        finally:
+            from django.db import close_old_connections
+            close_old_connections()
+
+    _background.submit(_run)
+
+
+# ----------------------------------------------------------------------------
+# Service objects
+# ----------------------------------------------------------------------------
+
+def get_service(creds):
+    """Return a Calendar v3 service for creds, reusing this thread's instance"""
+    identity = credential_identity(creds)
+    services = getattr(_local, 'services', None)
+    if services is None or len(services) > _MAX_THREAD_SERVICES:
+        services = _local.services = {}
+
+    cached = services.get(identity)
+    if cached is None or cached[0] is not creds:
+        from googleapiclient.discovery import build_from_document
+        cached = (creds, build_from_document(get_discovery_document(), credentials=creds))
+        services[identity] = cached
+    return cached[1]
+
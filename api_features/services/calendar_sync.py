@@ -0,0 +1,190 @@
+"""
+================================================================================
+INCREMENTAL CALENDAR SYNC
+================================================================================
+
+Keeps an owner's Google Calendar in step with a roadmap by sending only the
+events that changed.
+
+PURPOSE:
+add_to_calendar used to insert every event (~75 for 12 weeks) on each call,
+so pressing the button twice doubled the calendar and changing one
+project's duration_weeks meant a full re-insert. Now every roadmap item has
+a stable item_key, and the Calendar event created for it is remembered in a
+CalendarEventLink together with a hash of the body that was sent.
+
+DIFF:
+  - item without a link         -> insert
+  - item whose body hash moved  -> patch
+  - link without an item        -> delete (the roadmap lost that item)
+  - everything else             -> nothing
+Re-syncing an unchanged roadmap issues no Calendar calls at all; the calls
+that are needed go out through services/calendar_batch.py. Links are saved
+after every batch request, so an interrupted sync resumes where it stopped
+when run again.
+
+IDEMPOTENCY:
+Inserts carry a deterministic event ID derived from (owner, sync_key,
+item_key). If an insert succeeded but its response (or the link write) was
+lost, the next sync's insert gets 409 and is resent as an update instead of
+creating a duplicate; two concurrent syncs converge the same way. IDs use
+the base32hex alphabet (a-v, 0-9) that the Calendar API requires.
+
+SYNC KEY:
+Links are grouped by (owner, sync_key) in a CalendarSync row. sync_key is the
+profile key of the roadmap (views.calendar_sync_key), so a regenerated or
+edited roadmap for the same profile replaces the earlier events instead of
+adding a second set, while unrelated roadmaps never touch each other's
+events. Inline roadmaps posted without a profile are keyed by content.
+The start date of the last sync is reused when the client sends none, so
+syncing again tomorrow does not shift every event by a day.
+
+================================================================================
+"""
+
+import base64
+import hashlib
+import json
+
+from django.db import transaction
+
+from api_features.models import CalendarEventLink, CalendarSync
+
+from .calendar_batch import execute_batched
+
+
+def event_id(owner, sync_key, item_key):
+    """Deterministic Calendar event ID (32 base32hex characters)"""
+    digest = hashlib.sha256(f"{owner}\x00{sync_key}\x00{item_key}".encode('utf-8')).digest()
+    return base64.b32hexencode(digest[:20]).decode('ascii').lower()
+
+
+def content_hash(body):
+    text = json.dumps(body, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def get_sync(owner, sync_key):
+    """
+    RETURNS:
+      CalendarSync | None: The owner's last sync for this key
+    """
+    return CalendarSync.objects.filter(owner=owner, sync_key=sync_key).first()
+
+
+def plan_sync(owner, sync_key, items, links):
+    """
+    Diff roadmap items against the stored links.
+
+    PARAMETERS:
+      items  - list of (item_key, event body)
+      links  - {item_key: CalendarEventLink}
+
+    RETURNS:
+      tuple: (calls for execute_batched, number of unchanged items)
+    """
+    calls = []
+    unchanged = 0
+    remaining = dict(links)
+
+    for item_key, body in items:
+        digest = content_hash(body)
+        link = remaining.pop(item_key, None)
+        if link is None:
+            calls.append({'method': 'insert', 'event_id': event_id(owner, sync_key, item_key),
+                          'body': body, 'item_key': item_key, 'hash': digest})
+        elif link.content_hash != digest:
+            calls.append({'method': 'patch', 'event_id': link.event_id,
+                          'body': body, 'item_key': item_key, 'hash': digest})
+        else:
+            unchanged += 1
+
+    for item_key, link in remaining.items():
+        calls.append({'method': 'delete', 'event_id': link.event_id, 'body': None, 'item_key': item_key})
+
+    return calls, unchanged
+
+
+def sync_events(service, owner, sync_key, items, roadmap_id='', start_date=None, calendar_id=None,
+                on_progress=None):
+    """
+    Bring the owner's calendar in line with items.
+
+    Links are written after every batch request, and only for calls that
+    succeeded. A sync that stops part way (failed items, a crash, revoked
+    credentials) can therefore simply be run again: the diff skips
+    everything already on the calendar.
+
+    PARAMETERS:
+      on_progress - Optional callback(done, total) after every batch, where
+                    done counts unchanged and successfully synced items
+
+    RETURNS:
+      dict: {
+        'inserted', 'updated', 'deleted', 'unchanged': counts,
+        'total':     calls planned plus unchanged items,
+        'event_ids': event IDs of every item now on the calendar,
+        'failed':    list of {'index', 'summary', 'status', 'error'},
+        'requests':  number of batch HTTP requests issued
+      }
+    """
+    sync, _ = CalendarSync.objects.get_or_create(
+        owner=owner, sync_key=sync_key,
+        defaults={'calendar_id': calendar_id or 'primary'}
+    )
+    calendar_id = calendar_id or sync.calendar_id
+    if calendar_id != sync.calendar_id:
+        # Events live in the old calendar; start over in the new one
+        sync.links.all().delete()
+    sync.roadmap_id = roadmap_id or ''
+    sync.calendar_id = calendar_id
+    if start_date is not None:
+        sync.start_date = start_date
+    sync.save(update_fields=['roadmap_id', 'calendar_id', 'start_date', 'updated_at'])
+
+    links = {link.item_key: link for link in sync.links.all()}
+    calls, unchanged = plan_sync(owner, sync_key, items, links)
+    total = len(calls) + unchanged
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+
+    def _record(completed):
+        upserts, removed = [], []
+        for idx, method, response in completed:
+            call = calls[idx]
+            if call['method'] == 'delete':
+                removed.append(call['item_key'])
+                counts['deleted'] += 1
+                continue
+            counts['inserted' if method == 'insert' else 'updated'] += 1
+            upserts.append(CalendarEventLink(
+                sync=sync, item_key=call['item_key'],
+                event_id=response.get('id') or call['event_id'], content_hash=call['hash']
+            ))
+
+        with transaction.atomic():
+            if removed:
+                sync.links.filter(item_key__in=removed).delete()
+            if upserts:
+                CalendarEventLink.objects.bulk_create(
+                    upserts, update_conflicts=True, unique_fields=['sync', 'item_key'],
+                    update_fields=['event_id', 'content_hash', 'updated_at']
+                )
+        if on_progress is not None:
+            on_progress(unchanged + sum(counts.values()), total)
+
+    if on_progress is not None:
+        on_progress(unchanged, total)
+    if calls:
+        result = execute_batched(service, calls, calendar_id=calendar_id, operation='batch_sync',
+                                 on_batch=_record)
+    else:
+        result = {'failed': [], 'requests': 0}
+
+    return {
+        **counts,
+        'unchanged': unchanged,
+        'total': total,
+        'event_ids': list(sync.links.values_list('event_id', flat=True)),
+        'failed': result['failed'],
+        'requests': result['requests'],
+    }
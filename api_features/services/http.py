@@ -0,0 +1,162 @@
+"""
+================================================================================
+POOLED HTTP SESSIONS
+================================================================================
+
+Shared keep-alive requests.Session for all GitHub API traffic.
+
+PURPOSE:
+The agent used module-level requests.post/put/get, so every GitHub call opened
+a new TCP + TLS connection to the API host. One shared Session keeps
+connections alive and reuses them across calls, threads and agent runs.
+
+THREAD SAFETY:
+The Session is created once per process under a lock. Connection pooling is
+handled by urllib3, whose pools are thread-safe. pool_block=True makes a
+thread wait for a free connection when GITHUB_POOL_SIZE are busy instead of
+opening (and then discarding) extra ones.
+
+RETRIES:
+Failed connection attempts are always retried: the request never reached
+GitHub. Idempotent methods (GET, PUT, DELETE, ...) are also retried on read
+errors and 429/500/502/503/504 responses, with exponential backoff and
+honouring Retry-After. POST and PATCH are not replayed once they may have
+been processed (a timed-out repository creation could be created twice);
+they are only retried on a 429/503 that carries Retry-After, which GitHub
+sends when it refused the request outright.
+
+METRICS:
+Every request is timed into services/metrics.py as service 'github' with
+a templated operation ('PUT /repos/{owner}/{repo}/contents/{path}'), and
+urllib3's retry history feeds the retry counter.
+
+CONFIGURATION:
+  GITHUB_POOL_SIZE      - Max pooled connections per host (default 10)
+  GITHUB_HTTP_RETRIES   - Retries per request (default 3)
+  GITHUB_HTTP_BACKOFF   - Backoff factor in seconds (default 0.5)
+
+================================================================================
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from . import metrics
+
+GITHUB_POOL_SIZE = int(os.getenv('GITHUB_POOL_SIZE', '10'))
+GITHUB_HTTP_RETRIES = int(os.getenv('GITHUB_HTTP_RETRIES', '3'))
+GITHUB_HTTP_BACKOFF = float(os.getenv('GITHUB_HTTP_BACKOFF', '0.5'))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = frozenset({'HEAD', 'GET', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'})
+# Statuses on which a POST/PATCH is retried, and only with Retry-After
+RETRY_AFTER_STATUSES = (429, 503)
+
+_lock = threading.Lock()
+_sessions = {}
+
+# GitHub path segments kept verbatim when templating a URL for metrics;
+# anything else after /repos/{owner}/{repo} is a name or sha
+_STATIC_SEGMENTS = {
+    'user', 'repos', 'git', 'trees', 'commits', 'ref', 'refs', 'heads', 'blobs',
+    'contents', 'branches', 'branch'
+}
+
+
+def endpoint_name(method, url):
+    """
+    Low-cardinality label for a GitHub request.
+
+    EXAMPLE:
+      endpoint_name('PUT', 'https://api.github.com/repos/me/app/contents/README.md')
+      -> 'PUT /repos/{owner}/{repo}/contents/{path}'
+    """
+    parts = [part for part in urlsplit(url).path.split('/') if part]
+    if len(parts) >= 3 and parts[0] == 'repos':
+        template = ['repos', '{owner}', '{repo}']
+        for part in parts[3:]:
+            if part not in _STATIC_SEGMENTS:
+                template.append('{path}' if template[-1] == 'contents' else '{name}')
+                break
+            template.append(part)
+        parts = template
+    return f"{method.upper()} /{'/'.join(parts)}"
+
+
+def _instrument(session, service):
+    """Time every request made through session into services/metrics.py"""
+    send = session.request
+
+    def timed_request(method, url, *args, **kwargs):
+        operation = endpoint_name(method, url)
+        started = time.perf_counter()
+        try:
+            response = send(method, url, *args, **kwargs)
+        except Exception:
+            metrics.observe_upstream(service, operation, time.perf_counter() - started, ok=False)
+            raise
+        metrics.observe_upstream(service, operation, time.perf_counter() - started,
+                                 ok=response.status_code < 400)
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', ())
+        if retries:
+            metrics.upstream_retries.inc(len(retries), service=service, operation=operation)
+        return response
+
+    session.request = timed_request
+    return session
+
+
+def _retry_class():
+    """urllib3 Retry that also retries refused (Retry-After) POST/PATCH requests"""
+    from urllib3.util.retry import Retry
+
+    class GitHubRetry(Retry):
+        def is_retry(self, method, status_code, has_retry_after=False):
+            if self._is_method_retryable(method):
+                return super().is_retry(method, status_code, has_retry_after)
+            return bool(self.total and has_retry_after and status_code in RETRY_AFTER_STATUSES)
+
+    return GitHubRetry
+
+
+def build_session(headers=None, pool_size=None, retries=None, backoff=None):
+    """Create a Session with a pooled, retrying adapter mounted for http(s)"""
+    # Deferred so importing views doesn't pull in requests/urllib3
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    retry = _retry_class()(
+        total=GITHUB_HTTP_RETRIES if retries is None else retries,
+        backoff_factor=GITHUB_HTTP_BACKOFF if backoff is None else backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,  # see RETRIES above
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    pool_size = pool_size or GITHUB_POOL_SIZE
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry, pool_block=True)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_session(name, headers=None):
+    """
+    Return the process-wide session registered under name, creating it on
+    first use with the given default headers.
+    """
+    session = _sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = _instrument(build_session(headers=headers), name)
+    return session
+
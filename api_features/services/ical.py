@@ -0,0 +1,179 @@
+"""
+================================================================================
+ICALENDAR (.ics) RENDERING
+================================================================================
+
+Renders roadmap events as an RFC 5545 calendar, for download or as a
+subscription feed.
+
+PURPOSE:
+Pushing a roadmap into Google Calendar needs an OAuth round trip and a batch
+of API calls. The same weekly, daily and project events can instead be
+rendered locally as text/calendar: a user imports the file or subscribes to
+its URL, and no Calendar API call is made at all.
+
+MAPPING:
+The input is the (item_key, event body) list from views.roadmap_event_items,
+i.e. exactly what the Calendar API sync would send:
+  - summary / description  -> SUMMARY / DESCRIPTION (escaped, folded)
+  - all-day start / end    -> DTSTART / DTEND;VALUE=DATE (an end on the
+                              start day becomes the next day; RFC 5545 end
+                              dates are exclusive)
+  - recurrence             -> RRULE lines as-is
+  - popup reminders        -> VALARM with ACTION:DISPLAY (email reminders
+                              need an attendee address and are left out)
+UIDs are "<item_key>-<feed id>@malumai", stable across renders, so
+subscribed clients update events in place instead of duplicating them.
+
+CACHE:
+Stored roadmaps never change, so a feed is fully determined by its feed id
+and parameters. feed_etag() derives the ETag from exactly those (plus
+FEED_VERSION), which lets the view answer conditional requests with 304
+before anything is rendered. Rendered documents are kept in a per-process
+LRU of ICS_CACHE_SIZE entries.
+
+Bump FEED_VERSION whenever the rendered output changes (event mapping,
+summaries, reminders) so subscribed clients fetch the new document.
+
+================================================================================
+"""
+
+import datetime
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+ICS_CACHE_SIZE = int(os.getenv('ICS_CACHE_SIZE', '128'))
+
+PRODID = '-//MalumAI//Learning Roadmap//EN'
+# Part of every ETag; bump when the rendered output changes
+FEED_VERSION = 1
+_MAX_LINE = 75
+
+_cache_lock = threading.Lock()
+_cache = OrderedDict()   # key -> rendered document
+
+
+def escape_text(value):
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)"""
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Fold a content line into chunks of at most 75 octets, never splitting a UTF-8 character"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= _MAX_LINE:
+        return line
+
+    parts = []
+    current, size = [], 0
+    limit = _MAX_LINE
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > limit:
+            parts.append(''.join(current))
+            current, size = [], 0
+            limit = _MAX_LINE - 1   # continuation lines start with a space
+        current.append(char)
+        size += width
+    parts.append(''.join(current))
+    return '\r\n '.join(parts)
+
+
+def _event_lines(item_key, event, feed_id, dtstamp):
+    start = datetime.date.fromisoformat(event['start']['date'])
+    end = datetime.date.fromisoformat(event['end']['date'])
+    if end <= start:
+        end = start + datetime.timedelta(days=1)
+
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{item_key}-{feed_id}@malumai',
+        f'DTSTAMP:{dtstamp}',
+        f'DTSTART;VALUE=DATE:{start.strftime("%Y%m%d")}',
+        f'DTEND;VALUE=DATE:{end.strftime("%Y%m%d")}',
+        f'SUMMARY:{escape_text(event.get("summary", ""))}',
+    ]
+    if event.get('description'):
+        lines.append(f'DESCRIPTION:{escape_text(event["description"])}')
+    lines.extend(event.get('recurrence') or [])
+    lines.append('TRANSP:TRANSPARENT')
+
+    for reminder in (event.get('reminders') or {}).get('overrides', []):
+        if reminder.get('method') != 'popup':
+            continue
+        lines.extend([
+            'BEGIN:VALARM',
+            'ACTION:DISPLAY',
+            f'DESCRIPTION:{escape_text(event.get("summary", "Reminder"))}',
+            f'TRIGGER:-PT{int(reminder.get("minutes", 0))}M',
+            'END:VALARM',
+        ])
+
+    lines.append('END:VEVENT')
+    return lines
+
+
+def render_calendar(items, feed_id, name, dtstamp=None):
+    """
+    Render (item_key, event body) pairs as an iCalendar document.
+
+    PARAMETERS:
+      items    - list of (item_key, Calendar event body)
+      feed_id  - stable ID of the feed, part of every UID
+      name     - calendar display name (X-WR-CALNAME)
+      dtstamp  - datetime stamped on every event; pass a fixed value (e.g.
+                 the roadmap's creation time) so renders are identical
+
+    RETURNS:
+      str: CRLF-delimited text/calendar document
+    """
+    stamp = (dtstamp or datetime.datetime.now(datetime.timezone.utc))
+    if stamp.tzinfo is not None:
+        stamp = stamp.astimezone(datetime.timezone.utc)
+    stamp = stamp.strftime('%Y%m%dT%H%M%SZ')
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+        'REFRESH-INTERVAL;VALUE=DURATION:P1D',
+        'X-PUBLISHED-TTL:P1D',
+    ]
+    for item_key, event in items:
+        lines.extend(_event_lines(item_key, event, feed_id, stamp))
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(fold(line) for line in lines) + '\r\n'
+
+
+def feed_etag(feed_id, start_date, recurring):
+    """ETag of a feed's document, computed without rendering it"""
+    material = f"{FEED_VERSION}:{feed_id}:{start_date.isoformat()}:{int(bool(recurring))}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+
+
+def cached_render(key, build):
+    """
+    Rendered document for key, built with build() on a miss.
+
+    RETURNS:
+      tuple: (document, was_cached)
+    """
+    with _cache_lock:
+        document = _cache.get(key)
+        if document is not None:
+            _cache.move_to_end(key)
+            return document, True
+
+    document = build()
+    with _cache_lock:
+        _cache[key] = document
+        _cache.move_to_end(key)
+        while len(_cache) > ICS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return document, False
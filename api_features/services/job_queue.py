@@ -0,0 +1,149 @@
+"""
+================================================================================
+BOUNDED BACKGROUND JOB EXECUTOR
+================================================================================
+
+Fixed-size worker pool with a bounded queue for long-running background jobs.
+
+PURPOSE:
+run_agent_endpoint used to start one daemon thread per request, so a burst of
+users meant an unbounded number of threads hitting Groq and GitHub at once.
+JobExecutor caps concurrency at a fixed number of workers and refuses new work
+quickly once its queue is full, keeping upstream load and memory predictable.
+
+BEHAVIOUR:
+  - Workers start lazily on the first submit()
+  - submit() raises QueueFull (with a retry_after estimate) instead of blocking
+  - Queue positions are not tracked here: task_store.get_task() computes them
+    from the task table, so every process reports the same position
+  - retry_after is derived from an exponential moving average of job run time
+  - An optional heartbeat(job_ids) callback is called every heartbeat_interval
+    seconds with the IDs of all queued and running jobs, so a job store can
+    tell jobs of a live process from those lost with a dead one
+
+USAGE:
+  executor = JobExecutor('agent', workers=4, queue_size=20)
+  try:
+      position = executor.submit(task_id, run_job, arg1, arg2)
+  except QueueFull as full:
+      ...  # respond 429 with Retry-After: full.retry_after
+
+================================================================================
+"""
+
+import math
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted to an executor whose queue is full"""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Job queue is full, retry in {retry_after} seconds')
+        self.retry_after = retry_after
+
+
+class JobExecutor:
+    """Run submitted callables on a fixed pool of worker threads"""
+
+    def __init__(self, name, workers, queue_size, default_duration=30.0, heartbeat=None, heartbeat_interval=15.0):
+        self.name = name
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.heartbeat = heartbeat
+        self.heartbeat_interval = heartbeat_interval
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._running = set()
+        self._threads = []
+        self._avg_duration = default_duration
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for idx in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f'{self.name}-worker-{idx + 1}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            if self.heartbeat is not None:
+                thread = threading.Thread(target=self._beat, name=f'{self.name}-heartbeat', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _beat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                job_ids = list(self._pending) + list(self._running)
+            if not job_ids:
+                continue
+            try:
+                self.heartbeat(job_ids)
+            except Exception as e:
+                print(f"WARNING: {self.name} heartbeat failed: {str(e)}")
+
+    def _worker(self):
+        while True:
+            job_id, fn, args, kwargs = self._queue.get()
+            with self._lock:
+                self._pending.pop(job_id, None)
+                self._running.add(job_id)
+            started = time.monotonic()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"ERROR: {self.name} job {job_id} raised: {str(e)}")
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._running.discard(job_id)
+                    self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
+                self._queue.task_done()
+
+    def retry_after(self):
+        """Estimated seconds until a queue slot frees up"""
+        with self._lock:
+            return max(1, math.ceil(self._avg_duration / self.workers))
+
+    def submit(self, job_id, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) for execution.
+
+        RETURNS:
+          int: 1-based queue position at submission time
+
+        RAISES:
+          QueueFull: If queue_size jobs are already waiting
+        """
+        self._ensure_workers()
+        with self._lock:
+            if len(self._pending) >= self.queue_size:
+                raise QueueFull(max(1, math.ceil(self._avg_duration / self.workers)))
+            self._pending[job_id] = True
+            position = len(self._pending)
+        try:
+            self._queue.put_nowait((job_id, fn, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                self._pending.pop(job_id, None)
+            raise QueueFull(self.retry_after())
+        return position
+
+    def stats(self):
+        """Snapshot of queue depth and worker utilization"""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'queued': len(self._pending),
+                'running': len(self._running),
+            }
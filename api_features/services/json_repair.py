@@ -0,0 +1,180 @@
+"""
+================================================================================
+TOLERANT ROADMAP JSON REPAIR
+================================================================================
+
+Recovers a usable JSON object from truncated or slightly malformed model
+output instead of discarding the whole generation.
+
+PURPOSE:
+When the roadmap model stops at max_tokens (finish_reason == 'length') or
+emits a stray character, json.loads fails and the roadmap used to be thrown
+away. repair_json() keeps every element that was completed before the damage.
+
+HOW IT WORKS:
+  1. Code fences and any prose before the first '{' are skipped, and
+     anything after the closing brace is ignored (raw_decode)
+  2. Trailing commas before '}' or ']' are removed (outside of strings)
+  3. A scanner records "safe cut points": positions right after a complete
+     element of the top-level object or of one of its direct children (for
+     a roadmap: a whole milestone, project or week)
+  4. On a decode error the text is cut at the last safe point before the
+     error, the open containers are closed, and decoding is retried
+
+Elements deeper than keep_depth are never cut in half: a partial milestone is
+dropped as a whole rather than kept with missing fields.
+
+USAGE:
+  obj, info = repair_json(text)
+  # obj is None if nothing could be salvaged
+  # info = {'repaired': bool, 'dropped_chars': int}
+
+================================================================================
+"""
+
+import json
+
+_CLOSERS = {'{': '}', '[': ']'}
+_MAX_PASSES = 8
+
+_decoder = json.JSONDecoder()
+
+
+def strip_code_fence(text):
+    """Remove a surrounding ```json ... ``` fence if present"""
+    cleaned = text.strip()
+    if cleaned.startswith('```json'):
+        cleaned = cleaned[7:]
+    elif cleaned.startswith('```'):
+        cleaned = cleaned[3:]
+    if cleaned.endswith('```'):
+        cleaned = cleaned[:-3]
+    return cleaned.strip()
+
+
+def strip_trailing_commas(text):
+    """Drop commas that directly precede a closing bracket, ignoring strings"""
+    out = []
+    in_string = escape = False
+    pending_comma = None
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if pending_comma is not None:
+            if char.isspace():
+                pending_comma.append(char)
+                continue
+            if char not in '}]':
+                out.append(',')
+            out.extend(pending_comma[1:])
+            pending_comma = None
+
+        if char == ',':
+            pending_comma = [',']
+            continue
+        if char == '"':
+            in_string = True
+        out.append(char)
+
+    if pending_comma is not None:
+        out.extend(pending_comma)
+    return ''.join(out)
+
+
+def _safe_cuts(text, keep_depth):
+    """
+    Scan text and return [(end, open_stack)] for every element boundary at
+    depth <= keep_depth. Cutting text at `end` and closing `open_stack`
+    yields a well-formed document.
+    """
+    cuts = []
+    stack = []
+    in_string = escape = False
+
+    for pos, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append(char)
+        elif char in '}]':
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                cuts.append((pos + 1, ''))
+                break
+            if len(stack) <= keep_depth:
+                cuts.append((pos + 1, ''.join(stack)))
+        elif char == ',' and 0 < len(stack) <= keep_depth:
+            cuts.append((pos, ''.join(stack)))
+
+    return cuts
+
+
+def _close(text, end, open_stack):
+    return text[:end].rstrip().rstrip(',') + ''.join(_CLOSERS[c] for c in reversed(open_stack))
+
+
+def repair_json(text, keep_depth=2):
+    """
+    Decode text as a JSON object, salvaging as much as possible.
+
+    RETURNS:
+      tuple: (dict | None, {'repaired': bool, 'dropped_chars': int})
+    """
+    info = {'repaired': False, 'dropped_chars': 0}
+    cleaned = strip_code_fence(text)
+    start = cleaned.find('{')
+    if start < 0:
+        return None, info
+    document = cleaned[start:]
+
+    try:
+        obj, _ = _decoder.raw_decode(document)
+        if isinstance(obj, dict):
+            return obj, info
+    except ValueError:
+        pass
+
+    info['repaired'] = True
+    document = strip_trailing_commas(document)
+    cuts = _safe_cuts(document, keep_depth)
+    original_length = len(document)
+    cut_at = None
+
+    for _ in range(_MAX_PASSES):
+        try:
+            obj, end = _decoder.raw_decode(document)
+        except json.JSONDecodeError as e:
+            usable = [cut for cut in cuts if cut[0] <= e.pos and cut[1]]
+            if not usable:
+                return None, info
+            cut_at, open_stack = usable[-1]
+            document = _close(document, cut_at, open_stack)
+            cuts = [cut for cut in cuts if cut[0] < cut_at]
+            continue
+
+        if not isinstance(obj, dict):
+            return None, info
+        info['dropped_chars'] = original_length - (end if cut_at is None else cut_at)
+        return obj, info
+
+    return None, info
@@ -0,0 +1,125 @@
+"""
+================================================================================
+INCREMENTAL ROADMAP JSON PARSER
+================================================================================
+
+Character-level parser that extracts complete array items from a roadmap
+JSON document while it is still being generated.
+
+PURPOSE:
+The streaming roadmap endpoint receives the model output a few tokens at a
+time. Instead of waiting for the closing brace, this parser watches the
+top-level "roadmap", "projects" and "weekly_schedule" arrays and yields each
+element as soon as its closing delimiter arrives.
+
+HOW IT WORKS:
+  - Leading noise (e.g. a ```json fence) is skipped until the first '{'
+  - A container stack plus string/escape flags track the position
+  - Keys of the top-level object are remembered as they complete
+  - Inside a watched array, each item's text span is sliced out when the
+    separating ',' or closing ']' is reached and decoded with json.loads
+
+USAGE:
+  parser = IncrementalJSONParser(['roadmap', 'projects'])
+  for chunk in stream:
+      for key, item in parser.feed(chunk):
+          ...
+  full_text = parser.text
+
+================================================================================
+"""
+
+import json
+
+
+class IncrementalJSONParser:
+    """Emit (key, item) pairs for elements of watched top-level arrays"""
+
+    def __init__(self, watched_keys):
+        self.watched_keys = set(watched_keys)
+        self.text = ''
+        self._pos = 0
+        self._started = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._expect_key = False
+        self._array_key = None
+        self._item_start = None
+
+    def feed(self, chunk):
+        """
+        Consume the next chunk of model output.
+
+        RETURNS:
+          list: (key, item) tuples for every item completed by this chunk
+        """
+        self.text += chunk
+        completed = []
+
+        while self._pos < len(self.text):
+            pos = self._pos
+            char = self.text[pos]
+            self._pos += 1
+
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._stack.append('{')
+                    self._expect_key = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._expect_key:
+                        try:
+                            self._last_key = json.loads(self.text[self._string_start:pos + 1])
+                        except ValueError:
+                            self._last_key = None
+                        self._expect_key = False
+                continue
+
+            in_watched_array = self._array_key is not None and len(self._stack) == 2
+
+            if in_watched_array and char in ',]':
+                self._emit_item(pos, completed)
+            elif in_watched_array and self._item_start is None and not char.isspace():
+                self._item_start = pos
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in '{[':
+                if len(self._stack) == 1 and char == '[' and self._last_key in self.watched_keys:
+                    self._array_key = self._last_key
+                    self._item_start = None
+                self._stack.append(char)
+            elif char in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if len(self._stack) == 1:
+                    self._array_key = None
+            elif char == ',' and len(self._stack) == 1:
+                self._expect_key = True
+
+        return completed
+
+    def _emit_item(self, end, completed):
+        """Decode the pending item span ending just before `end`"""
+        if self._item_start is None:
+            return
+        fragment = self.text[self._item_start:end].strip()
+        self._item_start = None
+        if not fragment:
+            return
+        try:
+            completed.append((self._array_key, json.loads(fragment)))
+        except ValueError:
+            pass
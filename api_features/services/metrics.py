@@ -0,0 +1,238 @@
+"""
+================================================================================
+IN-PROCESS METRICS (PROMETHEUS TEXT FORMAT)
+================================================================================
+
+Counters and histograms for upstream calls and agent stages, rendered in the
+Prometheus text exposition format by the /api/metrics/ view.
+
+PURPOSE:
+A slow repository creation could come from any of the agent's LLM steps, the
+GitHub calls or the calendar batch. Every Groq, GitHub and Calendar call and
+every run_agent stage now records its latency and outcome here, so the
+slow part shows up on a dashboard instead of in guesswork.
+
+METRICS:
+  malumai_upstream_request_seconds{service,operation,outcome}  histogram
+  malumai_upstream_retries_total{service,operation}            counter
+  malumai_llm_tokens_total{client,kind}                        counter
+  malumai_groq_queue_wait_seconds{client}                      histogram
+  malumai_agent_stage_seconds{stage,outcome}                   histogram
+  malumai_calendar_events_total{outcome}                       counter
+  plus gauges from registered collectors (cache, job queue, rate limits)
+
+Calendar event outcomes are created, updated, deleted and failed.
+
+OVERHEAD:
+Recording is a perf_counter() pair, a bisect over ~12 bucket bounds and one
+short lock per series; nothing is formatted until a scrape. Collectors only
+run at scrape time.
+
+No prometheus_client dependency: the text format is simple and this keeps
+the metrics per process (with several workers, scrape each one or aggregate
+in the collector).
+
+================================================================================
+"""
+
+import bisect
+import functools
+import math
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key)) + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        lines = []
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(float(series[-2]))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors, renders the exposition text"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, name, documentation, collect):
+        """
+        Register a scrape-time gauge family.
+        collect() returns {labels: {field: number}}, where labels is a tuple
+        of (label, value) pairs or None; each field becomes the gauge
+        {name}_{field}. Non-numeric fields are skipped.
+        """
+        with self._lock:
+            self._collectors.append((name, documentation, collect))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+
+        for name, documentation, collect in collectors:
+            try:
+                groups = collect()
+            except Exception as e:
+                print(f"WARNING: Metrics collector {name} failed: {str(e)}")
+                continue
+            families = {}
+            for labels, fields in groups.items():
+                labelnames = tuple(name for name, _ in labels) if labels else ()
+                key = tuple(str(value) for _, value in labels) if labels else ()
+                for field, value in fields.items():
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    families.setdefault(f"{name}_{field}", []).append(
+                        f"{name}_{field}{_format_labels(labelnames, key)} {_format_value(value)}"
+                    )
+            for family, samples in sorted(families.items()):
+                lines.append(f"# HELP {family} {documentation}")
+                lines.append(f"# TYPE {family} gauge")
+                lines.extend(samples)
+
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+upstream_seconds = REGISTRY.register(Histogram(
+    'malumai_upstream_request_seconds', 'Latency of calls to Groq, GitHub and Google Calendar',
+    ('service', 'operation', 'outcome')
+))
+upstream_retries = REGISTRY.register(Counter(
+    'malumai_upstream_retries_total', 'Retried upstream calls', ('service', 'operation')
+))
+llm_tokens = REGISTRY.register(Counter(
+    'malumai_llm_tokens_total', 'Groq tokens by client and kind (prompt/completion)', ('client', 'kind')
+))
+groq_queue_wait = REGISTRY.register(Histogram(
+    'malumai_groq_queue_wait_seconds', 'Time Groq calls waited for rate-limit budget', ('client',)
+))
+agent_stage_seconds = REGISTRY.register(Histogram(
+    'malumai_agent_stage_seconds', 'Latency of run_agent stages', ('stage', 'outcome'),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+))
+calendar_events = REGISTRY.register(Counter(
+    'malumai_calendar_events_total', 'Calendar events by outcome (created/updated/deleted/failed)', ('outcome',)
+))
+
+
+def observe_upstream(service, operation, seconds, ok=True):
+    upstream_seconds.observe(seconds, service=service, operation=operation, outcome='ok' if ok else 'error')
+
+
+def timed_stage(stage):
+    """
+    Decorator recording a function's latency as a run_agent stage.
+    A falsy return counts as an error.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = fn(*args, **kwargs)
+                outcome = 'ok' if result or result is None else 'error'
+                return result
+            finally:
+                agent_stage_seconds.observe(time.perf_counter() - started, stage=stage, outcome=outcome)
+        return inner
+    return decorator
+
+
+def render():
+    """Prometheus text exposition of every registered metric and collector"""
+    return REGISTRY.render()
@@ -0,0 +1,55 @@
+"""
+================================================================================
+LAZY CLIENT PROVIDERS
+================================================================================
+
+Deferred construction of expensive API clients.
+
+PURPOSE:
+Building a Groq client creates an httpx client and loads the TLS trust store,
+and importing groq pulls in a large pydantic type tree. Doing that at import
+time slowed every manage.py command, worker boot and autoreload cycle, even
+for processes that never generate a roadmap. A LazyProvider holds a factory
+and only runs it the first time the client is actually used.
+
+BEHAVIOUR:
+  - get() builds the instance once per process (thread-safe) and returns it
+  - Attribute access is forwarded, so a provider can stand in for the client
+    itself: roadmap_client.chat.completions.create(...) works unchanged
+
+USAGE:
+  def _build_client():
+      from groq import Groq   # deferred import
+      return Groq(api_key=KEY)
+
+  client = LazyProvider(_build_client)
+
+================================================================================
+"""
+
+import threading
+
+
+class LazyProvider:
+    """Build an object on first use and forward attribute access to it"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the instance, building it on the first call"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    def __getattr__(self, name):
+        # Private names are never forwarded (avoids recursion before __init__)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
@@ -0,0 +1,434 @@
+"""
+================================================================================
+GROQ RATE-LIMIT SCHEDULER
+================================================================================
+
+Process-wide pacing of Groq chat completions against per-key request and
+token budgets.
+
+PURPOSE:
+A Groq rate_limit error used to surface directly as an HTTP 429 from
+generate_roadmap or as a failed agent task. The scheduler sits in front of the
+Groq clients and waits for budget instead, so bursts are smoothed out and
+requests are only rejected once they have waited GROQ_MAX_WAIT seconds.
+
+BUDGETS (one scheduler per API key):
+  - Requests: token bucket of GROQ_RPM requests per minute
+  - Tokens:   token bucket of GROQ_TPM tokens per minute. A call reserves its
+    prompt size (chars / 4) plus its expected completion size; the
+    difference is refunded once response.usage is known
+  - Blocked until: set from Retry-After on a 429, or from
+    x-ratelimit-reset-requests when the daily request quota is used up
+
+RATE-LIMIT HEADERS:
+Every call goes through with_raw_response, so the x-ratelimit-* headers Groq
+returns correct the local view: limit-tokens resizes the token bucket and
+remaining-tokens caps it. This also keeps several processes roughly in step
+without sharing state, since each sees the server's remaining counts.
+
+PRIORITIES:
+Waiting calls are served lowest priority value first, then FIFO.
+Interactive roadmap calls (PRIORITY_INTERACTIVE) therefore go ahead of
+queued background agent calls (PRIORITY_BACKGROUND) on the same key.
+
+CONFIGURATION:
+  GROQ_RPM                - Requests per minute per key (default 30)
+  GROQ_TPM                - Tokens per minute per key (default 12000)
+  GROQ_MAX_WAIT           - Max seconds a call waits for budget (default 60)
+  GROQ_RATE_LIMIT_RETRIES - Retries after a Groq 429 (default 2)
+
+METRICS:
+Each call records its latency (upstream service 'groq', operation = client
+name), queue wait, 429 retries and prompt/completion tokens in
+services/metrics.py.
+
+USAGE:
+  client = ScheduledGroq(Groq(api_key=key), api_key=key,
+                         priority=PRIORITY_INTERACTIVE, completion_estimate=4000)
+  client.chat.completions.create(...)   # same interface as Groq
+
+================================================================================
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+
+from . import metrics
+
+GROQ_RPM = float(os.getenv('GROQ_RPM', '30'))
+GROQ_TPM = float(os.getenv('GROQ_TPM', '12000'))
+GROQ_MAX_WAIT = float(os.getenv('GROQ_MAX_WAIT', '60'))
+GROQ_RATE_LIMIT_RETRIES = int(os.getenv('GROQ_RATE_LIMIT_RETRIES', '2'))
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# How long a waiter that is not at the head of the queue sleeps between checks
+_QUEUE_RECHECK = 0.1
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_SCALE = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+_registry_lock = threading.Lock()
+_schedulers = {}
+
+
+class RateLimitWaitExceeded(Exception):
+    """Raised when a call could not get budget within GROQ_MAX_WAIT seconds"""
+
+    def __init__(self, retry_after):
+        self.retry_after = max(1, int(retry_after + 0.999))
+        super().__init__(f'Groq rate limit budget exhausted, retry in {self.retry_after} seconds')
+
+
+def parse_duration(value):
+    """Parse Groq reset durations such as '7.66s', '2m59.56s' or '120ms'"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SCALE[unit] for amount, unit in parts)
+
+
+def estimate_tokens(messages, completion_tokens):
+    """Rough token cost of a chat call: ~4 characters per prompt token"""
+    prompt_chars = sum(len(str(message.get('content') or '')) for message in messages)
+    return prompt_chars // 4 + completion_tokens
+
+
+class _Ticket:
+    __slots__ = ('priority', 'seq', 'tokens')
+
+    def __init__(self, priority, seq, tokens):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RateLimitScheduler:
+    """
+    Request and token buckets for one API key, served in priority order.
+
+    clock is the monotonic time source the buckets refill against (tests
+    pass a fake one).
+    """
+
+    def __init__(self, rpm=None, tpm=None, clock=time.monotonic):
+        self.rpm = rpm or GROQ_RPM
+        self.tpm = tpm or GROQ_TPM
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._requests = self.rpm
+        self._tokens = self.tpm
+        self._blocked_until = 0.0
+        self._clock = clock
+        self._updated = clock()
+        self.stats = {'granted': 0, 'waited': 0, 'rejected': 0, 'rate_limited': 0}
+
+    # -- bucket bookkeeping (caller holds self._cond) -------------------------
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _try_grant(self, ticket, now):
+        """Grant ticket if it is next in line and fits; else seconds to wait"""
+        self._refill(now)
+        if self._waiting[0] is not ticket:
+            return _QUEUE_RECHECK
+
+        tokens = min(ticket.tokens, self.tpm)
+        delay = max(0.0, self._blocked_until - now)
+        if self._requests < 1:
+            delay = max(delay, (1 - self._requests) * 60 / self.rpm)
+        if self._tokens < tokens:
+            delay = max(delay, (tokens - self._tokens) * 60 / self.tpm)
+        if delay > 0:
+            return delay
+
+        heapq.heappop(self._waiting)
+        self._requests -= 1
+        self._tokens -= tokens
+        ticket.tokens = tokens
+        self.stats['granted'] += 1
+        self._cond.notify_all()
+        return 0.0
+
+    def _enqueue(self, priority, tokens):
+        with self._cond:
+            ticket = _Ticket(priority, next(self._seq), tokens)
+            heapq.heappush(self._waiting, ticket)
+            return ticket
+
+    def _abandon(self, ticket, retry_after):
+        self._waiting.remove(ticket)
+        heapq.heapify(self._waiting)
+        self.stats['rejected'] += 1
+        self._cond.notify_all()
+        raise RateLimitWaitExceeded(retry_after)
+
+    # -- public API -----------------------------------------------------------
+
+    def acquire(self, tokens, priority=PRIORITY_BACKGROUND, max_wait=None):
+        """
+        Block until one request and `tokens` tokens are available.
+
+        RETURNS:
+          ticket to pass to release()
+
+        RAISES:
+          RateLimitWaitExceeded: If budget did not free up within max_wait
+        """
+        ticket = self._enqueue(priority, tokens)
+        deadline = self._clock() + (GROQ_MAX_WAIT if max_wait is None else max_wait)
+        waited = False
+        with self._cond:
+            while True:
+                now = self._clock()
+                delay = self._try_grant(ticket, now)
+                if not delay:
+                    self.stats['waited'] += waited
+                    return ticket
+                if now + delay > deadline and self._waiting[0] is ticket:
+                    self._abandon(ticket, delay)
+                if now >= deadline:
+                    self._abandon(ticket, delay)
+                waited = True
+                self._cond.wait(min(delay, max(deadline - now, 0.01)))
+
+    async def acquire_async(self, tokens, priority=PRIORITY_BACKGROUND, max_wait=None):
+        """acquire() for event loops: waits with asyncio.sleep instead of blocking"""
+        ticket = self._enqueue(priority, tokens)
+        deadline = self._clock() + (GROQ_MAX_WAIT if max_wait is None else max_wait)
+        waited = False
+        while True:
+            with self._cond:
+                now = self._clock()
+                delay = self._try_grant(ticket, now)
+                if not delay:
+                    self.stats['waited'] += waited
+                    return ticket
+                if (now + delay > deadline and self._waiting[0] is ticket) or now >= deadline:
+                    self._abandon(ticket, delay)
+            waited = True
+            await asyncio.sleep(min(delay, _QUEUE_RECHECK, max(deadline - now, 0.01)))
+
+    def release(self, ticket, used_tokens=None):
+        """
+        Settle a granted call. used_tokens refunds the unused part of the
+        reservation; None keeps the full estimate charged.
+        """
+        if used_tokens is None:
+            return
+        with self._cond:
+            self._refill(self._clock())
+            self._tokens = min(self.tpm, self._tokens + ticket.tokens - used_tokens)
+            self._cond.notify_all()
+
+    def observe(self, headers, rate_limited=False):
+        """Fold Groq's x-ratelimit-* / retry-after headers into the budget"""
+        if headers is None:
+            return
+        with self._cond:
+            now = self._clock()
+            self._refill(now)
+
+            limit_tokens = _number(headers.get('x-ratelimit-limit-tokens'))
+            if limit_tokens:
+                self.tpm = limit_tokens
+            remaining_tokens = _number(headers.get('x-ratelimit-remaining-tokens'))
+            if remaining_tokens is not None:
+                self._tokens = min(self._tokens, remaining_tokens)
+
+            # x-ratelimit-*-requests is Groq's daily request quota
+            if _number(headers.get('x-ratelimit-remaining-requests')) == 0:
+                reset = parse_duration(headers.get('x-ratelimit-reset-requests'))
+                if reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+            if rate_limited:
+                self.stats['rate_limited'] += 1
+                retry_after = parse_duration(headers.get('retry-after'))
+                if retry_after is None:
+                    retry_after = parse_duration(headers.get('x-ratelimit-reset-tokens')) or 1.0
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """Current budget levels and counters"""
+        with self._cond:
+            now = self._clock()
+            self._refill(now)
+            return {
+                'rpm': self.rpm,
+                'tpm': self.tpm,
+                'requests_available': round(self._requests, 2),
+                'tokens_available': round(self._tokens),
+                'blocked_for': round(max(0.0, self._blocked_until - now), 2),
+                'waiting': len(self._waiting),
+                **self.stats,
+            }
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_scheduler(api_key):
+    """Return the process-wide scheduler for api_key"""
+    key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    with _registry_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = RateLimitScheduler()
+        return scheduler
+
+
+def scheduler_stats():
+    """Snapshot of every scheduler, keyed by hashed API key"""
+    with _registry_lock:
+        schedulers = dict(_schedulers)
+    return {key: scheduler.snapshot() for key, scheduler in schedulers.items()}
+
+
+def _usage_tokens(response):
+    usage = getattr(response, 'usage', None)
+    return getattr(usage, 'total_tokens', None) if usage is not None else None
+
+
+def _record_call(owner, started, waited, ok, response=None):
+    """Feed one completed (or failed) Groq call into the metrics registry"""
+    metrics.observe_upstream('groq', owner.name, time.perf_counter() - started, ok=ok)
+    metrics.groq_queue_wait.observe(waited, client=owner.name)
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        metrics.llm_tokens.inc(getattr(usage, 'prompt_tokens', 0) or 0, client=owner.name, kind='prompt')
+        metrics.llm_tokens.inc(getattr(usage, 'completion_tokens', 0) or 0, client=owner.name, kind='completion')
+
+
+class _ScheduledCompletions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, **kwargs):
+        owner = self._owner
+        completions = owner._client.chat.completions
+        tokens = estimate_tokens(kwargs.get('messages', []), owner.completion_tokens(kwargs))
+        from groq import RateLimitError
+
+        for attempt in range(GROQ_RATE_LIMIT_RETRIES + 1):
+            queued = time.perf_counter()
+            ticket = owner.scheduler.acquire(tokens, priority=owner.priority)
+            started = time.perf_counter()
+            try:
+                raw = completions.with_raw_response.create(**kwargs)
+            except RateLimitError as e:
+                owner.scheduler.release(ticket, 0)
+                owner.scheduler.observe(e.response.headers, rate_limited=True)
+                _record_call(owner, started, started - queued, ok=False)
+                if attempt == GROQ_RATE_LIMIT_RETRIES:
+                    raise
+                metrics.upstream_retries.inc(service='groq', operation=owner.name)
+                print(f"Groq rate limit hit, rescheduling (attempt {attempt + 1})")
+                continue
+            except Exception:
+                owner.scheduler.release(ticket, 0)
+                _record_call(owner, started, started - queued, ok=False)
+                raise
+
+            owner.scheduler.observe(raw.headers)
+            response = raw.parse()
+            owner.scheduler.release(ticket, _usage_tokens(response))
+            _record_call(owner, started, started - queued, ok=True, response=response)
+            return response
+
+
+class _AsyncScheduledCompletions(_ScheduledCompletions):
+    async def create(self, **kwargs):
+        owner = self._owner
+        completions = owner._client.chat.completions
+        tokens = estimate_tokens(kwargs.get('messages', []), owner.completion_tokens(kwargs))
+        from groq import RateLimitError
+
+        for attempt in range(GROQ_RATE_LIMIT_RETRIES + 1):
+            queued = time.perf_counter()
+            ticket = await owner.scheduler.acquire_async(tokens, priority=owner.priority)
+            started = time.perf_counter()
+            try:
+                raw = await completions.with_raw_response.create(**kwargs)
+            except RateLimitError as e:
+                owner.scheduler.release(ticket, 0)
+                owner.scheduler.observe(e.response.headers, rate_limited=True)
+                _record_call(owner, started, started - queued, ok=False)
+                if attempt == GROQ_RATE_LIMIT_RETRIES:
+                    raise
+                metrics.upstream_retries.inc(service='groq', operation=owner.name)
+                print(f"Groq rate limit hit, rescheduling (attempt {attempt + 1})")
+                continue
+            except Exception:
+                owner.scheduler.release(ticket, 0)
+                _record_call(owner, started, started - queued, ok=False)
+                raise
+
+            owner.scheduler.observe(raw.headers)
+            response = await raw.parse()
+            owner.scheduler.release(ticket, _usage_tokens(response))
+            _record_call(owner, started, started - queued, ok=True, response=response)
+            return response
+
+
+class _Chat:
+    def __init__(self, completions):
+        self.completions = completions
+
+
+class ScheduledGroq:
+    """
+    Drop-in wrapper exposing client.chat.completions.create() with every call
+    paced by the API key's RateLimitScheduler.
+
+    completion_estimate is the expected completion size used for the token
+    reservation (capped by the call's max_tokens). name labels the client's
+    metrics ('roadmap', 'agent').
+    """
+
+    _completions_class = _ScheduledCompletions
+
+    def __init__(self, client, api_key, priority=PRIORITY_BACKGROUND, completion_estimate=1024, name='groq'):
+        self._client = client
+        self.name = name
+        self.scheduler = get_scheduler(api_key)
+        self.priority = priority
+        self.completion_estimate = completion_estimate
+        self.chat = _Chat(self._completions_class(self))
+
+    def completion_tokens(self, kwargs):
+        max_tokens = kwargs.get('max_tokens') or kwargs.get('max_completion_tokens')
+        return min(self.completion_estimate, max_tokens) if max_tokens else self.completion_estimate
+
+
+class AsyncScheduledGroq(ScheduledGroq):
+    """ScheduledGroq for AsyncGroq clients (create() is a coroutine)"""
+
+    _completions_class = _AsyncScheduledCompletions
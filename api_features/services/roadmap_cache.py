@@ -0,0 +1,266 @@
+"""
+================================================================================
+ROADMAP RESPONSE CACHE
+================================================================================
+
+Persistent, normalized cache in front of the roadmap LLM completion.
+
+PURPOSE:
+generate_roadmap() pays a full llama-3.3-70b-versatile completion for every
+request. Users frequently submit the same profile with cosmetic differences
+("Python, Django" vs "django,  python"), so responses are cached in SQLite
+under a key derived from the canonicalized profile.
+
+NORMALIZATION:
+  - Lowercase, collapse whitespace
+  - Skillset is split on commas/semicolons, de-duplicated and sorted
+  - An empty goal and the front-end default "General learning" are equal
+
+POLICY:
+  ROADMAP_CACHE_TTL          - Seconds an entry stays valid (default 7 days)
+  ROADMAP_CACHE_MAX_ENTRIES  - Entries kept before LRU eviction (default 1000)
+
+Eviction removes expired rows first, then the least recently accessed rows
+until the table is back under ROADMAP_CACHE_MAX_ENTRIES.
+
+NEAR-DUPLICATE PROFILES:
+After an exact miss, get_similar_roadmap() asks an in-memory MinHash/LSH
+index over the stored profiles (services/similarity_index.py) for the
+closest one. Its roadmap is served when the token Jaccard similarity is at
+least ROADMAP_SIMILARITY_THRESHOLD. Each process builds the index from the
+table on first use and picks up rows stored by other processes every
+ROADMAP_SIMILARITY_REFRESH seconds (the initial build costs about 0.2 ms
+per stored row); evicted rows drop out when a lookup finds them gone.
+
+  ROADMAP_SIMILARITY_THRESHOLD  - Minimum similarity to reuse (default 0.8,
+                                  0 disables near-duplicate reuse)
+  ROADMAP_SIMILARITY_REFRESH    - Seconds between index refreshes (default 30)
+
+COUNTERS:
+Hits and misses are counted per process (similar_hits separately);
+cache_stats() returns them along with the current number of stored entries.
+
+FAILURE MODE:
+The cache is an optimization only. Any database error is logged and treated
+as a miss so roadmap generation keeps working without the table.
+
+================================================================================
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from api_features.models import RoadmapCacheEntry
+
+from .similarity_index import SimilarityIndex, profile_tokens
+
+ROADMAP_CACHE_TTL = int(os.getenv('ROADMAP_CACHE_TTL', str(7 * 24 * 60 * 60)))
+ROADMAP_CACHE_MAX_ENTRIES = int(os.getenv('ROADMAP_CACHE_MAX_ENTRIES', '1000'))
+ROADMAP_SIMILARITY_THRESHOLD = float(os.getenv('ROADMAP_SIMILARITY_THRESHOLD', '0.8'))
+ROADMAP_SIMILARITY_REFRESH = float(os.getenv('ROADMAP_SIMILARITY_REFRESH', '30'))
+
+# Bump whenever the roadmap prompt or response schema changes so stale
+# answers are not served (2: compact schema and plan-sized prompt)
+CACHE_VERSION = 2
+
+_DEFAULT_GOALS = {'', 'general learning', 'general learning and skill development'}
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'similar_hits': 0, 'stores': 0, 'evictions': 0}
+
+_index = SimilarityIndex()
+_index_lock = threading.Lock()
+_index_state = {'max_pk': 0, 'refreshed': None}
+
+
+def _clean(text):
+    """Lowercase and collapse runs of whitespace"""
+    return re.sub(r'\s+', ' ', (text or '').strip().lower())
+
+
+def normalize_profile(skillset, interest, goal):
+    """
+    Canonicalize a user profile so equivalent inputs share a cache entry.
+
+    RETURNS:
+      tuple: (skillset, interest, goal) normalized strings
+    """
+    skills = sorted({_clean(s) for s in re.split(r'[,;\n]', skillset or '') if _clean(s)})
+    goal = _clean(goal)
+    if goal in _DEFAULT_GOALS:
+        goal = ''
+    return ', '.join(skills), _clean(interest), goal
+
+
+def make_cache_key(skillset, interest, goal):
+    """Hash the normalized profile into a fixed-length cache key"""
+    profile = normalize_profile(skillset, interest, goal)
+    payload = json.dumps([CACHE_VERSION, *profile], separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _bump(counter, amount=1):
+    with _stats_lock:
+        _stats[counter] += amount
+
+
+def _load_entry(key):
+    """
+    Fetch and touch a live entry.
+
+    RETURNS:
+      dict | None: The stored roadmap, or None if missing or expired
+    """
+    entry = RoadmapCacheEntry.objects.filter(cache_key=key).first()
+    if entry is None:
+        return None
+
+    now = timezone.now()
+    if entry.created_at < now - timedelta(seconds=ROADMAP_CACHE_TTL):
+        entry.delete()
+        _bump('evictions')
+        return None
+
+    RoadmapCacheEntry.objects.filter(pk=entry.pk).update(
+        hit_count=F('hit_count') + 1,
+        last_accessed=now
+    )
+    return json.loads(entry.response_json)
+
+
+def get_cached_roadmap(skillset, interest, goal):
+    """
+    Look up a cached roadmap for this profile.
+
+    RETURNS:
+      dict | None: The stored roadmap, or None on miss/expiry/error
+    """
+    key = make_cache_key(skillset, interest, goal)
+    try:
+        roadmap = _load_entry(key)
+    except Exception as e:
+        print(f"WARNING: Roadmap cache lookup failed: {str(e)}")
+        roadmap = None
+    _bump('hits' if roadmap is not None else 'misses')
+    return roadmap
+
+
+def _refresh_index():
+    """Load rows stored since the last refresh (all rows on first use)"""
+    now = time.monotonic()
+    refreshed = _index_state['refreshed']
+    if refreshed is not None and now - refreshed < ROADMAP_SIMILARITY_REFRESH:
+        return
+    with _index_lock:
+        if _index_state['refreshed'] is not None and now - _index_state['refreshed'] < ROADMAP_SIMILARITY_REFRESH:
+            return
+        rows = RoadmapCacheEntry.objects.filter(pk__gt=_index_state['max_pk']).values_list(
+            'pk', 'cache_key', 'skillset', 'interest', 'goal'
+        ).iterator()
+        for pk, key, skillset, interest, goal in rows:
+            # Rows from an older CACHE_VERSION hash to a different key; they
+            # are never served and age out through eviction
+            if key == make_cache_key(skillset, interest, goal):
+                _index.add(key, profile_tokens(skillset, interest, goal))
+            _index_state['max_pk'] = max(_index_state['max_pk'], pk)
+        _index_state['refreshed'] = now
+
+
+def get_similar_roadmap(skillset, interest, goal):
+    """
+    Serve the roadmap of the most similar stored profile (call after an
+    exact miss).
+
+    RETURNS:
+      tuple | None: (roadmap, similarity), or None if no profile is close enough
+    """
+    if ROADMAP_SIMILARITY_THRESHOLD <= 0:
+        return None
+    try:
+        _refresh_index()
+        tokens = profile_tokens(*normalize_profile(skillset, interest, goal))
+        exclude = make_cache_key(skillset, interest, goal)
+        # A match may have been evicted since it was indexed; try the next best
+        for _ in range(3):
+            match = _index.query(tokens, ROADMAP_SIMILARITY_THRESHOLD, exclude=exclude)
+            if match is None:
+                return None
+            key, similarity = match
+            roadmap = _load_entry(key)
+            if roadmap is not None:
+                _bump('similar_hits')
+                return roadmap, round(similarity, 3)
+            _index.remove(key)
+    except Exception as e:
+        print(f"WARNING: Roadmap similarity lookup failed: {str(e)}")
+    return None
+
+
+def store_roadmap(skillset, interest, goal, roadmap):
+    """Persist a successfully parsed roadmap and enforce the size limit"""
+    key = make_cache_key(skillset, interest, goal)
+    norm_skillset, norm_interest, norm_goal = normalize_profile(skillset, interest, goal)
+    try:
+        RoadmapCacheEntry.objects.update_or_create(
+            cache_key=key,
+            defaults={
+                'skillset': norm_skillset,
+                'interest': norm_interest,
+                'goal': norm_goal,
+                'response_json': json.dumps(roadmap),
+                'hit_count': 0,
+                'created_at': timezone.now(),
+                'last_accessed': timezone.now(),
+            }
+        )
+        _bump('stores')
+        if _index_state['refreshed'] is not None:
+            _index.add(key, profile_tokens(norm_skillset, norm_interest, norm_goal))
+        evict_entries()
+    except Exception as e:
+        print(f"WARNING: Roadmap cache store failed: {str(e)}")
+
+
+def evict_entries():
+    """
+    Drop expired entries, then the least recently used ones over the limit.
+
+    RETURNS:
+      int: Number of rows removed
+    """
+    cutoff = timezone.now() - timedelta(seconds=ROADMAP_CACHE_TTL)
+    removed, _ = RoadmapCacheEntry.objects.filter(created_at__lt=cutoff).delete()
+
+    overflow = RoadmapCacheEntry.objects.count() - ROADMAP_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale_ids = list(
+            RoadmapCacheEntry.objects.order_by('last_accessed').values_list('pk', flat=True)[:overflow]
+        )
+        extra, _ = RoadmapCacheEntry.objects.filter(pk__in=stale_ids).delete()
+        removed += extra
+
+    if removed:
+        _bump('evictions', removed)
+    return removed
+
+
+def cache_stats():
+    """Return process-level hit/miss counters plus the stored entry count"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['indexed'] = len(_index)
+    try:
+        stats['entries'] = RoadmapCacheEntry.objects.count()
+    except Exception:
+        stats['entries'] = None
+    return stats
@@ -0,0 +1,188 @@
+"""
+================================================================================
+COMPACT ROADMAP SCHEMA & OUTPUT BUDGET
+================================================================================
+
+Short-key roadmap schema for generation, expanded server-side into the
+response shape index.html and the calendar code already consume.
+
+PURPOSE:
+Output tokens dominate Groq latency. The full schema spends a large share of
+them on repeated key names ("weekly_schedule", "duration_weeks", ...) and on
+free-form resource descriptions. The compact schema asks for the same
+content with short keys and enumerated fields, and max_tokens is sized from
+the plan instead of a fixed 8000.
+
+COMPACT SCHEMA:
+  {
+    "s":  "summary",
+    "m":  ["milestone", ...],
+    "p":  [{"n": name, "d": description, "w": weeks, "t": [tech, ...]}, ...],
+    "ws": [["task", "task"], ...],          # one entry per week, in order
+    "r":  [["name", "doc|course|book|video|tool|community"], ...]
+  }
+
+EXPANDED SHAPE (unchanged API response):
+  summary, roadmap (strings), projects (name, description, duration_weeks,
+  tech_stack), weekly_schedule ({week, tasks}), resources ({name, type})
+
+PLAN SIZE & BUDGET:
+plan_size() picks milestone and project counts from a rough goal-complexity
+score (keywords such as "advanced" or "machine learning", long goals).
+token_budget() adds up per-item output estimates for the chosen schema, adds
+ROADMAP_BUDGET_MARGIN and clamps to ROADMAP_MIN_TOKENS..ROADMAP_MAX_TOKENS.
+A budget that turns out too small is caught by the continuation request in
+views.generate_roadmap.
+
+CONFIGURATION:
+  ROADMAP_WEEKS          - Weeks in the schedule (default 12)
+  ROADMAP_BUDGET_MARGIN  - Safety factor on the estimate (default 1.5)
+  ROADMAP_MIN_TOKENS     - Lower bound for max_tokens (default 1500)
+  ROADMAP_MAX_TOKENS     - Upper bound for max_tokens (default 8000)
+
+================================================================================
+"""
+
+import os
+
+ROADMAP_WEEKS = int(os.getenv('ROADMAP_WEEKS', '12'))
+ROADMAP_BUDGET_MARGIN = float(os.getenv('ROADMAP_BUDGET_MARGIN', '1.5'))
+ROADMAP_MIN_TOKENS = int(os.getenv('ROADMAP_MIN_TOKENS', '1500'))
+ROADMAP_MAX_TOKENS = int(os.getenv('ROADMAP_MAX_TOKENS', '8000'))
+
+RESOURCE_TYPES = ('doc', 'course', 'book', 'video', 'tool', 'community')
+
+# Compact array key -> expanded key
+COMPACT_LIST_KEYS = {
+    'm': 'roadmap',
+    'p': 'projects',
+    'ws': 'weekly_schedule',
+    'r': 'resources',
+}
+
+# Rough output tokens per element, measured on typical llama-3.3-70b roadmaps
+_OUTPUT_COSTS = {
+    'full': {'base': 150, 'milestone': 40, 'project': 90, 'week': 80, 'resource': 25},
+    'compact': {'base': 60, 'milestone': 25, 'project': 55, 'week': 40, 'resource': 12},
+}
+
+_COMPLEX_HINTS = (
+    'advanced', 'expert', 'senior', 'architect', 'lead', 'research', 'phd',
+    'machine learning', 'deep learning', 'distributed', 'full stack',
+    'full-stack', 'security', 'devops', 'compiler', 'embedded',
+)
+
+
+def plan_size(skillset, interest, goal, weeks=None):
+    """
+    Decide how big a roadmap to ask for.
+
+    RETURNS:
+      dict: weeks, milestones, projects, resources
+    """
+    text = f"{interest} {goal}".lower()
+    score = sum(hint in text for hint in _COMPLEX_HINTS)
+    if len(goal.split()) > 15:
+        score += 1
+
+    level = min(score, 2)
+    return {
+        'weeks': weeks or ROADMAP_WEEKS,
+        'milestones': 5 + level,
+        'projects': 3 + level,
+        'resources': 5,
+    }
+
+
+def token_budget(plan, compact=True):
+    """max_tokens for a roadmap of the given plan size"""
+    costs = _OUTPUT_COSTS['compact' if compact else 'full']
+    estimate = (
+        costs['base']
+        + plan['milestones'] * costs['milestone']
+        + plan['projects'] * costs['project']
+        + plan['weeks'] * costs['week']
+        + plan['resources'] * costs['resource']
+    )
+    return max(ROADMAP_MIN_TOKENS, min(ROADMAP_MAX_TOKENS, int(estimate * ROADMAP_BUDGET_MARGIN)))
+
+
+def is_compact(data):
+    """True if data uses the compact keys rather than the full ones"""
+    return isinstance(data, dict) and 'roadmap' not in data and any(key in data for key in ('m', 'p', 'ws'))
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [part.strip() for part in str(value).split(',') if part.strip()]
+
+
+def _expand_project(item):
+    if isinstance(item, list):
+        item = dict(zip(('n', 'd', 'w', 't'), item))
+    if not isinstance(item, dict):
+        return {'name': str(item), 'description': '', 'duration_weeks': None, 'tech_stack': []}
+    return {
+        'name': item.get('n') or item.get('name', ''),
+        'description': item.get('d') or item.get('description', ''),
+        'duration_weeks': item.get('w', item.get('duration_weeks')),
+        'tech_stack': _as_list(item.get('t', item.get('tech_stack'))),
+    }
+
+
+def _expand_week(item, index):
+    if isinstance(item, dict):
+        tasks = item.get('t', item.get('tasks'))
+    else:
+        tasks = item
+    return {'week': index + 1, 'tasks': tasks if isinstance(tasks, list) else _as_list(tasks)}
+
+
+def _expand_resource(item):
+    if isinstance(item, list):
+        name = str(item[0]) if item else ''
+        kind = str(item[1]).lower() if len(item) > 1 else None
+    elif isinstance(item, dict):
+        name = item.get('n') or item.get('name', '')
+        kind = item.get('k') or item.get('type')
+    else:
+        name, kind = str(item), None
+    resource = {'name': name}
+    if kind:
+        resource['type'] = kind if kind in RESOURCE_TYPES else 'doc'
+    return resource
+
+
+def expand_item(key, item, index):
+    """
+    Expand one element of a compact array.
+
+    RETURNS:
+      tuple: (expanded key, expanded item); non-compact keys pass through
+    """
+    if key == 'm':
+        return 'roadmap', item if isinstance(item, str) else str(item)
+    if key == 'p':
+        return 'projects', _expand_project(item)
+    if key == 'ws':
+        return 'weekly_schedule', _expand_week(item, index)
+    if key == 'r':
+        return 'resources', _expand_resource(item)
+    return key, item
+
+
+def expand_roadmap(data):
+    """Convert a compact roadmap into the full response shape"""
+    result = {'summary': data.get('s', '')}
+    for short_key in COMPACT_LIST_KEYS:
+        items = data.get(short_key) or []
+        if not isinstance(items, list):
+            items = [items]
+        for index, item in enumerate(items):
+            full_key, expanded = expand_item(short_key, item, index)
+            result.setdefault(full_key, []).append(expanded)
+        result.setdefault(COMPACT_LIST_KEYS[short_key], [])
+    return result
@@ -0,0 +1,186 @@
+"""
+================================================================================
+STORED ROADMAPS
+================================================================================
+
+Generated roadmaps kept server-side under a short roadmap_id.
+
+PURPOSE:
+The front end used to POST the whole roadmap JSON back to run_agent and
+add_to_calendar, and get_project() parsed that JSON string again. Now
+generate_roadmap stores the result once and returns its roadmap_id. The
+downstream endpoints and the results/<roadmap_id>/ page load it by ID, so
+request bodies stay small and a results link renders without regenerating.
+
+STORAGE:
+  - roadmap_id is the first 32 hex chars of sha256(canonical JSON), so the same
+    roadmap served twice (cache hits) shares one row
+  - The JSON is zlib-compressed into a BinaryField; a 12-week roadmap
+    shrinks to roughly a third
+  - Profile, uncompressed size and the partial flag are kept as columns
+
+IN-PROCESS CACHE:
+Rows never change, so the last ROADMAP_STORE_MEMORY decompressed JSON strings
+are kept per process. The generate -> calendar -> agent sequence of one
+user therefore costs one database read at most. Every load returns a fresh
+dict.
+
+RETENTION:
+  ROADMAP_STORE_TTL  - Seconds a stored roadmap is kept (default 90 days)
+save_roadmap() prunes expired rows at most once per hour per process.
+
+================================================================================
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.utils import timezone
+
+from api_features.models import StoredRoadmap
+
+from .roadmap_cache import make_cache_key
+
+ROADMAP_STORE_TTL = int(os.getenv('ROADMAP_STORE_TTL', str(90 * 24 * 60 * 60)))
+ROADMAP_STORE_MEMORY = int(os.getenv('ROADMAP_STORE_MEMORY', '256'))
+
+_PRUNE_INTERVAL = 60 * 60
+_ROADMAP_ID = re.compile(r'^[0-9a-f]{32}$')
+
+_memory_lock = threading.Lock()
+_memory = OrderedDict()   # roadmap_id -> JSON text
+_last_prune = None
+
+
+def is_roadmap_id(value):
+    return isinstance(value, str) and bool(_ROADMAP_ID.match(value))
+
+
+def _remember(roadmap_id, text):
+    with _memory_lock:
+        _memory[roadmap_id] = text
+        _memory.move_to_end(roadmap_id)
+        while len(_memory) > ROADMAP_STORE_MEMORY:
+            _memory.popitem(last=False)
+
+
+def _canonical(roadmap):
+    return json.dumps(roadmap, separators=(',', ':'), sort_keys=True)
+
+
+def make_roadmap_id(roadmap):
+    """Content hash a roadmap is stored under (the same roadmap always gets the same ID)"""
+    return hashlib.sha256(_canonical(roadmap).encode('utf-8')).hexdigest()[:32]
+
+
+def save_roadmap(skillset, interest, goal, roadmap):
+    """
+    Store a roadmap (idempotent) and return its roadmap_id.
+
+    RETURNS:
+      str: roadmap_id
+    """
+    text = _canonical(roadmap)
+    raw = text.encode('utf-8')
+    roadmap_id = make_roadmap_id(roadmap)
+
+    StoredRoadmap.objects.get_or_create(
+        roadmap_id=roadmap_id,
+        defaults={
+            'profile_key': make_cache_key(skillset, interest, goal),
+            'skillset': skillset,
+            'interest': interest,
+            'goal': goal,
+            'data': zlib.compress(raw, 6),
+            'size': len(raw),
+            'partial': bool(roadmap.get('partial')) if isinstance(roadmap, dict) else False,
+        }
+    )
+    _remember(roadmap_id, text)
+    _maybe_prune()
+    return roadmap_id
+
+
+def load_roadmap(roadmap_id):
+    """
+    RETURNS:
+      dict | None: The stored roadmap, None for unknown or malformed IDs
+    """
+    if not is_roadmap_id(roadmap_id):
+        return None
+
+    with _memory_lock:
+        text = _memory.get(roadmap_id)
+        if text is not None:
+            _memory.move_to_end(roadmap_id)
+    if text is None:
+        blob = StoredRoadmap.objects.filter(roadmap_id=roadmap_id).values_list('data', flat=True).first()
+        if blob is None:
+            return None
+        text = zlib.decompress(bytes(blob)).decode('utf-8')
+        _remember(roadmap_id, text)
+    return json.loads(text)
+
+
+def get_profile(roadmap_id):
+    """
+    RETURNS:
+      dict | None: skillset, interest and goal the roadmap was generated for
+    """
+    if not is_roadmap_id(roadmap_id):
+        return None
+    return StoredRoadmap.objects.filter(roadmap_id=roadmap_id).values('skillset', 'interest', 'goal').first()
+
+
+def get_profile_key(roadmap_id):
+    """
+    RETURNS:
+      str | None: roadmap_cache key of the profile the roadmap was generated for
+    """
+    if not is_roadmap_id(roadmap_id):
+        return None
+    return StoredRoadmap.objects.filter(roadmap_id=roadmap_id).values_list('profile_key', flat=True).first()
+
+
+def get_created_at(roadmap_id):
+    """
+    RETURNS:
+      datetime | None: When the roadmap was first stored
+    """
+    if not is_roadmap_id(roadmap_id):
+        return None
+    return StoredRoadmap.objects.filter(roadmap_id=roadmap_id).values_list('created_at', flat=True).first()
+
+
+def prune_roadmaps(ttl=None):
+    """
+    Delete roadmaps older than ttl seconds.
+
+    RETURNS:
+      int: Number of roadmaps removed
+    """
+    cutoff = timezone.now() - timedelta(seconds=ttl if ttl is not None else ROADMAP_STORE_TTL)
+    removed, _ = StoredRoadmap.objects.filter(created_at__lt=cutoff).delete()
+    return removed
+
+
+def _maybe_prune():
+    global _last_prune
+    now = time.monotonic()
+    with _memory_lock:
+        if _last_prune is not None and now - _last_prune < _PRUNE_INTERVAL:
+            return
+        _last_prune = now
+    try:
+        removed = prune_roadmaps()
+        if removed:
+            print(f"Pruned {removed} expired roadmaps")
+    except Exception as e:
+        print(f"WARNING: Roadmap pruning failed: {str(e)}")
@@ -0,0 +1,206 @@
+"""
+================================================================================
+PROFILE SIMILARITY INDEX (MINHASH + LSH)
+================================================================================
+
+In-memory nearest-neighbour lookup over the token sets of user profiles.
+
+PURPOSE:
+The exact roadmap cache (services/roadmap_cache.py) misses profiles that say
+the same thing in different words: "Python, Django" vs "django and python
+dev". This index finds a stored profile whose tokens overlap enough that its
+roadmap can be served instead of paying for a new completion.
+
+TOKENS:
+profile_tokens() splits each normalized field into words, drops filler words
+("and", "dev", "basics", ...), maps a few common aliases (js -> javascript)
+and strips plural "s". Tokens are prefixed with their field (s:, i:, g:), so
+"python" as a skill and "python" as a goal are different tokens.
+
+SIMILARITY:
+Jaccard similarity of the two token sets, computed exactly on the candidates.
+MinHash signatures and LSH banding only pick those candidates:
+  - SIGNATURE_SIZE hash functions, split into LSH_BANDS bands
+  - Two profiles become candidates when any band matches, which happens with
+    probability 1 - (1 - J**rows)**bands (0.98 at J=0.8, 0.27 at J=0.5)
+  - Profiles with the same token set (the common "reworded" case) are found
+    through a plain dict before any hashing
+
+COST:
+A lookup hashes the query's ~10 tokens once, computes SIGNATURE_SIZE minima
+and probes LSH_BANDS dicts; only candidates sharing a band are compared, so
+the cost follows the number of near neighbours rather than the corpus size
+(see benchmarks/similarity_index.py for 100k profiles). Memory is one token
+set and LSH_BANDS bucket entries per profile.
+
+THREAD SAFETY:
+add/remove/query take one lock; the signature is computed outside it.
+
+================================================================================
+"""
+
+import hashlib
+import random
+import re
+import threading
+
+SIGNATURE_SIZE = 50
+LSH_BANDS = 10
+_ROWS = SIGNATURE_SIZE // LSH_BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures must agree across processes and restarts
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(SIGNATURE_SIZE)
+]
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'as', 'at', 'basic', 'basics', 'be', 'become', 'dev', 'developer',
+    'development', 'engineer', 'engineering', 'experience', 'for', 'get', 'good', 'i', 'in',
+    'into', 'knowledge', 'learn', 'learning', 'like', 'my', 'of', 'on', 'or', 'some', 'the',
+    'to', 'want', 'with',
+}
+
+_ALIASES = {
+    'js': 'javascript', 'ts': 'typescript', 'py': 'python', 'ml': 'machine-learning',
+    'ai': 'artificial-intelligence', 'golang': 'go', 'postgres': 'postgresql',
+    'k8s': 'kubernetes', 'reactjs': 'react', 'nodejs': 'node', 'node.js': 'node',
+    'front': 'frontend', 'back': 'backend', 'fullstack': 'full-stack',
+}
+
+_WORD = re.compile(r'[a-z0-9][a-z0-9+#.\-]*')
+
+
+def _word_tokens(text):
+    tokens = set()
+    for word in _WORD.findall(text or ''):
+        word = _ALIASES.get(word.rstrip('.'), word.rstrip('.'))
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        if word and word not in _STOPWORDS:
+            tokens.add(word)
+    return tokens
+
+
+def profile_tokens(skillset, interest, goal):
+    """
+    Field-prefixed token set of an already normalized profile.
+
+    EXAMPLE:
+      profile_tokens('django and python dev', 'web apps', '')
+      -> {'s:django', 's:python', 'i:web', 'i:app'}
+    """
+    return frozenset(
+        [f's:{t}' for t in _word_tokens(skillset)]
+        + [f'i:{t}' for t in _word_tokens(interest)]
+        + [f'g:{t}' for t in _word_tokens(goal)]
+    )
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(tokens):
+    """MinHash signature (tuple of SIGNATURE_SIZE ints) of a token set"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+        for token in tokens
+    ]
+    if not hashes:
+        return (_MAX_HASH,) * SIGNATURE_SIZE
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def _band_keys(signature):
+    return [hash((band,) + signature[band * _ROWS:(band + 1) * _ROWS]) for band in range(LSH_BANDS)]
+
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index from document keys to token sets.
+
+    USAGE:
+      index = SimilarityIndex()
+      index.add('key-1', profile_tokens('python, django', 'web apps', ''))
+      index.query(profile_tokens('django and python dev', 'web apps', ''), 0.8)
+      -> ('key-1', 1.0)
+    """
+
+    def __init__(self):
+        self._docs = {}      # key -> (tokens, band keys)
+        self._exact = {}     # tokens -> key
+        self._buckets = {}   # band key -> set of document keys
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, key):
+        return key in self._docs
+
+    def add(self, key, tokens):
+        """Insert or replace a document"""
+        bands = _band_keys(minhash(tokens))
+        with self._lock:
+            self._remove_locked(key)
+            self._docs[key] = (tokens, bands)
+            self._exact[tokens] = key
+            for band in bands:
+                self._buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._remove_locked(key)
+
+    def _remove_locked(self, key):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        if self._exact.get(doc[0]) == key:
+            del self._exact[doc[0]]
+        for band in doc[1]:
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def query(self, tokens, threshold, exclude=None):
+        """
+        Most similar stored document with Jaccard similarity >= threshold.
+
+        RETURNS:
+          tuple | None: (key, similarity), or None when nothing qualifies
+        """
+        with self._lock:
+            key = self._exact.get(tokens)
+            if key is not None and key != exclude:
+                return key, 1.0
+
+        bands = _band_keys(minhash(tokens))
+        best_key, best_score = None, threshold
+        with self._lock:
+            candidates = set()
+            for band in bands:
+                candidates.update(self._buckets.get(band, ()))
+            candidates.discard(exclude)
+            size = len(tokens)
+            for key in candidates:
+                stored = self._docs[key][0]
+                # |A & B| / |A | B| <= min / max of the two sizes
+                if min(size, len(stored)) < threshold * max(size, len(stored)):
+                    continue
+                score = jaccard(tokens, stored)
+                if score >= best_score:
+                    best_key, best_score = key, score
+        return (best_key, best_score) if best_key is not None else None
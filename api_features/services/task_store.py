@@ -0,0 +1,243 @@
+"""
+================================================================================
+DATABASE-BACKED TASK STORE
+================================================================================
+
+Shared status store for background tasks: agent runs and calendar syncs
+(replaces the in-memory TASKS dict in views.py).
+
+PURPOSE:
+With more than one gunicorn/uvicorn worker, a status poll can land on a
+different process than the one running the task. Keeping task state in the
+AgentTask table lets any process answer run_agent_status, so the web tier
+scales horizontally without sticky sessions.
+
+WRITE PATH:
+update_task() issues a single UPDATE ... WHERE task_id = ? touching only the
+given columns. Progress messages are therefore cheap and never need a
+read-modify-write round trip.
+
+QUEUE POSITION:
+A queued task's position is the number of live queued tasks of the same kind
+created before it, plus one. The (status, created_at) index keeps this a
+cheap count across all processes. A requeued task gets a new created_at, so
+it lines up behind the tasks already waiting, in the order the executor
+will actually run it.
+
+HEARTBEAT & STALE TASKS:
+A process that dies (restart, OOM kill, deploy) leaves its tasks queued or
+in_progress for good. Each JobExecutor therefore calls touch_tasks() for its
+queued and running jobs every TASK_HEARTBEAT_INTERVAL seconds. A queued or
+in_progress task not updated for TASK_STALE_AFTER seconds belongs to no live
+process: get_task() reports it with stale=True and no queue position, it no
+longer counts towards other tasks' positions, and it can be requeued.
+
+PROGRESS & RESUME:
+Jobs that know their size report progress_done/progress_total, returned as
+task['progress'] = {'done', 'total'}. A job's input is kept in payload so a
+failed or stale job can be queued again under the same task_id (see
+views.calendar_sync_resume).
+
+CHANGE NOTIFICATION:
+update_task() bumps a process-wide version and wakes threads blocked in
+wait_for_update(). The progress stream uses this to push updates made in the
+same process immediately; updates written by another process are picked up
+when the wait times out and the stream re-reads the row.
+
+PRUNING:
+  TASK_TTL            - Seconds a task is kept after its last update (default 24h)
+  TASK_PRUNE_INTERVAL - Minimum seconds between opportunistic prunes (default 1h)
+
+create_task() prunes opportunistically at most once per interval per process.
+`python manage.py prune_tasks` does the same from cron.
+
+================================================================================
+"""
+
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from api_features.models import AgentTask
+
+TASK_TTL = int(os.getenv('TASK_TTL', str(24 * 60 * 60)))
+TASK_PRUNE_INTERVAL = int(os.getenv('TASK_PRUNE_INTERVAL', str(60 * 60)))
+TASK_HEARTBEAT_INTERVAL = float(os.getenv('TASK_HEARTBEAT_INTERVAL', '15'))
+TASK_STALE_AFTER = float(os.getenv('TASK_STALE_AFTER', '90'))
+
+_TASK_FIELDS = ('status', 'message', 'repo_url', 'error')
+_UPDATE_FIELDS = _TASK_FIELDS + ('result', 'payload', 'progress_done', 'progress_total')
+
+TERMINAL_STATUSES = (AgentTask.STATUS_COMPLETED, AgentTask.STATUS_FAILED)
+ACTIVE_STATUSES = (AgentTask.STATUS_QUEUED, AgentTask.STATUS_IN_PROGRESS)
+
+_changed = threading.Condition()
+_version = 0
+
+_prune_lock = threading.Lock()
+_last_prune = None
+
+
+def create_task(task_id, message, status=AgentTask.STATUS_QUEUED, kind=AgentTask.KIND_AGENT, payload=None):
+    """Insert a new task row and occasionally prune expired ones"""
+    AgentTask.objects.create(task_id=task_id, status=status, message=message, kind=kind, payload=payload)
+    _maybe_prune()
+
+
+def update_task(task_id, **fields):
+    """
+    Update selected task fields with one UPDATE statement.
+
+    USAGE:
+      update_task(task_id, message='Creating README...')
+      update_task(task_id, status='completed', repo_url=url)
+    """
+    unknown = set(fields) - set(_UPDATE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown task fields: {', '.join(sorted(unknown))}")
+    AgentTask.objects.filter(task_id=task_id).update(updated_at=timezone.now(), **fields)
+    _notify()
+
+
+def touch_tasks(task_ids):
+    """Heartbeat: mark active tasks as still owned by a live process"""
+    AgentTask.objects.filter(task_id__in=task_ids, status__in=ACTIVE_STATUSES).update(
+        updated_at=timezone.now()
+    )
+
+
+def stale_cutoff():
+    """Active tasks last updated before this time have lost their process"""
+    return timezone.now() - timedelta(seconds=TASK_STALE_AFTER)
+
+
+def current_version():
+    """Version counter to pass to the first wait_for_update() call"""
+    with _changed:
+        return _version
+
+
+def wait_for_update(version, timeout):
+    """
+    Block until any task is updated in this process after `version`, or
+    until timeout seconds pass.
+
+    RETURNS:
+      int: The latest version (unchanged on timeout)
+    """
+    with _changed:
+        _changed.wait_for(lambda: _version != version, timeout=timeout)
+        return _version
+
+
+def _notify():
+    global _version
+    with _changed:
+        _version += 1
+        _changed.notify_all()
+
+
+def get_task(task_id):
+    """
+    RETURNS:
+      dict | None: status, message, repo_url, error and queue_position,
+                   plus progress and result for jobs that report them and
+                   stale=True for an active task whose process is gone
+    """
+    task = AgentTask.objects.filter(task_id=task_id).values(
+        *_TASK_FIELDS, 'kind', 'result', 'progress_done', 'progress_total', 'created_at', 'updated_at'
+    ).first()
+    if task is None:
+        return None
+
+    created_at = task.pop('created_at')
+    updated_at = task.pop('updated_at')
+    cutoff = stale_cutoff()
+    stale = task['status'] in ACTIVE_STATUSES and updated_at < cutoff
+    kind = task.pop('kind')
+    done, total = task.pop('progress_done'), task.pop('progress_total')
+    if total:
+        task['progress'] = {'done': done, 'total': total}
+    if task['result'] is None:
+        del task['result']
+    if kind != AgentTask.KIND_AGENT:
+        task['kind'] = kind
+
+    if stale:
+        task['stale'] = True
+        task['queue_position'] = None
+    elif task['status'] == AgentTask.STATUS_QUEUED:
+        task['queue_position'] = AgentTask.objects.filter(
+            kind=kind,
+            status=AgentTask.STATUS_QUEUED,
+            created_at__lt=created_at,
+            updated_at__gte=cutoff
+        ).count() + 1
+    elif task['status'] == AgentTask.STATUS_IN_PROGRESS:
+        task['queue_position'] = 0
+    else:
+        task['queue_position'] = None
+    return task
+
+
+def get_job(task_id):
+    """
+    RETURNS:
+      dict | None: kind, status and payload of a task, for resuming it
+    """
+    return AgentTask.objects.filter(task_id=task_id).values('kind', 'status', 'payload').first()
+
+
+def requeue_task(task_id, message):
+    """
+    Put a failed or stale task back in the queue, at the back of the line.
+
+    RETURNS:
+      bool: False when the task is missing, or neither failed nor stale
+            (e.g. a concurrent resume already requeued it)
+    """
+    now = timezone.now()
+    resumable = Q(status=AgentTask.STATUS_FAILED) | Q(status__in=ACTIVE_STATUSES, updated_at__lt=stale_cutoff())
+    updated = AgentTask.objects.filter(resumable, task_id=task_id).update(
+        status=AgentTask.STATUS_QUEUED, message=message, error=None,
+        created_at=now, updated_at=now
+    )
+    if updated:
+        _notify()
+    return bool(updated)
+
+
+def delete_task(task_id):
+    """Remove a task that never made it into the queue"""
+    AgentTask.objects.filter(task_id=task_id).delete()
+
+
+def prune_tasks(ttl=None):
+    """
+    Delete tasks whose last update is older than ttl seconds.
+
+    RETURNS:
+      int: Number of tasks removed
+    """
+    cutoff = timezone.now() - timedelta(seconds=ttl if ttl is not None else TASK_TTL)
+    removed, _ = AgentTask.objects.filter(updated_at__lt=cutoff).delete()
+    return removed
+
+
+def _maybe_prune():
+    global _last_prune
+    now = time.monotonic()
+    with _prune_lock:
+        if _last_prune is not None and now - _last_prune < TASK_PRUNE_INTERVAL:
+            return
+        _last_prune = now
+    try:
+        removed = prune_tasks()
+        if removed:
+            print(f"Pruned {removed} expired agent tasks")
+    except Exception as e:
+        print(f"WARNING: Task pruning failed: {str(e)}")
@@ -5,33 +5,60 @@ API FEATURES - UNIT TESTS
 
 Django test cases for the api_features application.
 
-TEST COVERAGE AREAS TO IMPLEMENT:
-
-1. ROADMAP GENERATION (views.py)
-   - Valid inputs generate JSON roadmaps
-   - Invalid inputs return proper error codes
-   - AI model API failures handled gracefully
-   - Response parsing handles malformed JSON
-
-2. GOOGLE CALENDAR INTEGRATION
-   - OAuth2 flow initiated correctly
-   - Callback handler processes codes properly
-   - Token storage and refresh function
-   - Calendar events created with correct structure
-   - Email/popup reminders configured correctly
-
-3. GITHUB AGENT
-   - Background task tracking (in-memory storage)
-   - Repository creation succeeds with valid token
-   - Files created with proper content
-   - Error handling for API failures
-   - Task status updates correctly
-
-4. SECURITY & VALIDATION
-   - CSRF protection active on POST endpoints
-   - Secret API keys not exposed in responses
-   - Session data properly isolated per user
-   - Input validation on all endpoints
+Everything here runs offline: Groq clients, GitHub, the Calendar service and
+the background executors are replaced with in-process fakes, so the suite
+needs no API keys, credentials or network access. Database tests use
+Django's throwaway SQLite test database, never db.sqlite3.
+
+COVERAGE:
+  - Roadmap cache: normalization, TTL expiry, LRU eviction, counters and
+    CACHE_VERSION (services/roadmap_cache.py, generate_roadmap)
+  - Roadmap streaming: items parsed across arbitrary chunk splits, SSE
+    events and continuation stripping (services/json_stream.py,
+    generate_roadmap_stream)
+  - Async views: AsyncGroq roadmap generation, continuation and caching,
+    and the shared agent job path (async_views.py)
+  - Calendar batching: chunking, per-item retries of retryable failures
+    and event items of a roadmap (services/calendar_batch.py)
+  - Agent job queue: bounded worker pool, QueueFull and the 429 from
+    run_agent (services/job_queue.py)
+  - Task store: state changes, queue positions and pruning shared across
+    processes (services/task_store.py)
+  - Concurrent agent LLM calls: results in order, one timeout for the
+    group (views.run_llm_calls)
+  - Structured agent plan: one JSON-mode call, per-field fallbacks
+    (views.plan_project_structured)
+  - Single-commit push: ref -> tree -> commit -> ref PATCH through the Git
+    Data API (views.push_files, views.wait_for_branch)
+  - Task progress over Server-Sent Events (views.run_agent_progress,
+    task_store.wait_for_update)
+  - GitHub retry policy: POST/PATCH only replayed on a refused request
+    (services/http.py)
+  - Groq rate-limit scheduler: bucket refill, priorities and header
+    corrections against a fake clock (services/rate_limit.py)
+  - Truncated JSON repair and continuation of a max_tokens roadmap reply
+    (services/json_repair.py, views.parse_roadmap_response)
+  - Compact roadmap schema: expansion, plan sizing, token budget and week
+    task lists rendered as text (services/roadmap_schema.py)
+  - Lazy API client providers: one factory call under concurrent first use,
+    attribute forwarding (services/providers.py)
+  - Prometheus metrics: exposition text, label escaping, collectors, agent
+    stage timing and the metrics view (services/metrics.py)
+  - Near-duplicate profile reuse: MinHash index and the similar-roadmap
+    cache lookup (services/similarity_index.py)
+  - Stored roadmaps: compressed rows under a content-hash roadmap_id, the
+    in-process LRU, pruning and the results page (services/roadmap_store.py)
+  - Per-owner calendar credentials: single-flight refresh in a process, the
+    cross-process refresh lease, background refresh and revoked grants
+    (services/calendar_service.py)
+  - Incremental calendar sync: deterministic event IDs, create/patch/delete
+    planning, lost links, failed items and sync keys (services/calendar_sync.py)
+  - Recurring calendar mode: identical weeks merged into recurring weekly
+    and daily events (views.recurring_week_items)
+  - iCalendar export: escaping, folding, rendering and the conditional
+    .ics feed (services/ical.py, views.roadmap_ics)
+  - Task heartbeat, stale tasks, requeue order and resumable calendar sync
+    jobs (services/task_store.py, views.calendar_sync_resume)
 
 RUNNING TESTS:
   python manage.py test api_features
@@ -46,8 +73,1889 @@ COVERAGE REPORT:
 ================================================================================
 """
 
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import DatabaseError, connections
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from . import async_views, views
+from .models import (
+    AgentTask, CalendarEventLink, CalendarSync, OAuthCredential, RoadmapCacheEntry, StoredRoadmap,
+)
+from .services import (
+    calendar_batch, calendar_service, calendar_sync, http, ical, metrics, rate_limit,
+    roadmap_cache, roadmap_schema, roadmap_store, task_store,
+)
+from .services.job_queue import JobExecutor, QueueFull
+from .services.json_repair import repair_json
+from .services.json_stream import IncrementalJSONParser
+from .services.providers import LazyProvider
+from .services.similarity_index import SimilarityIndex, profile_tokens
+
+
+# ============================================================================
+# Fakes
+# ============================================================================
+
+def completion(content, finish_reason='stop'):
+    """Non-streaming chat completion as returned by the Groq client"""
+    return SimpleNamespace(choices=[SimpleNamespace(
+        message=SimpleNamespace(content=content), finish_reason=finish_reason
+    )])
+
+
+def fake_groq(*responses):
+    """Client whose chat.completions.create returns responses in order"""
+    create = mock.Mock(side_effect=list(responses))
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))), create
+
+
+def fake_async_groq(*responses):
+    """AsyncGroq stand-in: create() is a coroutine returning responses in order"""
+    create = mock.AsyncMock(side_effect=list(responses))
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))), create
+
+
+def stream(chunks, finish_reason='stop'):
+    """Streaming chat completion: one chunk per delta, finish_reason on the last"""
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(
+            delta=SimpleNamespace(content=chunk),
+            finish_reason=finish_reason if idx == len(chunks) - 1 else None
+        )])
+        for idx, chunk in enumerate(chunks)
+    ]
+
+
+def sse_events(response):
+    """(event, payload) pairs of a streamed SSE response"""
+    body = b''.join(response.streaming_content).decode('utf-8')
+    return [
+        (match.group(1), json.loads(match.group(2)))
+        for match in re.finditer(r'event: (\w+)\ndata: (.*)\n\n', body)
+    ]
+
+
+def http_error(status, reason='fake'):
+    from googleapiclient.errors import HttpError
+    return HttpError(SimpleNamespace(status=status, reason=reason), reason.encode('utf-8'))
+
+
+class FakeCalendarService:
+    """In-memory Calendar v3 service supporting events() batch requests"""
+
+    def __init__(self):
+        self.events_by_id = {}
+        self.batches = 0
+        self.calls = []
+        # summary -> status every call for it fails with, or a list of
+        # statuses for its next calls
+        self.fail = {}
+
+    def events(self):
+        class Events:
+            def __getattr__(self, method):
+                return lambda **kwargs: (method, kwargs)
+
+        return Events()
+
+    def new_batch_http_request(self, callback):
+        service = self
+
+        class Batch:
+            def __init__(self):
+                self.items = []
+
+            def add(self, request, request_id):
+                self.items.append((request, request_id))
+
+            def execute(self):
+                service.batches += 1
+                for (method, kwargs), request_id in self.items:
+                    service.calls.append(method)
+                    callback(request_id, *service.handle(method, kwargs))
+
+        return Batch()
+
+    def handle(self, method, kwargs):
+        body = kwargs.get('body') or {}
+        planned = self.fail.get(body.get('summary'))
+        if isinstance(planned, list):
+            planned = planned.pop(0) if planned else None
+        if planned:
+            return None, http_error(planned)
+        if method == 'insert':
+            event_id = body.get('id') or f'auto{len(self.events_by_id)}'
+            if event_id in self.events_by_id:
+                return None, http_error(409)
+            self.events_by_id[event_id] = dict(body, id=event_id)
+            return {'id': event_id}, None
+        event_id = kwargs['eventId']
+        if method == 'delete':
+            if self.events_by_id.pop(event_id, None) is None:
+                return None, http_error(410)
+            return '', None
+        if event_id not in self.events_by_id:
+            return None, http_error(404)
+        self.events_by_id[event_id].update(body)
+        return {'id': event_id}, None
+
+
+class FakeGitHubSession:
+    """Records GitHub calls and answers from a {(method, path suffix): [responses]} script"""
+
+    def __init__(self, script):
+        self.script = {key: list(responses) for key, responses in script.items()}
+        self.calls = []
+
+    def request(self, method, url, json=None, timeout=None):
+        self.calls.append((method, url.split('/git/', 1)[-1], json))
+        for (script_method, suffix), responses in self.script.items():
+            if script_method == method and url.endswith(suffix):
+                status, body = responses.pop(0) if len(responses) > 1 else responses[0]
+                return SimpleNamespace(status_code=status, json=lambda body=body: body)
+        raise AssertionError(f'Unexpected GitHub call {method} {url}')
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def sample_roadmap(weeks=2, tasks=('Learn HTTP', 'Build CRUD'), projects=('Todo API',)):
+    return {
+        'summary': 'Backend path',
+        'roadmap': ['Basics', 'APIs'],
+        'projects': [
+            {'name': name, 'description': 'Build it', 'duration_weeks': 1, 'tech_stack': ['python']}
+            for name in projects
+        ],
+        'weekly_schedule': [{'week': idx + 1, 'tasks': list(tasks)} for idx in range(weeks)],
+        'resources': [],
+    }
+
+
+def isolate_caches(test):
+    """Give a test empty in-process cache state (the module globals outlive a test)"""
+    for patcher in (
+        mock.patch.object(roadmap_cache, '_stats', dict.fromkeys(roadmap_cache._stats, 0)),
+        mock.patch.object(roadmap_cache, '_index', SimilarityIndex()),
+        mock.patch.object(roadmap_cache, '_index_state', {'max_pk': 0, 'refreshed': None}),
+        mock.patch.object(roadmap_store, '_memory', OrderedDict()),
+        mock.patch.object(ical, '_cache', OrderedDict()),
+    ):
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+
+COMPACT_REPLY = json.dumps({
+    's': 'Summary',
+    'm': ['HTTP basics', 'REST APIs'],
+    'p': [{'n': 'Todo API', 'd': 'CRUD service', 'w': 2, 't': ['django']}],
+    'ws': [['Learn HTTP', 'Build CRUD'], ['Deploy']],
+    'r': [['Django docs', 'doc']],
+})
+
+
+# ============================================================================
+# Roadmap cache
+# ============================================================================
+
+class RoadmapCacheTests(TestCase):
+    ROADMAP = {'summary': 'cached', 'roadmap': ['a']}
+
+    def setUp(self):
+        isolate_caches(self)
+
+    def age(self, **fields):
+        """Move entries' creation time past the TTL"""
+        RoadmapCacheEntry.objects.filter(**fields).update(
+            created_at=timezone.now() - timedelta(seconds=roadmap_cache.ROADMAP_CACHE_TTL + 60)
+        )
+
+    def test_normalized_profiles_share_an_entry(self):
+        roadmap_cache.store_roadmap('Python, Django', 'Web  Apps', '', self.ROADMAP)
+        self.assertEqual(roadmap_cache.get_cached_roadmap('django;python', 'web apps', 'General learning'),
+                         self.ROADMAP)
+        self.assertIsNone(roadmap_cache.get_cached_roadmap('python', 'web apps', ''))
+
+    def test_expired_entry_is_a_miss_and_removed(self):
+        roadmap_cache.store_roadmap('python', 'web', '', self.ROADMAP)
+        self.age()
+        self.assertIsNone(roadmap_cache.get_cached_roadmap('python', 'web', ''))
+        self.assertEqual(RoadmapCacheEntry.objects.count(), 0)
+        self.assertEqual(roadmap_cache.cache_stats()['evictions'], 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        with mock.patch.object(roadmap_cache, 'ROADMAP_CACHE_MAX_ENTRIES', 2):
+            roadmap_cache.store_roadmap('a', 'web', '', self.ROADMAP)
+            roadmap_cache.store_roadmap('b', 'web', '', self.ROADMAP)
+            RoadmapCacheEntry.objects.filter(skillset='b').update(
+                last_accessed=timezone.now() - timedelta(hours=1)
+            )
+            roadmap_cache.store_roadmap('c', 'web', '', self.ROADMAP)
+
+        self.assertEqual(sorted(RoadmapCacheEntry.objects.values_list('skillset', flat=True)), ['a', 'c'])
+
+    def test_store_evicts_expired_entries_first(self):
+        with mock.patch.object(roadmap_cache, 'ROADMAP_CACHE_MAX_ENTRIES', 2):
+            roadmap_cache.store_roadmap('a', 'web', '', self.ROADMAP)
+            roadmap_cache.store_roadmap('b', 'web', '', self.ROADMAP)
+            self.age(skillset='a')
+            roadmap_cache.store_roadmap('c', 'web', '', self.ROADMAP)
+
+        self.assertEqual(sorted(RoadmapCacheEntry.objects.values_list('skillset', flat=True)), ['b', 'c'])
+
+    def test_counters(self):
+        roadmap_cache.get_cached_roadmap('python', 'web', '')
+        roadmap_cache.store_roadmap('python', 'web', '', self.ROADMAP)
+        roadmap_cache.get_cached_roadmap('python', 'web', '')
+
+        stats = roadmap_cache.cache_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(RoadmapCacheEntry.objects.get().hit_count, 1)
+
+    def test_cache_version_bump_invalidates_entries(self):
+        roadmap_cache.store_roadmap('python', 'web', '', self.ROADMAP)
+        old_key = roadmap_cache.make_cache_key('python', 'web', '')
+        with mock.patch.object(roadmap_cache, 'CACHE_VERSION', roadmap_cache.CACHE_VERSION + 1):
+            self.assertNotEqual(roadmap_cache.make_cache_key('python', 'web', ''), old_key)
+            self.assertIsNone(roadmap_cache.get_cached_roadmap('python', 'web', ''))
+
+    def test_database_errors_are_misses(self):
+        with mock.patch.object(roadmap_cache, '_load_entry', side_effect=DatabaseError('no table')):
+            self.assertIsNone(roadmap_cache.get_cached_roadmap('python', 'web', ''))
+        self.assertEqual(roadmap_cache.cache_stats()['misses'], 1)
+
+
+class GenerateRoadmapViewTests(TestCase):
+    PROFILE = {'skillset': 'python', 'interest': 'web apis', 'goal': 'backend job'}
+
+    def setUp(self):
+        isolate_caches(self)
+
+    def post(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+    def test_requires_skillset_and_interest(self):
+        response = self.post('/api/generate_roadmap/', {'skillset': 'python'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_generates_then_serves_from_cache(self):
+        client, create = fake_groq(completion(COMPACT_REPLY))
+        with mock.patch.object(views, 'roadmap_client', client):
+            first = self.post('/api/generate_roadmap/', self.PROFILE).json()
+            second = self.post('/api/generate_roadmap/', {**self.PROFILE, 'skillset': ' Python '}).json()
+
+        self.assertTrue(first['success'])
+        self.assertEqual(first['data']['projects'][0]['name'], 'Todo API')
+        self.assertEqual(create.call_count, 1)
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['data'], first['data'])
+
+    def test_api_error_is_mapped(self):
+        client, _ = fake_groq(Exception('rate_limit reached'))
+        with mock.patch.object(views, 'roadmap_client', client):
+            response = self.post('/api/generate_roadmap/', self.PROFILE)
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(RoadmapCacheEntry.objects.count(), 0)
+
+
+# ============================================================================
+# Roadmap streaming
+# ============================================================================
+
+class IncrementalJSONParserTests(SimpleTestCase):
+    DOCUMENT = (
+        '```json\n{"summary": "has \\"quotes\\", [brackets] and {braces}", '
+        '"roadmap": ["Step \\"one\\"", "Step ] two"], '
+        '"other": [1, 2], '
+        '"projects": [{"name": "A", "tech_stack": ["x", "y"], "meta": {"n": [1, {"k": "}"}]}}, '
+        '{"name": "B,C"}]}\n```'
+    )
+
+    def feed_all(self, chunks):
+        parser = IncrementalJSONParser(['roadmap', 'projects'])
+        items = []
+        for chunk in chunks:
+            items.extend(parser.feed(chunk))
+        return parser, items
+
+    def test_items_from_whole_document(self):
+        parser, items = self.feed_all([self.DOCUMENT])
+        self.assertEqual(items, [
+            ('roadmap', 'Step "one"'),
+            ('roadmap', 'Step ] two'),
+            ('projects', {'name': 'A', 'tech_stack': ['x', 'y'], 'meta': {'n': [1, {'k': '}'}]}}),
+            ('projects', {'name': 'B,C'}),
+        ])
+        self.assertEqual(parser.text, self.DOCUMENT)
+
+    def test_split_at_every_character(self):
+        _, whole = self.feed_all([self.DOCUMENT])
+        _, split = self.feed_all(list(self.DOCUMENT))
+        self.assertEqual(split, whole)
+
+    def test_items_are_emitted_as_soon_as_complete(self):
+        parser = IncrementalJSONParser(['roadmap'])
+        self.assertEqual(parser.feed('{"roadmap": ["a", "b'), [('roadmap', 'a')])
+        self.assertEqual(parser.feed('"'), [])
+        self.assertEqual(parser.feed(']}'), [('roadmap', 'b')])
+
+
+class StripContinuationTests(SimpleTestCase):
+    PARTIAL = '{"weekly_schedule": [{"week": 1, "tasks": ["Learn HTTP", "Build'
+
+    def test_fence_is_dropped(self):
+        self.assertEqual(views.strip_continuation('```json\n CRUD"]}]}', self.PARTIAL), ' CRUD"]}]}')
+
+    def test_repeated_tail_is_dropped(self):
+        self.assertEqual(views.strip_continuation('"Learn HTTP", "Build CRUD"]}]}', self.PARTIAL), ' CRUD"]}]}')
+
+    def test_short_overlap_is_kept(self):
+        self.assertEqual(views.strip_continuation('d"]}', 'Buil'), 'd"]}')
+
+    def test_ready_once_a_structural_character_arrives(self):
+        self.assertFalse(views.continuation_ready('``'))
+        self.assertFalse(views.continuation_ready('```json'))
+        self.assertTrue(views.continuation_ready('```json\n'))
+        self.assertTrue(views.continuation_ready(' CRUD"]}, {"week": 2'))
+
+
+class GenerateRoadmapStreamTests(TestCase):
+    PROFILE = {'skillset': 'python', 'interest': 'web apis', 'goal': 'backend job'}
+
+    def setUp(self):
+        isolate_caches(self)
+
+    def post(self, data):
+        return self.client.post('/api/generate_roadmap_stream/', json.dumps(data), content_type='application/json')
+
+    def test_requires_skillset_and_interest(self):
+        self.assertEqual(self.post({'interest': 'web'}).status_code, 400)
+
+    def test_emits_items_then_done(self):
+        chunks = [COMPACT_REPLY[i:i + 7] for i in range(0, len(COMPACT_REPLY), 7)]
+        client, _ = fake_groq(stream(chunks))
+        with mock.patch.object(views, 'roadmap_client', client):
+            events = sse_events(self.post(self.PROFILE))
+
+        self.assertEqual([name for name, _ in events],
+                         ['milestone', 'milestone', 'project', 'week', 'week', 'done'])
+        self.assertEqual(events[3][1], {'week': 1, 'tasks': ['Learn HTTP', 'Build CRUD']})
+        self.assertTrue(events[-1][1]['success'])
+        self.assertEqual(roadmap_cache.get_cached_roadmap(**self.PROFILE), events[-1][1]['data'])
+
+    def test_cached_profile_is_replayed_without_a_call(self):
+        roadmap_cache.store_roadmap(self.PROFILE['skillset'], self.PROFILE['interest'], self.PROFILE['goal'],
+                                    views.parse_roadmap_response(COMPACT_REPLY))
+        client, create = fake_groq()
+        with mock.patch.object(views, 'roadmap_client', client):
+            events = sse_events(self.post(self.PROFILE))
+        self.assertEqual(create.call_count, 0)
+        self.assertEqual([name for name, _ in events].count('week'), 2)
+        self.assertTrue(events[-1][1]['cached'])
+
+    def test_continuation_with_a_fence_split_across_chunks(self):
+        cut = COMPACT_REPLY.index('"ws"') + 20
+        client, _ = fake_groq(
+            stream([COMPACT_REPLY[:cut]], finish_reason='length'),
+            stream(['``', '`json', '\n', COMPACT_REPLY[cut - 10:]]),
+        )
+        with mock.patch.object(views, 'roadmap_client', client):
+            events = sse_events(self.post(self.PROFILE))
+
+        name, done = events[-1]
+        self.assertEqual(name, 'done')
+        self.assertNotIn('partial', done['data'])
+        self.assertEqual(len(done['data']['weekly_schedule']), 2)
+        self.assertEqual([name for name, _ in events].count('week'), 2)
+
+
+# ============================================================================
+# Async views
+# ============================================================================
+
+class AsyncViewTests(TestCase):
+    PROFILE = {'skillset': 'python', 'interest': 'web apis', 'goal': 'backend job'}
+    AGENT = {'skillset': 'python', 'interest': 'web'}
+
+    def setUp(self):
+        isolate_caches(self)
+
+    def post(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+    def test_generate_roadmap_matches_the_sync_view(self):
+        client, create = fake_async_groq(completion(COMPACT_REPLY))
+        with mock.patch.object(async_views, 'async_roadmap_client', client):
+            first = self.post('/api/async/generate_roadmap/', self.PROFILE).json()
+            second = self.post('/api/async/generate_roadmap/', self.PROFILE).json()
+
+        self.assertTrue(first['success'])
+        self.assertEqual(first['data'], views.parse_roadmap_response(COMPACT_REPLY))
+        self.assertEqual(create.await_count, 1)
+        self.assertEqual(create.await_args.kwargs['messages'][0]['content'], views.ROADMAP_SYSTEM_PROMPT)
+        self.assertTrue(second['cached'])
+
+    def test_generate_roadmap_continues_a_truncated_reply(self):
+        cut = COMPACT_REPLY.index('"ws"') + 20
+        client, create = fake_async_groq(
+            completion(COMPACT_REPLY[:cut], finish_reason='length'),
+            completion('```json\n' + COMPACT_REPLY[cut:] + '\n```'),
+        )
+        with mock.patch.object(async_views, 'async_roadmap_client', client):
+            data = self.post('/api/async/generate_roadmap/', self.PROFILE).json()['data']
+        self.assertEqual(create.await_count, 2)
+        self.assertNotIn('partial', data)
+        self.assertEqual(len(data['weekly_schedule']), 2)
+
+    def test_generate_roadmap_errors(self):
+        self.assertEqual(self.post('/api/async/generate_roadmap/', {'skillset': 'python'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/async/generate_roadmap/').status_code, 405)
+
+        client, _ = fake_async_groq(Exception('rate_limit reached'))
+        with mock.patch.object(async_views, 'async_roadmap_client', client):
+            self.assertEqual(self.post('/api/async/generate_roadmap/', self.PROFILE).status_code, 429)
+
+    def test_run_agent_validation(self):
+        self.assertEqual(self.post('/api/async/run_agent/', {'skillset': 'python'}).status_code, 400)
+        self.assertEqual(self.post('/api/async/run_agent/', {**self.AGENT, 'agent_mode': 'magic'}).status_code, 400)
+
+    def test_run_agent_queue_full(self):
+        with mock.patch.object(views.agent_executor, 'submit', side_effect=QueueFull(12)):
+            response = self.post('/api/async/run_agent/', self.AGENT)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '12')
+        self.assertEqual(AgentTask.objects.count(), 0)
+
+    def test_run_agent_is_queued_on_the_shared_executor(self):
+        with mock.patch.object(views.agent_executor, 'submit', return_value=1) as submit:
+            body = self.post('/api/async/run_agent/', {**self.AGENT, 'agent_mode': 'structured'}).json()
+
+        self.assertTrue(body['success'])
+        self.assertEqual(submit.call_args.args[1], views._background_run_agent)
+        self.assertEqual(submit.call_args.args[-1], 'structured')
+        self.assertIn('/api/async/run_agent_status/' + body['task_id'], body['status_url'])
+        self.assertIn('/api/run_agent_progress/' + body['task_id'], body['progress_url'])
+
+        status = self.client.get(body['status_url']).json()
+        self.assertEqual(status['task']['status'], 'queued')
+        self.assertEqual(self.client.get('/api/async/run_agent_status/missing/').status_code, 404)
+
+
+# ============================================================================
+# Calendar batching
+# ============================================================================
+
+@mock.patch.object(calendar_batch.time, 'sleep', lambda seconds: None)
+class CalendarBatchTests(SimpleTestCase):
+    START = datetime.date(2026, 1, 5)
+
+    def inserts(self, count):
+        return [{'method': 'insert', 'body': {'summary': f'event {idx}'}} for idx in range(count)]
+
+    def test_calls_are_chunked_into_batches(self):
+        service = FakeCalendarService()
+        result = calendar_batch.execute_batched(service, self.inserts(120), batch_size=50)
+        self.assertEqual(result['requests'], 3)
+        self.assertEqual(result['failed'], [])
+        self.assertEqual(len(service.events_by_id), 120)
+
+    def test_only_retryable_failures_are_resent(self):
+        service = FakeCalendarService()
+        service.fail = {'event 1': [503, 429], 'event 2': 400}
+        result = calendar_batch.execute_batched(service, self.inserts(4))
+
+        self.assertEqual(result['requests'], 3)
+        self.assertEqual(len(service.calls), 4 + 1 + 1)
+        self.assertIsNotNone(result['responses'][1])
+        self.assertEqual([(f['index'], f['status']) for f in result['failed']], [(2, 400)])
+
+    def test_gives_up_after_max_attempts(self):
+        service = FakeCalendarService()
+        service.fail = {'event 0': 500}
+        result = calendar_batch.execute_batched(service, self.inserts(1), max_attempts=2)
+        self.assertEqual(result['requests'], 2)
+        self.assertEqual(result['failed'][0]['summary'], 'event 0')
+
+    def test_on_batch_reports_completed_calls(self):
+        completed = []
+        calendar_batch.execute_batched(FakeCalendarService(), self.inserts(3), batch_size=2,
+                                       on_batch=completed.append)
+        self.assertEqual([[idx for idx, _, _ in batch] for batch in completed], [[0, 1], [2]])
+
+    def test_is_retryable(self):
+        self.assertTrue(calendar_batch.is_retryable(http_error(503)))
+        self.assertTrue(calendar_batch.is_retryable(http_error(403, 'rateLimitExceeded')))
+        self.assertFalse(calendar_batch.is_retryable(http_error(403, 'forbidden')))
+        self.assertFalse(calendar_batch.is_retryable(http_error(400)))
+        self.assertTrue(calendar_batch.is_retryable(ConnectionResetError()))
+        self.assertFalse(calendar_batch.is_retryable(None))
+
+    def test_roadmap_event_items(self):
+        items = views.roadmap_event_items(sample_roadmap(weeks=2), self.START)
+        keys = [key for key, _ in items]
+        self.assertEqual(keys[:6], ['week-1', 'day-1-0', 'day-1-1', 'day-1-2', 'day-1-3', 'day-1-4'])
+        self.assertEqual(len(keys), 2 * 6 + 1)
+        self.assertEqual(keys[-1], 'project-todo-api')
+
+        events = dict(items)
+        self.assertEqual(events['week-1']['start']['date'], '2026-01-05')
+        self.assertEqual(events['day-2-4']['start']['date'], '2026-01-16')
+        self.assertEqual(events['project-todo-api']['end']['date'], '2026-01-12')
+
+
+# ============================================================================
+# Agent job queue
+# ============================================================================
+
+class JobExecutorTests(SimpleTestCase):
+    def test_queue_full(self):
+        executor = JobExecutor('test', workers=1, queue_size=2, default_duration=10.0)
+        running, release = threading.Event(), threading.Event()
+
+        def _block():
+            running.set()
+            release.wait(5)
+
+        try:
+            self.assertEqual(executor.submit('running', _block), 1)
+            self.assertTrue(running.wait(5))
+            self.assertEqual(executor.submit('a', release.wait, 5), 1)
+            self.assertEqual(executor.submit('b', release.wait, 5), 2)
+            with self.assertRaises(QueueFull) as raised:
+                executor.submit('c', release.wait, 5)
+            self.assertEqual(raised.exception.retry_after, 10)
+            self.assertEqual(executor.stats(), {'workers': 1, 'queue_size': 2, 'queued': 2, 'running': 1})
+        finally:
+            release.set()
+
+    def test_failing_job_does_not_stop_the_worker(self):
+        executor = JobExecutor('test', workers=1, queue_size=2)
+        done = threading.Event()
+        executor.submit('bad', lambda: 1 / 0)
+        executor.submit('good', done.set)
+        self.assertTrue(done.wait(5))
+
+    def test_retry_after_follows_job_duration(self):
+        executor = JobExecutor('test', workers=4, queue_size=2, default_duration=30.0)
+        self.assertEqual(executor.retry_after(), 8)
+
+
+class RunAgentViewTests(TestCase):
+    DATA = {'skillset': 'python', 'interest': 'web'}
+
+    def post(self, data):
+        return self.client.post('/api/run_agent/', json.dumps(data), content_type='application/json')
+
+    def test_validation(self):
+        self.assertEqual(self.post({'skillset': 'python'}).status_code, 400)
+        self.assertEqual(self.post({**self.DATA, 'agent_mode': 'magic'}).status_code, 400)
+
+    def test_queue_full_returns_429(self):
+        with mock.patch.object(views.agent_executor, 'submit', side_effect=QueueFull(12)):
+            response = self.post(self.DATA)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '12')
+        self.assertEqual(response.json()['retry_after'], 12)
+        self.assertEqual(AgentTask.objects.count(), 0)
+
+    def test_job_is_queued(self):
+        with mock.patch.object(views.agent_executor, 'submit', return_value=3) as submit:
+            body = self.post({**self.DATA, 'agent_mode': 'structured'}).json()
+        self.assertTrue(body['success'])
+        self.assertEqual(body['queue_position'], 3)
+        self.assertEqual(submit.call_args.args[0], body['task_id'])
+        self.assertEqual(submit.call_args.args[-1], 'structured')
+
+
+# ============================================================================
+# Task store
+# ============================================================================
+
+class TaskStoreTests(TestCase):
+    def test_state_changes_and_queue_position(self):
+        task_store.create_task('t1', 'queued')
+        task_store.create_task('t2', 'queued')
+        task_store.create_task('c1', 'queued', kind=AgentTask.KIND_CALENDAR, payload={'owner': 'x'})
+
+        self.assertEqual(task_store.get_task('t2')['queue_position'], 2)
+        self.assertEqual(task_store.get_task('c1')['queue_position'], 1)
+
+        task_store.update_task('t1', status='in_progress', message='working')
+        self.assertEqual(task_store.get_task('t1')['queue_position'], 0)
+        self.assertEqual(task_store.get_task('t2')['queue_position'], 1)
+
+        task_store.update_task('t1', status='completed', repo_url='https://example.com/r')
+        task = task_store.get_task('t1')
+        self.assertEqual((task['status'], task['repo_url'], task['queue_position']),
+                         ('completed', 'https://example.com/r', None))
+        self.assertNotIn('kind', task)
+        self.assertIsNone(task_store.get_task('missing'))
+
+    def test_unknown_field(self):
+        task_store.create_task('t1', 'queued')
+        with self.assertRaises(ValueError):
+            task_store.update_task('t1', owner='x')
+
+    def test_prune_removes_old_tasks(self):
+        task_store.create_task('old', 'queued')
+        task_store.create_task('new', 'queued')
+        AgentTask.objects.filter(task_id='old').update(
+            updated_at=timezone.now() - timedelta(seconds=task_store.TASK_TTL + 60)
+        )
+        self.assertEqual(task_store.prune_tasks(), 1)
+        self.assertEqual(list(AgentTask.objects.values_list('task_id', flat=True)), ['new'])
+
+    def test_status_endpoint_reads_the_store(self):
+        task_store.create_task('t1', 'Agent queued...')
+        body = self.client.get('/api/run_agent_status/t1/').json()
+        self.assertEqual(body['task']['status'], 'queued')
+        self.assertEqual(body['task']['queue_position'], 1)
+        self.assertEqual(self.client.get('/api/run_agent_status/missing/').status_code, 404)
+
+
+# ============================================================================
+# Concurrent agent LLM calls
+# ============================================================================
+
+class ConcurrentLLMCallTests(SimpleTestCase):
+    def test_calls_run_concurrently_and_keep_their_order(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _call(value):
+            barrier.wait()   # only returns once both calls are running
+            return value
+
+        self.assertEqual(views.run_llm_calls((_call, 'lang'), (_call, 'name')), ['lang', 'name'])
+
+    def test_timeout_bounds_the_whole_group(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        futures = views.submit_llm_calls((lambda: 'fast',), (release.wait, 5))
+        with self.assertRaises(TimeoutError):
+            views.collect_llm_results(futures, timeout=0.05)
+
+    def test_errors_propagate(self):
+        def _fail():
+            raise ValueError('bad completion')
+
+        with self.assertRaises(ValueError):
+            views.run_llm_calls((_fail,), (lambda: 'ok',))
+
+
+# ============================================================================
+# Structured agent plan
+# ============================================================================
+
+class StructuredPlanTests(SimpleTestCase):
+    PLAN = {
+        'project': 'Todo API: a small REST service',
+        'language_extension': '.PY',
+        'repo_name': 'Todo API_Service',
+        'readme': '# Todo API',
+        'starter_code': 'print("todo")',
+    }
+
+    def plan(self, *responses, **fallbacks):
+        client, create = fake_groq(*responses)
+        patches = [mock.patch.object(views, 'github_client', client)] + [
+            mock.patch.object(views, name, mock.Mock(return_value=value)) for name, value in fallbacks.items()
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return views.plan_project_structured('python', 'web', 'backend'), create
+
+    def test_complete_plan_needs_one_call(self):
+        plan, create = self.plan(completion(json.dumps(self.PLAN)))
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(create.call_args.kwargs['response_format'], {'type': 'json_object'})
+        self.assertEqual(plan, {
+            'project': 'Todo API: a small REST service',
+            'lang': 'py',
+            'repo_name': 'todo-api-service',
+            'readme': '# Todo API',
+            'starter_code': 'print("todo")',
+            'fallbacks': [],
+        })
+
+    def test_invalid_fields_fall_back_to_per_field_calls(self):
+        reply = {**self.PLAN, 'language_extension': 'Python 3 script', 'readme': '  ', 'repo_name': '!!!'}
+        plan, _ = self.plan(completion(json.dumps(reply)), get_lang='py', get_name='todo-api',
+                            decide_readme='# From fallback', decide_starter='unused')
+
+        self.assertEqual(plan['fallbacks'], ['lang', 'repo_name', 'readme'])
+        self.assertEqual((plan['lang'], plan['repo_name'], plan['readme']), ('py', 'todo-api', '# From fallback'))
+        self.assertEqual(plan['starter_code'], 'print("todo")')
+        views.decide_readme.assert_called_once_with(self.PLAN['project'], 'py')
+        views.decide_starter.assert_not_called()
+
+    def test_failed_call_falls_back_for_every_field(self):
+        plan, _ = self.plan(completion('not json'), decide_project='Blog engine', get_lang='js',
+                            get_name='blog', decide_readme='# Blog', decide_starter='console.log(1)')
+        self.assertEqual(plan['fallbacks'], ['project', 'lang', 'repo_name', 'readme', 'starter_code'])
+        self.assertEqual(plan['project'], 'Blog engine')
+        views.get_lang.assert_called_once_with('Blog engine')
+
+
+# ============================================================================
+# Single-commit push
+# ============================================================================
+
+@mock.patch.object(views.time, 'sleep', lambda seconds: None)
+class PushFilesTests(SimpleTestCase):
+    FILES = {'README.md': '# App', 'main.py': 'print(1)'}
+
+    def github(self, overrides=None):
+        script = {
+            ('GET', '/git/ref/heads/main'): [(200, {'object': {'sha': 'base'}})],
+            ('POST', '/git/trees'): [(201, {'sha': 'tree1'})],
+            ('POST', '/git/commits'): [(201, {'sha': 'commit1'})],
+            ('PATCH', '/git/refs/heads/main'): [(200, {})],
+        }
+        script.update(overrides or {})
+        session = FakeGitHubSession(script)
+        patcher = mock.patch.object(views, 'github_session', lambda: session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return session
+
+    def test_files_are_pushed_in_one_commit(self):
+        session = self.github()
+        self.assertTrue(views.push_files('app', self.FILES))
+
+        self.assertEqual([(method, path) for method, path, _ in session.calls], [
+            ('GET', 'ref/heads/main'), ('POST', 'trees'), ('POST', 'commits'), ('PATCH', 'refs/heads/main'),
+        ])
+        tree, commit, ref = (body for _, _, body in session.calls[1:])
+        self.assertEqual([(e['path'], e['content']) for e in tree['tree']], list(self.FILES.items()))
+        self.assertEqual((commit['tree'], commit['parents']), ('tree1', ['base']))
+        self.assertEqual(ref, {'sha': 'commit1'})
+
+    def test_branch_is_polled_until_ready(self):
+        session = self.github({('GET', '/git/ref/heads/main'): [(404, {}), (409, {}), (200, {'object': {'sha': 'base'}})]})
+        self.assertEqual(views.wait_for_branch('app', 'main'), 'base')
+        self.assertEqual(len(session.calls), 3)
+
+    def test_branch_that_never_appears(self):
+        self.github({('GET', '/git/ref/heads/main'): [(404, {})]})
+        self.assertIsNone(views.wait_for_branch('app', 'main', timeout=0.01))
+
+    def test_failed_step_stops_the_push(self):
+        session = self.github({('POST', '/git/trees'): [(422, {})]})
+        self.assertFalse(views.push_files('app', self.FILES))
+        self.assertEqual([method for method, _, _ in session.calls], ['GET', 'POST'])
+
+
+# ============================================================================
+# Task progress stream
+# ============================================================================
+
+class TaskProgressStreamTests(TestCase):
+    def stream(self, task_id):
+        return self.client.get(f'/api/run_agent_progress/{task_id}/')
+
+    def test_unknown_task(self):
+        self.assertEqual(self.stream('missing').status_code, 404)
+
+    def test_finished_task_ends_with_done(self):
+        task_store.create_task('t1', 'queued')
+        task_store.update_task('t1', status='completed', repo_url='https://example.com/r')
+
+        response = self.stream('t1')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(body.startswith(f'retry: {views.TASK_STREAM_RETRY_MS}\n\n'))
+        response.streaming_content = [body.encode('utf-8')]
+        self.assertEqual([event for event, _ in sse_events(response)], ['done'])
+
+    def test_changes_are_pushed_until_done(self):
+        task_store.create_task('t1', 'queued')
+        running = task_store.get_task('t1') | {'status': 'in_progress', 'queue_position': 0}
+        pushing = running | {'message': 'Pushing files'}
+        states = [running, running, running, pushing, pushing, pushing | {'status': 'completed'}]
+
+        with mock.patch.object(task_store, 'get_task', side_effect=states), \
+                mock.patch.object(task_store, 'wait_for_update', lambda version, timeout: version + 1):
+            events = sse_events(self.stream('t1'))
+
+        self.assertEqual([event for event, _ in events], ['progress', 'progress', 'done'])
+        self.assertEqual(events[1][1]['message'], 'Pushing files')
+
+    def test_window_ends_without_done(self):
+        task_store.create_task('t1', 'queued')
+        with mock.patch.object(views, 'TASK_STREAM_TIMEOUT', 0):
+            events = sse_events(self.stream('t1'))
+        self.assertEqual([(event, task['status']) for event, task in events], [('progress', 'queued')])
+
+    def test_wait_for_update(self):
+        version = task_store.current_version()
+        self.assertEqual(task_store.wait_for_update(version, 0.01), version)
+
+        timer = threading.Timer(0.05, task_store._notify)
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertGreater(task_store.wait_for_update(version, 5), version)
+
+
+# ============================================================================
+# GitHub HTTP sessions
+# ============================================================================
+
+class GitHubRetryTests(SimpleTestCase):
+    def setUp(self):
+        session = http.build_session(retries=3, backoff=0)
+        self.retry = session.get_adapter('https://api.github.com').max_retries
+
+    def test_idempotent_methods_retry_server_errors(self):
+        for status in http.RETRY_STATUSES:
+            self.assertTrue(self.retry.is_retry('GET', status))
+            self.assertTrue(self.retry.is_retry('PUT', status))
+        self.assertFalse(self.retry.is_retry('GET', 404))
+
+    def test_post_and_patch_are_not_replayed(self):
+        for method in ('POST', 'PATCH'):
+            self.assertFalse(self.retry.is_retry(method, 502))
+            self.assertFalse(self.retry.is_retry(method, 503))
+            self.assertFalse(self.retry.is_retry(method, 429))
+            self.assertFalse(self.retry.is_retry(method, 502, has_retry_after=True))
+
+    def test_refused_post_is_retried_with_retry_after(self):
+        self.assertTrue(self.retry.is_retry('POST', 429, has_retry_after=True))
+        self.assertTrue(self.retry.is_retry('PATCH', 503, has_retry_after=True))
+        exhausted = self.retry.new(total=0)
+        self.assertFalse(exhausted.is_retry('POST', 429, has_retry_after=True))
+
+    def test_read_errors_only_retry_idempotent_methods(self):
+        from urllib3.exceptions import ReadTimeoutError
+
+        error = ReadTimeoutError(None, '/user/repos', 'read timed out')
+        self.assertEqual(self.retry.increment('GET', '/user/repos', error=error).total, 2)
+        with self.assertRaises(ReadTimeoutError):
+            self.retry.increment('POST', '/user/repos', error=error)
+
+    def test_endpoint_name(self):
+        self.assertEqual(http.endpoint_name('put', 'https://api.github.com/repos/me/app/contents/src/main.py'),
+                         'PUT /repos/{owner}/{repo}/contents/{path}')
+        self.assertEqual(http.endpoint_name('PATCH', 'https://api.github.com/repos/me/app/git/refs/heads/main'),
+                         'PATCH /repos/{owner}/{repo}/git/refs/heads/{name}')
+        self.assertEqual(http.endpoint_name('POST', 'https://api.github.com/user/repos'), 'POST /user/repos')
+
+
+# ============================================================================
+# Groq rate limiting
+# ============================================================================
+
+class RateLimitSchedulerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = rate_limit.RateLimitScheduler(rpm=30, tpm=6000, clock=self.clock)
+
+    def test_buckets_refill_with_time(self):
+        for _ in range(30):
+            self.scheduler.acquire(100, max_wait=0)
+        budget = self.scheduler.snapshot()
+        self.assertEqual((budget['requests_available'], budget['tokens_available']), (0, 3000))
+
+        self.clock.advance(10)
+        budget = self.scheduler.snapshot()
+        self.assertEqual((budget['requests_available'], budget['tokens_available']), (5, 4000))
+
+        self.clock.advance(60)
+        self.assertEqual(self.scheduler.snapshot()['requests_available'], 30)
+
+    def test_wait_beyond_max_wait_is_rejected(self):
+        self.scheduler.acquire(6000, max_wait=0)
+        with self.assertRaises(rate_limit.RateLimitWaitExceeded) as raised:
+            self.scheduler.acquire(3000, max_wait=5)
+        self.assertEqual(raised.exception.retry_after, 30)
+        self.assertEqual(self.scheduler.snapshot()['waiting'], 0)
+
+    def test_release_refunds_unused_tokens(self):
+        ticket = self.scheduler.acquire(4000, max_wait=0)
+        self.scheduler.release(ticket, used_tokens=1000)
+        self.assertEqual(self.scheduler.snapshot()['tokens_available'], 5000)
+
+    def test_interactive_calls_go_first(self):
+        for _ in range(30):
+            self.scheduler.acquire(1, max_wait=0)
+
+        granted = []
+
+        def call(priority):
+            self.scheduler.acquire(1, priority=priority, max_wait=600)
+            granted.append(priority)
+
+        threads = [threading.Thread(target=call, args=(rate_limit.PRIORITY_BACKGROUND,))]
+        threads[0].start()
+        while self.scheduler.snapshot()['waiting'] < 1:
+            threading.Event().wait(0.001)
+        threads.append(threading.Thread(target=call, args=(rate_limit.PRIORITY_INTERACTIVE,)))
+        threads[1].start()
+        while self.scheduler.snapshot()['waiting'] < 2:
+            threading.Event().wait(0.001)
+
+        # One request's worth of refill, then wake the waiters
+        self.clock.advance(2)
+        self.scheduler.observe({})
+        threads[1].join(5)
+        self.assertEqual(granted, [rate_limit.PRIORITY_INTERACTIVE])
+
+        self.clock.advance(2)
+        self.scheduler.observe({})
+        threads[0].join(5)
+        self.assertEqual(granted, [rate_limit.PRIORITY_INTERACTIVE, rate_limit.PRIORITY_BACKGROUND])
+
+    def test_headers_correct_the_budget(self):
+        self.scheduler.observe({'x-ratelimit-limit-tokens': '12000', 'x-ratelimit-remaining-tokens': '2500'})
+        budget = self.scheduler.snapshot()
+        self.assertEqual((budget['tpm'], budget['tokens_available']), (12000, 2500))
+
+        self.scheduler.observe({'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '2m30s'})
+        self.assertEqual(self.scheduler.snapshot()['blocked_for'], 150)
+
+        self.clock.advance(150)
+        self.scheduler.observe({'retry-after': '7'}, rate_limited=True)
+        budget = self.scheduler.snapshot()
+        self.assertEqual((budget['blocked_for'], budget['rate_limited']), (7, 1))
+        with self.assertRaises(rate_limit.RateLimitWaitExceeded) as raised:
+            self.scheduler.acquire(1, max_wait=1)
+        self.assertEqual(raised.exception.retry_after, 7)
+
+    def test_parse_duration(self):
+        self.assertEqual(rate_limit.parse_duration('7.5s'), 7.5)
+        self.assertEqual(rate_limit.parse_duration('2m59.5s'), 179.5)
+        self.assertEqual(rate_limit.parse_duration('120ms'), 0.12)
+        self.assertEqual(rate_limit.parse_duration('3'), 3)
+        self.assertIsNone(rate_limit.parse_duration('soon'))
+
+    def test_acquire_async_waits_for_budget(self):
+        for _ in range(30):
+            self.scheduler.acquire(1, max_wait=0)
+
+        async def sleep(seconds):
+            self.clock.advance(seconds)
+
+        started = self.clock.now
+        with mock.patch.object(rate_limit.asyncio, 'sleep', sleep):
+            ticket = asyncio.run(self.scheduler.acquire_async(1, max_wait=10))
+        self.assertEqual(ticket.tokens, 1)
+        self.assertAlmostEqual(self.clock.now - started, 2, places=1)
+        self.assertEqual(self.scheduler.snapshot()['waited'], 1)
+
+    def test_scheduled_client_observes_headers_and_refunds(self):
+        response = completion('ok')
+        response.usage = SimpleNamespace(total_tokens=200, prompt_tokens=100, completion_tokens=100)
+        raw = SimpleNamespace(headers={'x-ratelimit-remaining-tokens': '5000'}, parse=lambda: response)
+        create = mock.Mock(return_value=raw)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            with_raw_response=SimpleNamespace(create=create)
+        )))
+        groq = rate_limit.ScheduledGroq(client, 'test-key', completion_estimate=1024, name='test')
+        groq.scheduler = self.scheduler
+
+        result = groq.chat.completions.create(messages=[{'role': 'user', 'content': 'x' * 400}], max_tokens=500)
+
+        self.assertIs(result, response)
+        # 600 reserved (100 prompt + 500 completion), capped to 5000, 400 refunded
+        self.assertEqual(self.scheduler.snapshot()['tokens_available'], 5400)
+
+
+# ============================================================================
+# Truncated replies
+# ============================================================================
+
+class JsonRepairTests(SimpleTestCase):
+    def test_valid_json_is_returned_untouched(self):
+        obj, info = repair_json('{"roadmap": ["a", "b"]}')
+        self.assertEqual(obj, {'roadmap': ['a', 'b']})
+        self.assertFalse(info['repaired'])
+
+    def test_truncated_item_is_dropped_whole(self):
+        text = '{"summary": "s", "projects": [{"name": "One", "tech_stack": ["py"]}, {"name": "Tw'
+        obj, info = repair_json(text)
+        self.assertEqual(obj, {'summary': 's', 'projects': [{'name': 'One', 'tech_stack': ['py']}]})
+        self.assertTrue(info['repaired'])
+        self.assertGreater(info['dropped_chars'], 0)
+
+    def test_truncated_inside_string_with_brackets(self):
+        text = '{"roadmap": ["Learn [lists]", "Read {dicts}", "Unfinished ]'
+        obj, _ = repair_json(text)
+        self.assertEqual(obj, {'roadmap': ['Learn [lists]', 'Read {dicts}']})
+
+    def test_fence_prose_and_trailing_commas(self):
+        text = 'Here you go:\n```json\n{"roadmap": ["a", "b",], "projects": [],}\n```'
+        obj, _ = repair_json(text)
+        self.assertEqual(obj, {'roadmap': ['a', 'b'], 'projects': []})
+
+    def test_nothing_salvageable(self):
+        self.assertIsNone(repair_json('no json here')[0])
+        self.assertIsNone(repair_json('{"summary": "cut')[0])
+
+
+class TruncatedRoadmapTests(TestCase):
+    PROFILE = {'skillset': 'python', 'interest': 'web apis', 'goal': 'backend job'}
+
+    def test_repaired_reply_is_flagged_partial(self):
+        cut = COMPACT_REPLY.index('["Deploy"]') + 4
+        result = views.parse_roadmap_response(COMPACT_REPLY[:cut])
+        self.assertTrue(result['partial'])
+        self.assertEqual(result['weekly_schedule'], [{'week': 1, 'tasks': ['Learn HTTP', 'Build CRUD']}])
+        self.assertFalse(views.is_cacheable_roadmap(result))
+
+    def test_unparseable_reply_keeps_raw_text(self):
+        result = views.parse_roadmap_response('Sorry, I cannot help with that.')
+        self.assertIn('parse_error', result)
+        self.assertEqual(result['raw_response'], 'Sorry, I cannot help with that.')
+        self.assertEqual(result['weekly_schedule'], [])
+
+    def test_restarted_continuation_is_ignored(self):
+        cut = COMPACT_REPLY.index('"ws"') + 20
+        result = views.parse_truncated_roadmap(COMPACT_REPLY[:cut], 'Here is the full roadmap again: {"s": "')
+        self.assertTrue(result['partial'])
+        self.assertEqual(len(result['roadmap']), 2)
+
+    def test_truncated_reply_is_continued(self):
+        cut = COMPACT_REPLY.index('"ws"')
+        client, create = fake_groq(
+            completion(COMPACT_REPLY[:cut + 20], finish_reason='length'),
+            completion('```json\n' + COMPACT_REPLY[cut + 20:] + '\n```'),
+        )
+        with mock.patch.object(views, 'roadmap_client', client):
+            response = self.client.post('/api/generate_roadmap/', json.dumps(self.PROFILE),
+                                        content_type='application/json')
+        data = response.json()['data']
+        self.assertEqual(create.call_count, 2)
+        self.assertNotIn('partial', data)
+        self.assertEqual(len(data['weekly_schedule']), 2)
+
+
+# ============================================================================
+# Compact roadmap schema
+# ============================================================================
+
+class RoadmapSchemaTests(SimpleTestCase):
+    def test_expand_compact_roadmap(self):
+        compact = {
+            's': 'Summary',
+            'm': ['M1', 'M2'],
+            'p': [{'n': 'P1', 'd': 'Desc', 'w': 2, 't': ['django', 'react']}, ['P2', 'D2', 1, 'go, sql']],
+            'ws': [['Learn HTTP', 'Build CRUD'], 'Deploy'],
+            'r': [['Django docs', 'doc'], ['Some site', 'website']],
+        }
+        self.assertTrue(roadmap_schema.is_compact(compact))
+        self.assertEqual(roadmap_schema.expand_roadmap(compact), {
+            'summary': 'Summary',
+            'roadmap': ['M1', 'M2'],
+            'projects': [
+                {'name': 'P1', 'description': 'Desc', 'duration_weeks': 2, 'tech_stack': ['django', 'react']},
+                {'name': 'P2', 'description': 'D2', 'duration_weeks': 1, 'tech_stack': ['go', 'sql']},
+            ],
+            'weekly_schedule': [
+                {'week': 1, 'tasks': ['Learn HTTP', 'Build CRUD']},
+                {'week': 2, 'tasks': ['Deploy']},
+            ],
+            'resources': [{'name': 'Django docs', 'type': 'doc'}, {'name': 'Some site', 'type': 'doc'}],
+        })
+
+    def test_full_schema_is_not_compact(self):
+        self.assertFalse(roadmap_schema.is_compact({'roadmap': [], 'm': []}))
+        self.assertFalse(roadmap_schema.is_compact(['m']))
+
+    def test_missing_arrays_default_to_empty(self):
+        expanded = roadmap_schema.expand_roadmap({'s': 'x', 'm': ['a']})
+        self.assertEqual(expanded['projects'], [])
+        self.assertEqual(expanded['weekly_schedule'], [])
+
+    def test_plan_size_grows_with_goal_complexity(self):
+        simple = roadmap_schema.plan_size('html', 'web', 'build a site')
+        complex_ = roadmap_schema.plan_size('python', 'machine learning', 'advanced distributed systems')
+        self.assertEqual(simple['milestones'], 5)
+        self.assertEqual(complex_['milestones'], 7)
+        self.assertEqual(complex_['projects'], 5)
+
+    def test_token_budget(self):
+        plan = roadmap_schema.plan_size('html', 'web', '')
+        compact = roadmap_schema.token_budget(plan, compact=True)
+        full = roadmap_schema.token_budget(plan, compact=False)
+        self.assertLess(compact, full)
+        self.assertGreaterEqual(compact, roadmap_schema.ROADMAP_MIN_TOKENS)
+        huge = dict(plan, weeks=500)
+        self.assertEqual(roadmap_schema.token_budget(huge, compact=False), roadmap_schema.ROADMAP_MAX_TOKENS)
+
+    def test_parse_roadmap_response_expands_compact_reply(self):
+        reply = '```json\n{"s": "x", "m": ["a"], "ws": [["Learn HTTP"]]}\n```'
+        result = views.parse_roadmap_response(reply)
+        self.assertEqual(result['weekly_schedule'], [{'week': 1, 'tasks': ['Learn HTTP']}])
+        self.assertNotIn('partial', result)
+
+    def test_prompt_asks_for_the_planned_sizes(self):
+        plan = roadmap_schema.plan_size('html', 'web', '')
+        prompt = views.build_roadmap_prompt('html', 'web', '', plan=plan, compact=True)
+        self.assertIn(f"array of exactly {plan['weeks']} entries", prompt)
+        self.assertNotIn('weekly_schedule', prompt)
+        self.assertIn('"weekly_schedule"', views.build_roadmap_prompt('html', 'web', '', plan=plan, compact=False))
+
+    def test_week_tasks_render_as_text(self):
+        self.assertEqual(views.week_tasks_text(['Learn HTTP', 'Build CRUD']), '- Learn HTTP\n- Build CRUD')
+        self.assertEqual(views.week_tasks_text('Read the docs'), 'Read the docs')
+
+        items = dict(views.roadmap_event_items(sample_roadmap(weeks=1), datetime.date(2026, 1, 5)))
+        self.assertIn('- Learn HTTP\n- Build CRUD', items['week-1']['description'])
+        self.assertIn('- Learn HTTP\n- Build CRUD', items['day-1-0']['description'])
+        self.assertNotIn("['", items['week-1']['description'])
+
+
+# ============================================================================
+# Lazy client providers
+# ============================================================================
+
+class LazyProviderTests(SimpleTestCase):
+    def test_factory_runs_once_under_concurrent_first_use(self):
+        barrier = threading.Barrier(8)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            threading.Event().wait(0.02)
+            return object()
+
+        provider = LazyProvider(factory)
+        results = []
+
+        def use():
+            barrier.wait()
+            results.append(provider.get())
+
+        threads = [threading.Thread(target=use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_nothing_is_built_until_used(self):
+        factory = mock.Mock(return_value=SimpleNamespace(chat='chat'))
+        provider = LazyProvider(factory)
+        factory.assert_not_called()
+
+        self.assertEqual(provider.chat, 'chat')
+        self.assertEqual(provider.chat, 'chat')
+        factory.assert_called_once_with()
+
+    def test_private_names_are_not_forwarded(self):
+        factory = mock.Mock(return_value=SimpleNamespace(_secret=1))
+        provider = LazyProvider(factory)
+        with self.assertRaises(AttributeError):
+            provider._secret
+        factory.assert_not_called()
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+class MetricsTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter_and_histogram_text(self):
+        calls = self.registry.register(metrics.Counter('app_calls_total', 'Calls', ('service',)))
+        latency = self.registry.register(metrics.Histogram('app_seconds', 'Latency', (), buckets=(0.1, 1.0)))
+        calls.inc(service='github')
+        calls.inc(2, service='github')
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        self.assertEqual(self.registry.render().splitlines(), [
+            '# HELP app_calls_total Calls',
+            '# TYPE app_calls_total counter',
+            'app_calls_total{service="github"} 3',
+            '# HELP app_seconds Latency',
+            '# TYPE app_seconds histogram',
+            'app_seconds_bucket{le="0.1"} 1',
+            'app_seconds_bucket{le="1.0"} 2',
+            'app_seconds_bucket{le="+Inf"} 3',
+            'app_seconds_sum 5.55',
+            'app_seconds_count 3',
+        ])
+
+    def test_label_values_are_escaped(self):
+        calls = self.registry.register(metrics.Counter('app_calls_total', 'Calls', ('operation',)))
+        calls.inc(operation='say "hi"\\\n')
+        self.assertIn('app_calls_total{operation="say \\"hi\\"\\\\\\n"} 1', self.registry.render())
+
+    def test_collectors_render_numeric_gauges(self):
+        self.registry.register_collector('app_queue', 'Job queue', lambda: {
+            (('pool', 'agent'),): {'running': 2, 'enabled': True, 'name': 'agent'},
+            None: {'size': 4.5},
+        })
+        self.registry.register_collector('app_broken', 'Broken', lambda: 1 / 0)
+
+        self.assertEqual(self.registry.render().splitlines(), [
+            '# HELP app_queue_running Job queue',
+            '# TYPE app_queue_running gauge',
+            'app_queue_running{pool="agent"} 2',
+            '# HELP app_queue_size Job queue',
+            '# TYPE app_queue_size gauge',
+            'app_queue_size 4.5',
+        ])
+
+    def test_timed_stage_counts_falsy_results_as_errors(self):
+        histogram = metrics.Histogram('app_stage_seconds', 'Stages', ('stage', 'outcome'))
+        with mock.patch.object(metrics, 'agent_stage_seconds', histogram):
+            metrics.timed_stage('push')(lambda ok: ok)(True)
+            metrics.timed_stage('push')(lambda ok: ok)(False)
+            with self.assertRaises(ZeroDivisionError):
+                metrics.timed_stage('push')(lambda: 1 / 0)()
+
+        counts = [line for line in histogram.collect() if '_count' in line]
+        self.assertEqual(counts, [
+            'app_stage_seconds_count{stage="push",outcome="error"} 2',
+            'app_stage_seconds_count{stage="push",outcome="ok"} 1',
+        ])
+
+    def test_metrics_view(self):
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE malumai_calendar_events_total counter', response.content.decode('utf-8'))
+
+
+# ============================================================================
+# Profile similarity
+# ============================================================================
+
+class SimilarityIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SimilarityIndex()
+        self.index.add('django', profile_tokens('python, django', 'web apps', 'backend api services'))
+        self.index.add('react', profile_tokens('javascript, react', 'frontend', ''))
+
+    def test_reworded_profile_is_exact_match(self):
+        tokens = profile_tokens('django and python dev', 'web app', 'backend apis service')
+        self.assertEqual(self.index.query(tokens, 0.8), ('django', 1.0))
+
+    def test_aliases(self):
+        self.assertEqual(self.index.query(profile_tokens('js, reactjs', 'front', ''), 0.8), ('react', 1.0))
+
+    def test_near_duplicate_above_threshold(self):
+        tokens = profile_tokens('python, django', 'web apps', 'backend api services docker')
+        key, similarity = self.index.query(tokens, 0.8)
+        self.assertEqual(key, 'django')
+        self.assertLess(similarity, 1.0)
+        self.assertGreaterEqual(similarity, 0.8)
+
+    def test_distant_profile_misses(self):
+        self.assertIsNone(self.index.query(profile_tokens('rust', 'embedded', 'firmware'), 0.8))
+
+    def test_exclude_and_remove(self):
+        tokens = profile_tokens('python, django', 'web apps', 'backend api services')
+        self.assertIsNone(self.index.query(tokens, 0.8, exclude='django'))
+        self.index.remove('django')
+        self.assertNotIn('django', self.index)
+        self.assertIsNone(self.index.query(tokens, 0.8))
+        self.assertEqual(len(self.index), 1)
+
+
+
+class SimilarRoadmapLookupTests(TestCase):
+    def setUp(self):
+        isolate_caches(self)
+
+    def test_reworded_profile_reuses_stored_roadmap(self):
+        roadmap_cache.store_roadmap('python, django', 'web apps', 'backend api services', sample_roadmap())
+
+        roadmap, flags = views.lookup_cached_roadmap('Django and Python dev', 'web app', 'backend apis service')
+        self.assertEqual(roadmap, sample_roadmap())
+        self.assertEqual(flags, {'cached': True, 'similarity': 1.0})
+
+        self.assertEqual(views.lookup_cached_roadmap('rust', 'embedded', 'firmware'), (None, None))
+
+
+# ============================================================================
+# Stored roadmaps
+# ============================================================================
+
+class RoadmapStoreTests(TestCase):
+    PROFILE = ('python', 'web apis', 'backend job')
+
+    def setUp(self):
+        isolate_caches(self)
+
+    def test_roadmap_is_stored_compressed_under_its_hash(self):
+        roadmap = sample_roadmap(weeks=12)
+        roadmap_id = roadmap_store.save_roadmap(*self.PROFILE, roadmap)
+
+        self.assertTrue(roadmap_store.is_roadmap_id(roadmap_id))
+        self.assertEqual(roadmap_id, roadmap_store.make_roadmap_id(dict(roadmap)))
+        self.assertEqual(roadmap_store.save_roadmap(*self.PROFILE, roadmap), roadmap_id)
+        row = StoredRoadmap.objects.get()
+        self.assertLess(len(bytes(row.data)), row.size / 2)
+        self.assertFalse(row.partial)
+        self.assertEqual(roadmap_store.get_profile(roadmap_id),
+                         dict(zip(('skillset', 'interest', 'goal'), self.PROFILE)))
+
+    def test_loads_come_from_memory_and_return_copies(self):
+        roadmap_id = roadmap_store.save_roadmap(*self.PROFILE, sample_roadmap())
+        with self.assertNumQueries(0):
+            loaded = roadmap_store.load_roadmap(roadmap_id)
+        loaded['summary'] = 'changed'
+        self.assertEqual(roadmap_store.load_roadmap(roadmap_id), sample_roadmap())
+
+    def test_memory_keeps_the_most_recent_roadmaps(self):
+        with mock.patch.object(roadmap_store, 'ROADMAP_STORE_MEMORY', 2):
+            ids = [roadmap_store.save_roadmap(*self.PROFILE, sample_roadmap(weeks=weeks)) for weeks in (1, 2, 3)]
+            self.assertEqual(list(roadmap_store._memory), ids[1:])
+
+            with self.assertNumQueries(1):
+                self.assertEqual(roadmap_store.load_roadmap(ids[0]), sample_roadmap(weeks=1))
+            self.assertEqual(list(roadmap_store._memory), [ids[2], ids[0]])
+
+    def test_unknown_and_malformed_ids(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(roadmap_store.load_roadmap('0' * 32))
+        with self.assertNumQueries(0):
+            self.assertIsNone(roadmap_store.load_roadmap('../etc/passwd'))
+            self.assertIsNone(roadmap_store.get_profile('not-an-id'))
+
+    def test_prune_removes_expired_roadmaps(self):
+        old = roadmap_store.save_roadmap(*self.PROFILE, sample_roadmap(weeks=1))
+        roadmap_store.save_roadmap(*self.PROFILE, sample_roadmap(weeks=2))
+        StoredRoadmap.objects.filter(roadmap_id=old).update(
+            created_at=timezone.now() - timedelta(seconds=roadmap_store.ROADMAP_STORE_TTL + 60)
+        )
+        self.assertEqual(roadmap_store.prune_roadmaps(), 1)
+        self.assertEqual(StoredRoadmap.objects.count(), 1)
+
+    def test_generated_roadmap_gets_a_results_page(self):
+        client, _ = fake_groq(completion(COMPACT_REPLY))
+        with mock.patch.object(views, 'roadmap_client', client):
+            data = self.client.post('/api/generate_roadmap/', json.dumps(dict(zip(
+                ('skillset', 'interest', 'goal'), self.PROFILE
+            ))), content_type='application/json').json()
+
+        self.assertEqual(roadmap_store.load_roadmap(data['roadmap_id']), data['data'])
+        self.assertTrue(data['results_url'].endswith(f"/api/results/{data['roadmap_id']}/"))
+        self.assertEqual(self.client.get(data['results_url']).status_code, 200)
+        self.assertEqual(self.client.get('/api/results/' + '0' * 32 + '/').status_code, 404)
+
+
+# ============================================================================
+# Calendar credentials
+# ============================================================================
+
+class CalendarCredentialTests(TestCase):
+    def setUp(self):
+        from google.oauth2.credentials import Credentials
+
+        self.Credentials = Credentials
+        self.refreshes = 0
+        self.refresh_error = None
+        patcher = mock.patch.object(Credentials, 'refresh', autospec=True, side_effect=self.fake_refresh)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for patcher in (mock.patch.object(calendar_service, '_credentials', OrderedDict()),
+                        mock.patch.object(calendar_service, '_flights', {})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def fake_refresh(self, creds, request):
+        """Stands in for the OAuth token endpoint: slow enough for callers to pile up"""
+        if self.refresh_error:
+            raise self.refresh_error
+        self.refreshes += 1
+        threading.Event().wait(0.05)
+        creds.token = f'token-{self.refreshes}'
+        creds.expiry = datetime.datetime.utcnow() + timedelta(hours=1)
+
+    def credentials(self, token='token-0', expires_in=-60, refresh_token='refresh'):
+        return self.Credentials(
+            token=token, refresh_token=refresh_token, token_uri='https://oauth2.googleapis.com/token',
+            client_id='client', client_secret='secret',
+            expiry=datetime.datetime.utcnow() + timedelta(seconds=expires_in)
+        )
+
+    def test_concurrent_callers_share_one_refresh(self):
+        calendar_service.store_credentials('user:1', self.credentials())
+        conn = connections['default']
+        conn.inc_thread_sharing()
+        self.addCleanup(conn.dec_thread_sharing)
+
+        barrier = threading.Barrier(8)
+        tokens = []
+
+        def call():
+            connections['default'] = conn
+            barrier.wait()
+            tokens.append(calendar_service.get_credentials('user:1').token)
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.refreshes, 1)
+        self.assertEqual(tokens, ['token-1'] * 8)
+        row = OAuthCredential.objects.get(owner='user:1')
+        self.assertEqual((row.version, row.refresh_lease_until), (2, None))
+
+    def test_refresh_by_another_process_is_awaited(self):
+        calendar_service.store_credentials('user:1', self.credentials())
+        OAuthCredential.objects.filter(owner='user:1').update(
+            refresh_lease_until=timezone.now() + timedelta(seconds=30)
+        )
+
+        def other_process_refreshes(seconds):
+            OAuthCredential.objects.filter(owner='user:1').update(
+                token_json=self.credentials(token='elsewhere', expires_in=3600).to_json(),
+                version=2, refresh_lease_until=None
+            )
+
+        with mock.patch.object(calendar_service.time, 'sleep', other_process_refreshes):
+            creds = calendar_service.get_credentials('user:1')
+        self.assertEqual(creds.token, 'elsewhere')
+        self.assertEqual(self.refreshes, 0)
+
+    def test_token_near_expiry_is_refreshed_in_background(self):
+        # Inside CALENDAR_REFRESH_MARGIN, but not yet expired for google-auth
+        calendar_service.store_credentials('user:1', self.credentials(expires_in=280))
+        inline = SimpleNamespace(submit=lambda job: job())
+
+        with mock.patch.object(calendar_service, '_background', inline), \
+                mock.patch('django.db.close_old_connections'):
+            self.assertEqual(calendar_service.get_credentials('user:1').token, 'token-0')
+
+        self.assertEqual(self.refreshes, 1)
+        self.assertEqual(calendar_service.get_credentials('user:1').token, 'token-1')
+
+    def test_revoked_grant_deletes_the_credentials(self):
+        from google.auth.exceptions import RefreshError
+
+        calendar_service.store_credentials('user:1', self.credentials())
+        self.refresh_error = RefreshError('invalid_grant: Token has been revoked')
+        self.assertIsNone(calendar_service.get_credentials('user:1'))
+        self.assertFalse(OAuthCredential.objects.filter(owner='user:1').exists())
+
+    def test_credentials_are_kept_per_owner(self):
+        calendar_service.store_credentials('user:1', self.credentials(token='one', expires_in=3600))
+        calendar_service.store_credentials('user:2', self.credentials(token='two', expires_in=3600))
+        calendar_service._credentials.clear()
+
+        self.assertEqual(calendar_service.get_credentials('user:1').token, 'one')
+        self.assertEqual(calendar_service.get_credentials('user:2').token, 'two')
+        self.assertIsNone(calendar_service.get_credentials('user:3'))
+
+        # Re-consent without a refresh token keeps the stored one
+        calendar_service.store_credentials('user:1', self.credentials(token='again', expires_in=3600,
+                                                                      refresh_token=None))
+        stored = json.loads(OAuthCredential.objects.get(owner='user:1').token_json)
+        self.assertEqual((stored['token'], stored['refresh_token']), ('again', 'refresh'))
+
+    def test_owner_follows_the_browser_session(self):
+        request = SimpleNamespace(user=SimpleNamespace(is_authenticated=False), session={})
+        owner = calendar_service.credential_owner(request)
+        self.assertRegex(owner, r'^session:[0-9a-f]{32}$')
+        self.assertEqual(calendar_service.credential_owner(request), owner)
+        self.assertEqual(calendar_service.credential_owner(SimpleNamespace(
+            user=SimpleNamespace(is_authenticated=True, pk=7), session={}
+        )), 'user:7')
+
+
+# ============================================================================
+# Incremental calendar sync
+# ============================================================================
+
+class CalendarSyncTests(TestCase):
+    OWNER = 'session:test'
+
+    def items(self, **kwargs):
+        return views.roadmap_event_items(sample_roadmap(**kwargs), datetime.date(2026, 1, 5))
+
+    def test_event_id_is_deterministic_base32hex(self):
+        event_id = calendar_sync.event_id(self.OWNER, 'key', 'week-1')
+        self.assertEqual(event_id, calendar_sync.event_id(self.OWNER, 'key', 'week-1'))
+        self.assertNotEqual(event_id, calendar_sync.event_id(self.OWNER, 'key', 'week-2'))
+        self.assertNotEqual(event_id, calendar_sync.event_id('session:other', 'key', 'week-1'))
+        self.assertRegex(event_id, r'^[0-9a-v]{32}$')
+
+    def test_plan_sync(self):
+        body = {'summary': 'x'}
+        links = {
+            'same': SimpleNamespace(event_id='e1', content_hash=calendar_sync.content_hash(body)),
+            'moved': SimpleNamespace(event_id='e2', content_hash='old'),
+            'gone': SimpleNamespace(event_id='e3', content_hash='old'),
+        }
+        calls, unchanged = calendar_sync.plan_sync(
+            self.OWNER, 'key', [('same', body), ('moved', body), ('new', body)], links
+        )
+        self.assertEqual(unchanged, 1)
+        self.assertEqual([(c['method'], c['item_key']) for c in calls],
+                         [('patch', 'moved'), ('insert', 'new'), ('delete', 'gone')])
+        self.assertEqual(calls[1]['event_id'], calendar_sync.event_id(self.OWNER, 'key', 'new'))
+
+    def test_incremental_sync(self):
+        service = FakeCalendarService()
+        first = calendar_sync.sync_events(service, self.OWNER, 'key', self.items(weeks=2))
+        self.assertEqual((first['inserted'], first['requests']), (13, 1))
+        self.assertEqual(len(service.events_by_id), 13)
+
+        again = calendar_sync.sync_events(service, self.OWNER, 'key', self.items(weeks=2))
+        self.assertEqual((again['unchanged'], again['requests']), (13, 0))
+
+        changed = calendar_sync.sync_events(service, self.OWNER, 'key', self.items(weeks=1, projects=('Todo API', 'Blog')))
+        self.assertEqual((changed['inserted'], changed['deleted'], changed['unchanged']), (1, 6, 7))
+        self.assertEqual(len(service.events_by_id), 8)
+        self.assertEqual(CalendarEventLink.objects.filter(sync__sync_key='key').count(), 8)
+
+    def test_lost_links_do_not_duplicate_events(self):
+        service = FakeCalendarService()
+        calendar_sync.sync_events(service, self.OWNER, 'key', self.items(weeks=1))
+        CalendarEventLink.objects.all().delete()
+
+        result = calendar_sync.sync_events(service, self.OWNER, 'key', self.items(weeks=1))
+        self.assertEqual((result['inserted'], result['updated'], result['failed']), (0, 7, []))
+        self.assertEqual(len(service.events_by_id), 7)
+
+    def test_failed_items_are_retried_by_the_next_sync(self):
+        service = FakeCalendarService()
+        service.fail = {'🚀 Project: Todo API': 400}
+        progress = []
+        result = calendar_sync.sync_events(service, self.OWNER, 'key', self.items(weeks=1),
+                                           on_progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(len(result['failed']), 1)
+        self.assertEqual(progress[-1], (6, 7))
+
+        service.fail = {}
+        service.calls = []
+        retry = calendar_sync.sync_events(service, self.OWNER, 'key', self.items(weeks=1))
+        self.assertEqual((retry['inserted'], retry['unchanged']), (1, 6))
+        self.assertEqual(service.calls, ['insert'])
+
+    def test_inline_sync_keys(self):
+        first, second = sample_roadmap(tasks=('a',)), sample_roadmap(tasks=('b',))
+        self.assertNotEqual(views.calendar_sync_key(None, first), views.calendar_sync_key(None, second))
+        self.assertEqual(views.calendar_sync_key(None, first), views.calendar_sync_key(None, dict(first)))
+        self.assertEqual(
+            views.calendar_sync_key(None, first, ('Python', 'web', '')),
+            views.calendar_sync_key(None, second, ('python ', 'Web', ''))
+        )
+
+
+# ============================================================================
+# Recurring calendar events
+# ============================================================================
+
+class RecurringEventTests(SimpleTestCase):
+    MONDAY = datetime.date(2026, 1, 5)
+
+    def items(self, roadmap, start=MONDAY):
+        return dict(views.roadmap_event_items(roadmap, start, recurring=True))
+
+    def test_identical_weeks_are_merged(self):
+        items = self.items(sample_roadmap(weeks=3))
+        self.assertEqual(list(items), ['week-1-3', 'daily-1-3', 'project-todo-api'])
+        self.assertEqual(items['week-1-3']['recurrence'], ['RRULE:FREQ=WEEKLY;COUNT=3'])
+        self.assertEqual(items['daily-1-3']['recurrence'], ['RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR;COUNT=15'])
+        self.assertIn('Weeks 1-3', items['week-1-3']['summary'])
+        self.assertEqual((items['daily-1-3']['start']['date'], items['daily-1-3']['end']['date']),
+                         ('2026-01-05', '2026-01-06'))
+
+    def test_changed_tasks_start_a_new_run(self):
+        roadmap = sample_roadmap(weeks=3)
+        roadmap['weekly_schedule'][2]['tasks'] = ['Deploy']
+        items = self.items(roadmap)
+        self.assertEqual(list(items)[:4], ['week-1-2', 'daily-1-2', 'week-3', 'daily-3'])
+        self.assertNotIn('recurrence', items['week-3'])
+        self.assertEqual(items['daily-3']['recurrence'], ['RRULE:FREQ=DAILY;COUNT=5'])
+        self.assertEqual(items['week-3']['start']['date'], '2026-01-19')
+
+    def test_weekdays_follow_the_start_date(self):
+        items = self.items(sample_roadmap(weeks=2), start=datetime.date(2026, 1, 7))
+        self.assertEqual(items['daily-1-2']['recurrence'], ['RRULE:FREQ=WEEKLY;BYDAY=WE,TH,FR,SA,SU;COUNT=10'])
+
+    def test_recurring_mode_sends_far_fewer_events(self):
+        roadmap = sample_roadmap(weeks=12)
+        self.assertEqual(len(self.items(roadmap)), 3)
+        self.assertEqual(len(views.roadmap_event_items(roadmap, self.MONDAY)), 12 * 6 + 1)
+
+
+# ============================================================================
+# iCalendar export
+# ============================================================================
+
+class ICalTests(SimpleTestCase):
+    def test_escape_text(self):
+        self.assertEqual(ical.escape_text('a,b;c\\d\nline\r\nend'), 'a\\,b\\;c\\\\d\\nline\\nend')
+
+    def test_short_lines_are_not_folded(self):
+        self.assertEqual(ical.fold('SUMMARY:short'), 'SUMMARY:short')
+
+    def test_fold_limits_octets_and_keeps_characters_whole(self):
+        line = 'DESCRIPTION:' + 'é📚x' * 60
+        folded = ical.fold(line)
+        parts = folded.split('\r\n')
+        self.assertGreater(len(parts), 1)
+        for part in parts:
+            self.assertLessEqual(len(part.encode('utf-8')), 75)
+        self.assertTrue(all(part.startswith(' ') for part in parts[1:]))
+        self.assertEqual(''.join([parts[0]] + [part[1:] for part in parts[1:]]), line)
+
+    def test_render_calendar(self):
+        items = [
+            ('week-1', {
+                'summary': 'Week 1, tasks', 'description': 'a;b',
+                'start': {'date': '2026-01-05'}, 'end': {'date': '2026-01-05'},
+                'recurrence': ['RRULE:FREQ=WEEKLY;COUNT=2'],
+                'reminders': {'overrides': [{'method': 'email', 'minutes': 60}, {'method': 'popup', 'minutes': 30}]},
+            }),
+        ]
+        stamp = datetime.datetime(2026, 1, 1, 12, tzinfo=datetime.timezone.utc)
+        document = ical.render_calendar(items, 'feed1', 'My roadmap', dtstamp=stamp)
+        lines = document.split('\r\n')
+        self.assertEqual(lines[0], 'BEGIN:VCALENDAR')
+        self.assertEqual(lines[-2:], ['END:VCALENDAR', ''])
+        self.assertIn('UID:week-1-feed1@malumai', lines)
+        self.assertIn('DTSTAMP:20260101T120000Z', lines)
+        self.assertIn('DTSTART;VALUE=DATE:20260105', lines)
+        self.assertIn('DTEND;VALUE=DATE:20260106', lines)
+        self.assertIn('SUMMARY:Week 1\\, tasks', lines)
+        self.assertIn('DESCRIPTION:a\\;b', lines)
+        self.assertIn('RRULE:FREQ=WEEKLY;COUNT=2', lines)
+        self.assertEqual(lines.count('BEGIN:VALARM'), 1)
+        self.assertIn('TRIGGER:-PT30M', lines)
+        self.assertEqual(document, ical.render_calendar(items, 'feed1', 'My roadmap', dtstamp=stamp))
+
+
+    def test_feed_etag_follows_the_parameters(self):
+        start = datetime.date(2026, 1, 5)
+        etag = ical.feed_etag('feed1', start, False)
+        self.assertEqual(etag, ical.feed_etag('feed1', start, False))
+        self.assertNotEqual(etag, ical.feed_etag('feed1', start, True))
+        self.assertNotEqual(etag, ical.feed_etag('feed1', start + timedelta(days=1), False))
+        with mock.patch.object(ical, 'FEED_VERSION', ical.FEED_VERSION + 1):
+            self.assertNotEqual(etag, ical.feed_etag('feed1', start, False))
+
+
+class RoadmapFeedViewTests(TestCase):
+    def setUp(self):
+        isolate_caches(self)
+        self.roadmap_id = roadmap_store.save_roadmap('python', 'web apis', '', sample_roadmap())
+        self.url = f'/api/calendar/{self.roadmap_id}.ics'
+
+    def test_feed_and_conditional_request(self):
+        with mock.patch.object(ical, 'render_calendar', wraps=ical.render_calendar) as render:
+            response = self.client.get(self.url, {'start': '2026-01-05'})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+            body = response.content.decode('utf-8')
+            self.assertIn(f'UID:week-1-{self.roadmap_id}@malumai', body)
+            self.assertIn('DTSTART;VALUE=DATE:20260105', body)
+
+            again = self.client.get(self.url, {'start': '2026-01-05'}, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(render.call_count, 1)
+
+            moved = self.client.get(self.url, {'start': '2026-01-12'}, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(moved.status_code, 200)
+            self.assertEqual(render.call_count, 2)
+
+    def test_download_and_unknown_roadmap(self):
+        response = self.client.get(self.url, {'download': '1'})
+        self.assertTrue(response['Content-Disposition'].startswith('attachment;'))
+        self.assertEqual(self.client.get('/api/calendar/' + '0' * 32 + '.ics').status_code, 404)
+
+
+# ============================================================================
+# Background task lifecycle
+# ============================================================================
+
+class TaskLifecycleTests(TestCase):
+    def make_stale(self, task_id):
+        long_ago = timezone.now() - timedelta(seconds=task_store.TASK_STALE_AFTER + 60)
+        AgentTask.objects.filter(task_id=task_id).update(updated_at=long_ago)
+
+    def test_progress_and_result(self):
+        task_store.create_task('c1', 'queued', kind=AgentTask.KIND_CALENDAR)
+        task_store.update_task('c1', progress_done=3, progress_total=10, result={'events_created': 3})
+        task = task_store.get_task('c1')
+        self.assertEqual(task['progress'], {'done': 3, 'total': 10})
+        self.assertEqual(task['result'], {'events_created': 3})
+        self.assertEqual(task['kind'], AgentTask.KIND_CALENDAR)
+
+    def test_heartbeat_reports_queued_and_running_jobs(self):
+        beats = []
+        release = threading.Event()
+        executor = JobExecutor('test', workers=1, queue_size=2, heartbeat=beats.append, heartbeat_interval=0.01)
+        executor.submit('running', release.wait, 5)
+        executor.submit('queued', lambda: None)
+        for _ in range(500):
+            if any(set(beat) == {'running', 'queued'} for beat in beats):
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        self.assertTrue(any(set(beat) == {'running', 'queued'} for beat in beats))
+
+    def test_stale_tasks(self):
+        task_store.create_task('dead', 'queued')
+        task_store.create_task('live', 'queued')
+        self.make_stale('dead')
+
+        dead = task_store.get_task('dead')
+        self.assertTrue(dead['stale'])
+        self.assertIsNone(dead['queue_position'])
+        self.assertEqual(task_store.get_task('live')['queue_position'], 1)
+
+        task_store.touch_tasks(['live'])
+        self.assertNotIn('stale', task_store.get_task('live'))
+        self.assertTrue(task_store.get_task('dead')['stale'])
+
+        # Finished tasks are not kept alive by a late heartbeat
+        task_store.update_task('live', status='completed')
+        updated_at = AgentTask.objects.get(task_id='live').updated_at
+        task_store.touch_tasks(['live'])
+        self.assertEqual(AgentTask.objects.get(task_id='live').updated_at, updated_at)
+
+    def test_requeue_only_failed_or_stale(self):
+        task_store.create_task('t1', 'queued')
+        self.assertFalse(task_store.requeue_task('t1', 'again'))
+
+        task_store.update_task('t1', status='failed', error='boom')
+        self.assertTrue(task_store.requeue_task('t1', 'again'))
+        task = task_store.get_task('t1')
+        self.assertEqual((task['status'], task['error']), ('queued', None))
+        self.assertFalse(task_store.requeue_task('t1', 'again'))
+
+        task_store.update_task('t1', status='in_progress')
+        self.make_stale('t1')
+        self.assertTrue(task_store.requeue_task('t1', 'again'))
+        self.assertNotIn('stale', task_store.get_task('t1'))
+
+    def test_requeued_task_goes_to_the_back_of_the_queue(self):
+        task_store.create_task('first', 'queued')
+        task_store.create_task('second', 'queued')
+        task_store.update_task('first', status='failed')
+
+        self.assertTrue(task_store.requeue_task('first', 'again'))
+        self.assertEqual(task_store.get_task('second')['queue_position'], 1)
+        self.assertEqual(task_store.get_task('first')['queue_position'], 2)
+
+    def test_progress_stream_ends_for_stale_tasks(self):
+        task_store.create_task('dead', 'queued')
+        self.make_stale('dead')
+        response = self.client.get('/api/run_agent_progress/dead/')
+        events = sse_events(response)
+        self.assertEqual([event for event, _ in events], ['done'])
+        self.assertTrue(events[0][1]['stale'])
+
+
+class CalendarViewTests(TestCase):
+    def setUp(self):
+        isolate_caches(self)
+        self.service = FakeCalendarService()
+        self.roadmap_id = roadmap_store.save_roadmap('python', 'web', '', sample_roadmap(weeks=1))
+
+    def post(self, url, data=None):
+        return self.client.post(url, json.dumps(data or {}), content_type='application/json')
+
+    def start_sync(self):
+        with mock.patch.object(views.calendar_service, 'get_credentials', return_value=object()), \
+                mock.patch.object(views.calendar_executor, 'submit', return_value=1):
+            return self.post('/api/add_to_calendar/', {'roadmap_id': self.roadmap_id, 'start_date': '2026-01-05'})
+
+    def run_job(self, task_id):
+        with mock.patch.object(views.calendar_service, 'get_credentials', return_value=object()), \
+                mock.patch.object(views.calendar_service, 'get_service', return_value=self.service):
+            views.run_calendar_sync_job(task_id)
+
+    def resume(self, task_id):
+        with mock.patch.object(views.calendar_executor, 'submit', return_value=1):
+            return self.post(f'/api/calendar_sync_resume/{task_id}/')
+
+    def test_oauth_required(self):
+        with mock.patch.object(views.calendar_service, 'get_credentials', return_value=None), \
+                mock.patch.object(views, 'initiate_oauth_flow', return_value='https://accounts.example/auth'):
+            body = self.post('/api/add_to_calendar/', {'roadmap_id': self.roadmap_id}).json()
+        self.assertTrue(body['oauth_required'])
+        self.assertEqual(body['oauth_url'], 'https://accounts.example/auth')
+
+    def test_sync_job(self):
+        response = self.start_sync()
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        task_id = body['task_id']
+        self.assertTrue(body['progress_url'].endswith(f'/api/run_agent_progress/{task_id}/'))
+        self.assertEqual(task_store.get_job(task_id)['payload']['start_date'], '2026-01-05')
+
+        self.run_job(task_id)
+        task = task_store.get_task(task_id)
+        self.assertEqual(task['status'], 'completed')
+        self.assertEqual(task['progress'], {'done': 7, 'total': 7})
+        self.assertEqual(task['result']['events_created'], 7)
+        self.assertEqual(len(self.service.events_by_id), 7)
+        self.assertEqual(CalendarSync.objects.get().roadmap_id, self.roadmap_id)
+
+    def test_resume_failed_sync(self):
+        task_id = self.start_sync().json()['task_id']
+        self.service.fail = {'🚀 Project: Todo API': 400}
+        self.run_job(task_id)
+        self.assertEqual(task_store.get_task(task_id)['status'], 'failed')
+
+        self.assertEqual(self.resume(task_id).status_code, 202)
+
+        self.service.fail = {}
+        self.service.calls = []
+        self.run_job(task_id)
+        self.assertEqual(task_store.get_task(task_id)['status'], 'completed')
+        self.assertEqual(self.service.calls, ['insert'])
+
+    def test_resume_running_and_stale_sync(self):
+        task_id = self.start_sync().json()['task_id']
+        task_store.update_task(task_id, status='in_progress')
+        self.assertEqual(self.resume(task_id).status_code, 409)
+
+        long_ago = timezone.now() - timedelta(seconds=task_store.TASK_STALE_AFTER + 60)
+        AgentTask.objects.filter(task_id=task_id).update(updated_at=long_ago)
+        self.assertEqual(self.resume(task_id).status_code, 202)
 
-# Test cases should be added here as the application grows
-# Use TestCase for database-backed tests
-# Use TransactionTestCase for transaction testing
+    def test_resume_is_limited_to_the_owner(self):
+        task_id = self.start_sync().json()['task_id']
+        task_store.update_task(task_id, status='failed')
+        self.client.cookies.clear()
+        self.assertEqual(self.resume(task_id).status_code, 404)
+        self.assertEqual(self.resume('missing').status_code, 404)
@@ -10,15 +10,30 @@ ROUTE DESCRIPTION:
 Homepage & Core Features:
   / (GET)                      - Display the main input form and dashboard
   generate_roadmap/ (POST)     - Generate AI-powered learning roadmap
-  results/ (GET)               - Display results from roadmap generation
+  generate_roadmap_stream/ (POST) - Same roadmap, streamed as Server-Sent Events
+  results/ (GET)               - Main page
+  results/<roadmap_id>/ (GET)  - Render a stored roadmap without regenerating it
+  roadmap_cache_stats/ (GET)   - Hit/miss counters for the roadmap cache
+  metrics/ (GET)               - Prometheus metrics: per-stage latency, errors, retries, tokens
 
 Calendar Integration:
-  add_to_calendar/ (POST)      - Add generated roadmap to Google Calendar
+  add_to_calendar/ (POST)      - Queue a sync of the roadmap to Google Calendar; returns
+                                 a job handle (progress via run_agent_status/progress)
+  calendar_sync_resume/<task_id>/ (POST) - Re-queue a failed or stalled calendar sync
+  calendar/<roadmap_id>.ics (GET) - Roadmap as an iCalendar download or subscription
+                                 feed (ETag / Last-Modified aware)
   oauth_callback/ (GET)        - OAuth2 callback handler for Google auth
 
 Agent & Repository Creation:
   run_agent/ (POST)            - Trigger autonomous GitHub repository creation
-  run_agent_status/ (GET)      - Poll status of background agent task
+  run_agent_status/ (GET)      - Poll status of a background task (agent run or calendar sync)
+  run_agent_progress/ (GET)    - Same status pushed as Server-Sent Events
+
+Async Variants (ASGI, see async_views.py):
+  async/generate_roadmap/ (POST)           - Roadmap via AsyncGroq
+  async/run_agent/ (POST)                  - Same agent job queue as run_agent/
+  async/run_agent_status/<task_id>/ (GET)  - Poll async agent task
+  async/add_to_calendar/ (POST)            - Calendar sync off the event loop
 
 URL NAMESPACE: 'api_features'
 Used for reverse URL lookups: reverse('api_features:generate_roadmap')
@@ -26,22 +41,37 @@ Used for reverse URL lookups: reverse('api_features:generate_roadmap')
 DEPLOYMENT CONSIDERATIONS:
 - All POST endpoints require CSRF token
 - OAuth callback must match Google Cloud Console redirect URIs
-- Task status polling should use reasonable intervals (2-5 seconds)
+- Prefer run_agent_progress over polling; if polling, use 2-5 second intervals
+- run_agent_progress holds a worker thread per open stream under WSGI for at
+  most TASK_STREAM_TIMEOUT seconds (25 by default); EventSource then reconnects
 
 ================================================================================
 """
 
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'api_features'
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('generate_roadmap/', views.generate_roadmap, name='generate_roadmap'),
+    path('generate_roadmap_stream/', views.generate_roadmap_stream, name='generate_roadmap_stream'),
     path('add_to_calendar/', views.add_to_calendar, name='add_to_calendar'),
     path('oauth_callback/', views.oauth_callback, name='oauth_callback'),
+    path('calendar_sync_resume/<str:task_id>/', views.calendar_sync_resume, name='calendar_sync_resume'),
+    path('calendar/<str:roadmap_id>.ics', views.roadmap_ics, name='roadmap_ics'),
     path('run_agent/', views.run_agent_endpoint, name='run_agent'),
     path('run_agent_status/<str:task_id>/', views.run_agent_status, name='run_agent_status'),
+    path('run_agent_progress/<str:task_id>/', views.run_agent_progress, name='run_agent_progress'),
     path('results/', views.results, name='results'),
+    path('results/<str:roadmap_id>/', views.results, name='results_roadmap'),
+    path('roadmap_cache_stats/', views.roadmap_cache_stats, name='roadmap_cache_stats'),
+    path('metrics/', views.metrics_view, name='metrics'),
+
+    # Native async views for ASGI deployments
+    path('async/generate_roadmap/', async_views.generate_roadmap, name='async_generate_roadmap'),
+    path('async/run_agent/', async_views.run_agent_endpoint, name='async_run_agent'),
+    path('async/run_agent_status/<str:task_id>/', async_views.run_agent_status, name='async_run_agent_status'),
+    path('async/add_to_calendar/', async_views.add_to_calendar, name='async_add_to_calendar'),
 ]
@@ -0,0 +1,118 @@
+"""
+================================================================================
+BENCHMARK - SEQUENTIAL VS STRUCTURED AGENT MODES
+================================================================================
+
+Compares end-to-end latency and token usage of the two run_agent modes.
+
+WHAT IS MEASURED:
+  - Wall-clock time of run_agent() per mode
+  - Number of chat completions issued
+  - Prompt, completion and total tokens (from response.usage)
+
+GitHub calls are stubbed out so no repositories are created. What remains is
+the LLM phase of the agent, which is where the two modes differ.
+
+REQUIREMENTS:
+Real Groq calls are made with GROQ_AGENT_KEY, so each run costs tokens.
+
+USAGE:
+  python benchmarks/agent_modes.py
+  python benchmarks/agent_modes.py --runs 5 --skillset "Python, Django" \
+      --interest "web apps" --goal "backend developer"
+
+================================================================================
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MalumAI.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api_features import views  # noqa: E402
+
+
+class UsageRecorder:
+    """Wraps chat.completions.create and tallies calls and token usage"""
+
+    def __init__(self, create):
+        self._create = create
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def __call__(self, *args, **kwargs):
+        response = self._create(*args, **kwargs)
+        usage = getattr(response, 'usage', None)
+        with self._lock:
+            self.calls += 1
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens or 0
+                self.completion_tokens += usage.completion_tokens or 0
+        return response
+
+
+def run_mode(mode, runs, skillset, interest, goal, recorder):
+    latencies = []
+    usage = []
+    for idx in range(runs):
+        recorder.reset()
+        started = time.perf_counter()
+        views.run_agent(skillset, interest, goal, mode=mode)
+        latencies.append(time.perf_counter() - started)
+        usage.append((recorder.calls, recorder.prompt_tokens, recorder.completion_tokens))
+        print(f"  {mode} run {idx + 1}: {latencies[-1]:.2f}s, {recorder.calls} calls, "
+              f"{recorder.prompt_tokens + recorder.completion_tokens} tokens")
+    return latencies, usage
+
+
+def summarize(mode, latencies, usage):
+    calls = statistics.mean(u[0] for u in usage)
+    prompt = statistics.mean(u[1] for u in usage)
+    completion = statistics.mean(u[2] for u in usage)
+    print(f"{mode:<12} median {statistics.median(latencies):6.2f}s  "
+          f"min {min(latencies):6.2f}s  max {max(latencies):6.2f}s  "
+          f"calls {calls:4.1f}  prompt {prompt:7.0f}  completion {completion:7.0f}  "
+          f"total {prompt + completion:7.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--skillset', default='Python, Django')
+    parser.add_argument('--interest', default='web applications')
+    parser.add_argument('--goal', default='become a backend developer')
+    args = parser.parse_args()
+
+    completions = views.github_client.chat.completions
+    recorder = UsageRecorder(completions.create)
+
+    results = {}
+    with mock.patch.object(completions, 'create', recorder), \
+            mock.patch.object(views, 'create_repository', return_value={'default_branch': 'main'}), \
+            mock.patch.object(views, 'push_files', return_value=True):
+        for mode in views.AGENT_MODES:
+            print(f"Running {mode} mode ({args.runs} runs)...")
+            results[mode] = run_mode(mode, args.runs, args.skillset, args.interest, args.goal, recorder)
+
+    print()
+    for mode, (latencies, usage) in results.items():
+        summarize(mode, latencies, usage)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,339 @@
+"""
+================================================================================
+LOCAL STAND-INS FOR GROQ, GITHUB AND GOOGLE CALENDAR
+================================================================================
+
+One threaded HTTP server that answers the API calls this app makes, used by
+benchmarks/offline.py so performance can be measured without network access,
+API keys or quota.
+
+ROUTES:
+  Groq      POST /openai/v1/chat/completions      (non-streaming and streaming)
+  GitHub    POST /user/repos, GET /repos/{o}/{r}, GET /repos/{o}/{r}/git/ref/...,
+            POST .../git/trees, POST .../git/commits, PATCH .../git/refs/...,
+            PUT .../contents/{path}
+  Calendar  POST /calendar/v3/calendars/{id}/events, POST /batch/calendar/v3
+
+LATENCY & ERRORS:
+Each service has a ServiceProfile. A response is delayed by
+gauss(latency, jitter) seconds (never negative) plus output_tokens / tps when
+tps is set. With probability error_rate it fails with error_status instead;
+429s carry Retry-After. Calendar batch items fail individually, like the real
+batch endpoint.
+
+RESPONSES:
+Groq replies are canned and chosen from the prompt: a roadmap (compact or full
+schema), a structured agent plan (JSON mode) or a short answer for each agent
+step. Sizes are close to real outputs, so token-dependent costs stay realistic.
+
+USAGE:
+  server = FakeServer({'groq': ServiceProfile(latency=0.8)})
+  server.start()
+  ... point GROQ_BASE_URL / GITHUB_API_URL / CALENDAR_API_URL at server.url ...
+  server.stop()
+
+================================================================================
+"""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ServiceProfile:
+    """Latency and error distribution for one fake service"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, tps=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.tps = tps
+
+    def delay(self, output_tokens=0):
+        seconds = max(0.0, random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+        if self.tps:
+            seconds += output_tokens / self.tps
+        if seconds:
+            time.sleep(seconds)
+
+    def should_fail(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+# ----------------------------------------------------------------------------
+# Canned Groq content
+# ----------------------------------------------------------------------------
+
+_WEEK_TASKS = ["Read the official tutorial", "Build a small exercise", "Review and take notes"]
+
+
+def roadmap_compact(weeks=12):
+    return {
+        "s": "A practical plan that moves from fundamentals to shipping real projects.",
+        "m": [f"Milestone {idx}: master topic {idx}" for idx in range(1, 6)],
+        "p": [
+            {"n": f"Project {idx}", "d": "A hands-on project applying the previous milestones.",
+             "w": 2, "t": ["Python", "Django", "SQLite"]}
+            for idx in range(1, 4)
+        ],
+        "ws": [list(_WEEK_TASKS) for _ in range(weeks)],
+        "r": [["Official documentation", "doc"], ["Online course", "course"], ["Reference book", "book"],
+              ["Video series", "video"], ["Community forum", "community"]],
+    }
+
+
+def roadmap_full(weeks=12):
+    compact = roadmap_compact(weeks)
+    return {
+        "summary": compact["s"],
+        "roadmap": compact["m"],
+        "projects": [
+            {"name": p["n"], "description": p["d"], "duration_weeks": p["w"], "tech_stack": p["t"]}
+            for p in compact["p"]
+        ],
+        "weekly_schedule": [{"week": idx + 1, "tasks": tasks} for idx, tasks in enumerate(compact["ws"])],
+        "resources": [name for name, _ in compact["r"]],
+    }
+
+
+_README = "# Bench Project\n\n" + "\n\n".join(
+    f"## {section}\n\nPlaceholder text for the {section.lower()} section of the generated README."
+    for section in ("Description", "Features", "Tech Stack", "Installation", "Usage", "Project Structure",
+                    "Testing", "Future Improvements", "Contributing", "License")
+)
+_STARTER = "def main():\n    print('Hello from the bench project')\n\n\nif __name__ == '__main__':\n    main()\n"
+
+
+def groq_reply(body):
+    """Pick a canned completion for a chat request body"""
+    messages = body.get('messages') or []
+    text = "\n".join(str(m.get('content') or '') for m in messages)
+
+    if (body.get('response_format') or {}).get('type') == 'json_object':
+        return json.dumps({
+            "project": "Bench Project: a command line todo manager with persistence",
+            "language_extension": "py",
+            "repo_name": "bench-project",
+            "readme": _README,
+            "starter_code": _STARTER,
+        })
+    if 'learning roadmap' in text:
+        weeks = re.search(r'exactly (\d+) entries', text) or re.search(r'next (\d+) weeks', text)
+        weeks = int(weeks.group(1)) if weeks else 12
+        roadmap = roadmap_compact(weeks) if '"ws"' in text else roadmap_full(weeks)
+        return json.dumps(roadmap)
+    if 'repository name' in text:
+        return "bench-project"
+    if 'extension of the language' in text:
+        return "py"
+    if 'starter code' in text:
+        return _STARTER
+    if 'README' in text:
+        return _README
+    return "Bench Project: a command line todo manager with persistence"
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+# ----------------------------------------------------------------------------
+# HTTP server
+# ----------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- helpers --------------------------------------------------------------
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, payload=None, content_type='application/json', headers=None):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload or {}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _fail(self, profile):
+        headers = {'Retry-After': '0.1'} if profile.error_status == 429 else None
+        self._send(profile.error_status, {'error': {'message': 'fake upstream error', 'type': 'server_error'}},
+                   headers=headers)
+
+    def _route(self, method):
+        server = self.server
+        path = self.path.split('?', 1)[0]
+        body = self._body()
+        server.count(method, path)
+
+        if path.startswith('/openai/'):
+            return self._groq(server.profiles['groq'], body)
+        if path.startswith('/batch/calendar') or path.startswith('/calendar/'):
+            return self._calendar(server.profiles['calendar'], method, path, body)
+        return self._github(server.profiles['github'], method, path, body)
+
+    do_GET = lambda self: self._route('GET')  # noqa: E731
+    do_POST = lambda self: self._route('POST')  # noqa: E731
+    do_PUT = lambda self: self._route('PUT')  # noqa: E731
+    do_PATCH = lambda self: self._route('PATCH')  # noqa: E731
+
+    # -- Groq -----------------------------------------------------------------
+
+    def _groq(self, profile, raw):
+        body = json.loads(raw or b'{}')
+        content = groq_reply(body)
+        prompt_tokens = sum(_tokens(str(m.get('content') or '')) for m in body.get('messages') or [])
+        completion_tokens = _tokens(content)
+        max_tokens = body.get('max_tokens')
+        finish_reason = 'stop'
+        if max_tokens and completion_tokens > max_tokens:
+            content = content[:max_tokens * 4]
+            completion_tokens = max_tokens
+            finish_reason = 'length'
+
+        profile.delay(completion_tokens)
+        if profile.should_fail():
+            return self._fail(profile)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+
+        if body.get('stream'):
+            frames = []
+            for offset in range(0, len(content), 64):
+                frames.append({'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                               'model': body.get('model'),
+                               'choices': [{'index': 0, 'delta': {'content': content[offset:offset + 64]},
+                                            'finish_reason': None}]})
+            frames.append({'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                           'model': body.get('model'),
+                           'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}],
+                           'x_groq': {'usage': usage}})
+            stream = ''.join(f"data: {json.dumps(frame)}\n\n" for frame in frames) + "data: [DONE]\n\n"
+            return self._send(200, stream.encode('utf-8'), content_type='text/event-stream')
+
+        return self._send(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'finish_reason': finish_reason,
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': usage,
+        })
+
+    # -- GitHub ---------------------------------------------------------------
+
+    def _github(self, profile, method, path, raw):
+        profile.delay()
+        if profile.should_fail():
+            return self._fail(profile)
+
+        body = json.loads(raw or b'{}') if raw else {}
+        sha = uuid.uuid4().hex + uuid.uuid4().hex[:8]
+
+        if method == 'POST' and path == '/user/repos':
+            return self._send(201, {'name': body.get('name'), 'default_branch': 'main'})
+        if method == 'GET' and '/git/ref/heads/' in path:
+            return self._send(200, {'ref': 'refs/heads/main', 'object': {'sha': sha}})
+        if method == 'GET' and re.fullmatch(r'/repos/[^/]+/[^/]+', path):
+            return self._send(200, {'name': path.rsplit('/', 1)[-1], 'default_branch': 'main'})
+        if method == 'POST' and path.endswith('/git/trees'):
+            return self._send(201, {'sha': sha})
+        if method == 'POST' and path.endswith('/git/commits'):
+            return self._send(201, {'sha': sha})
+        if method == 'PATCH' and '/git/refs/heads/' in path:
+            return self._send(200, {'object': {'sha': body.get('sha')}})
+        if method == 'PUT' and '/contents/' in path:
+            return self._send(201, {'content': {'path': path.split('/contents/', 1)[1]}})
+        return self._send(404, {'message': 'Not Found'})
+
+    # -- Calendar -------------------------------------------------------------
+
+    def _calendar(self, profile, method, path, raw):
+        profile.delay()
+
+        if path.startswith('/batch/'):
+            return self._calendar_batch(profile, raw)
+        if profile.should_fail():
+            return self._fail(profile)
+        if method == 'POST' and path.endswith('/events'):
+            return self._send(200, {'id': self.server.next_event_id(), 'status': 'confirmed'})
+        return self._send(404, {'error': {'code': 404, 'message': 'Not Found'}})
+
+    def _calendar_batch(self, profile, raw):
+        content_type = self.headers.get('Content-Type', '')
+        message = message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + raw)
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+
+        for part in message.get_payload():
+            content_id = part['Content-ID'].strip()[1:-1]
+            if profile.should_fail():
+                status_line = f"HTTP/1.1 {profile.error_status} Error"
+                payload = json.dumps({'error': {'code': profile.error_status, 'message': 'fake backend error',
+                                                'errors': [{'reason': 'backendError'}]}})
+            else:
+                status_line = "HTTP/1.1 200 OK"
+                payload = json.dumps({'id': self.server.next_event_id(), 'status': 'confirmed'})
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"{status_line}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{payload}\r\n"
+            )
+
+        body = (''.join(parts) + f"--{boundary}--\r\n").encode('utf-8')
+        return self._send(200, body, content_type=f'multipart/mixed; boundary={boundary}')
+
+
+class FakeServer(ThreadingHTTPServer):
+    """Threaded HTTP server hosting all three fake APIs on one port"""
+
+    daemon_threads = True
+
+    def __init__(self, profiles=None, host='127.0.0.1', port=0):
+        super().__init__((host, port), _Handler)
+        self.profiles = {name: ServiceProfile() for name in ('groq', 'github', 'calendar')}
+        self.profiles.update(profiles or {})
+        self._lock = threading.Lock()
+        self._event_ids = itertools.count(1)
+        self.requests = {}
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, method, path):
+        key = f"{method} {re.sub(r'/[0-9a-f]{8,}|/bench[^/]*', '/*', path)}"
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def next_event_id(self):
+        with self._lock:
+            return f"evt{next(self._event_ids):08d}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-apis', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,97 @@
+"""
+================================================================================
+BENCHMARK - IMPORT TIME OF THE API MODULES
+================================================================================
+
+Measures how long a fresh interpreter takes to import the app's URLconf (and
+with it views.py, async_views.py and the services), which is what every
+manage.py command, worker boot and autoreload cycle pays.
+
+HOW IT WORKS:
+Each run starts `python -X importtime`, sets up Django and imports the target
+module. The per-module timings that CPython writes to stderr are parsed, so
+the report shows both the total and the heaviest imports.
+
+WHAT IS MEASURED:
+  - Cumulative import time of the target module (median over runs)
+  - Wall-clock time of the whole subprocess
+  - The slowest individual imports below the target (self time)
+
+No network calls are made.
+
+USAGE:
+  python benchmarks/import_time.py
+  python benchmarks/import_time.py --runs 10 --module api_features.views --top 15
+
+================================================================================
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = "import django; django.setup(); import {module}"
+
+
+def parse_importtime(stderr):
+    """
+    RETURNS:
+      list: (module, self_us, cumulative_us) for every 'import time:' line
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once(module):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'MalumAI.settings'))
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', SNIPPET.format(module=module)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise SystemExit(f"Import failed:\n{completed.stderr[-2000:]}")
+    return wall, parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--module', default='api_features.urls')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    walls, totals, rows = [], [], []
+    for idx in range(args.runs):
+        wall, rows = run_once(args.module)
+        target = [row for row in rows if row[0] == args.module]
+        total = target[-1][2] if target else 0
+        walls.append(wall)
+        totals.append(total)
+        print(f"  run {idx + 1}: {args.module} {total / 1000:7.1f} ms, process {wall * 1000:7.1f} ms")
+
+    print()
+    print(f"{args.module}: median import {statistics.median(totals) / 1000:.1f} ms, "
+          f"median process {statistics.median(walls) * 1000:.1f} ms")
+
+    # Heaviest modules imported after Django setup, from the last run
+    start = next((idx for idx, row in enumerate(rows) if row[0].startswith('api_features')), 0)
+    heaviest = sorted(rows[start:], key=lambda row: row[1], reverse=True)[:args.top]
+    print(f"\nTop {len(heaviest)} imports by self time (last run):")
+    for name, self_us, cumulative_us in heaviest:
+        print(f"  {self_us / 1000:7.1f} ms self  {cumulative_us / 1000:7.1f} ms cumulative  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+================================================================================
+BENCHMARK - OFFLINE LOAD TEST AGAINST LOCAL FAKE APIS
+================================================================================
+
+Runs the app's three expensive paths against local stand-ins for Groq, GitHub
+and Google Calendar (benchmarks/fakes.py) and reports latency percentiles
+and throughput. Nothing leaves the machine, so it can run in CI before a
+deploy.
+
+SCENARIOS:
+  roadmap   - POST /api/generate_roadmap/ through the Django test client, with a
+              unique profile per request so the roadmap cache never hits
+  agent     - views.run_agent(): LLM steps, repository creation and file push
+  calendar  - views.add_roadmap_to_calendar() for a 12-week roadmap (first sync,
+              every event inserted through batch requests)
+  resync    - the same roadmap synced again with one project's duration_weeks
+              changed; only the affected events are patched
+
+WHAT IS MEASURED (per scenario):
+  - p50 / p95 / p99 / max latency of one operation
+  - Throughput (operations per second at the chosen concurrency)
+  - Failed operations, and requests received per fake endpoint
+
+HOW IT WORKS:
+The fake server is started first, and GROQ_BASE_URL, GITHUB_API_URL and
+CALENDAR_API_URL are pointed at it before Django loads the app. The Groq
+rate-limit scheduler gets effectively unlimited budgets so it doesn't skew
+results. A throwaway SQLite database is used (benchmarks/offline_settings.py).
+
+USAGE:
+  python benchmarks/offline.py
+  python benchmarks/offline.py --scenarios roadmap agent --requests 50 --concurrency 8 \
+      --groq-latency 0.8 --groq-jitter 0.2 --groq-tps 400 --github-latency 0.1 \
+      --calendar-error-rate 0.05
+  python benchmarks/offline.py --scenarios calendar --calendar-recurring
+
+================================================================================
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import itertools
+import json
+import os
+import sys
+import time
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fakes import FakeServer, ServiceProfile  # noqa: E402
+
+SCENARIOS = ('roadmap', 'agent', 'calendar', 'resync')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=20, help='operations per scenario')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--agent-mode', default='sequential')
+    for service, latency in (('groq', 0.3), ('github', 0.05), ('calendar', 0.05)):
+        parser.add_argument(f'--{service}-latency', type=float, default=latency, help='mean seconds')
+        parser.add_argument(f'--{service}-jitter', type=float, default=latency / 4, help='stddev seconds')
+        parser.add_argument(f'--{service}-error-rate', type=float, default=0.0)
+        parser.add_argument(f'--{service}-error-status', type=int, default=503)
+    parser.add_argument('--groq-tps', type=float, default=0.0,
+                        help='output tokens per second added to Groq latency (0 = off)')
+    parser.add_argument('--calendar-recurring', action='store_true',
+                        help='sync daily reminders as recurring events (CALENDAR_RECURRING=1)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    return parser.parse_args()
+
+
+def start_fakes(args):
+    profiles = {
+        service: ServiceProfile(
+            latency=getattr(args, f'{service}_latency'),
+            jitter=getattr(args, f'{service}_jitter'),
+            error_rate=getattr(args, f'{service}_error_rate'),
+            error_status=getattr(args, f'{service}_error_status'),
+            tps=args.groq_tps if service == 'groq' else 0.0,
+        )
+        for service in ('groq', 'github', 'calendar')
+    }
+    server = FakeServer(profiles).start()
+
+    os.environ.update({
+        'GROQ_BASE_URL': server.url,
+        'GITHUB_API_URL': server.url,
+        'CALENDAR_API_URL': server.url,
+        'GROQ_RPM': '1000000',
+        'GROQ_TPM': '1000000000',
+        'GITHUB_POOL_SIZE': str(max(10, args.concurrency * 2)),
+        'AGENT_WORKERS': str(args.concurrency),
+        'CALENDAR_RECURRING': '1' if args.calendar_recurring else '0',
+    })
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.offline_settings')
+    return server
+
+
+def setup_django():
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    db_path = settings.DATABASES['default']['NAME']
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_load(operation, total, concurrency):
+    """
+    Run operation(index) `total` times on `concurrency` threads.
+
+    RETURNS:
+      dict: latencies, failures, wall time
+    """
+    from django.db import close_old_connections
+
+    latencies = []
+    failures = []
+
+    def _timed(index):
+        started = time.perf_counter()
+        try:
+            ok, detail = operation(index)
+        except Exception as e:
+            ok, detail = False, str(e)
+        finally:
+            close_old_connections()
+        return time.perf_counter() - started, ok, detail
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for elapsed, ok, detail in pool.map(_timed, range(total)):
+            latencies.append(elapsed)
+            if not ok:
+                failures.append(detail)
+    return {'latencies': latencies, 'failures': failures, 'wall': time.perf_counter() - started}
+
+
+def roadmap_operation():
+    from django.test import Client
+
+    run_id = int(time.time())
+
+    def _op(index):
+        response = Client().post(
+            '/api/generate_roadmap/',
+            json.dumps({'skillset': f'Python {run_id}-{index}', 'interest': 'web apps', 'goal': 'backend developer'}),
+            content_type='application/json'
+        )
+        data = response.json()
+        ok = response.status_code == 200 and data.get('success') and not data['data'].get('parse_error')
+        return ok, data.get('error') or response.status_code
+    return _op
+
+
+def agent_operation(mode):
+    from api_features import views
+
+    counter = itertools.count()
+
+    def _op(index):
+        # run_agent suffixes repo names with int(time.time()); keep them unique
+        with mock.patch.object(views.time, 'time', return_value=1_700_000_000 + next(counter)):
+            repo_url = views.run_agent('Python, Django', 'web apps', 'backend developer', mode=mode)
+        return bool(repo_url), repo_url
+    return _op
+
+
+def calendar_operation(resync=False, total=0):
+    from google.oauth2.credentials import Credentials
+
+    from api_features import views
+    from api_features.services import calendar_service
+    from benchmarks.fakes import roadmap_full
+
+    roadmap = views.parse_roadmap_response(json.dumps(roadmap_full()))
+    creds = Credentials(token='offline-bench')
+    start = datetime.date(2030, 1, 7)
+
+    def _service(request=None):
+        return calendar_service.get_service(creds)
+
+    # Patched for the rest of the run: patching per operation races between threads
+    mock.patch.object(views, 'get_calendar_service', _service).start()
+
+    prefix = 'resync' if resync else 'sync'
+
+    def _sync(index, data):
+        # An unknown roadmap_id is its own sync key, so every operation has its own links
+        return views.add_roadmap_to_calendar(data, start_date=start, roadmap_id=f'{prefix}-{index}')
+
+    if resync:
+        # Untimed first sync for every operation of the run
+        for index in range(total):
+            _sync(index, roadmap)
+
+    def _op(index):
+        data = roadmap
+        if resync:
+            data = json.loads(json.dumps(roadmap))
+            data['projects'][0]['duration_weeks'] = int(data['projects'][0].get('duration_weeks') or 1) + 1
+        result = _sync(index, data)
+        ok = result.get('success') and not result.get('events_failed')
+        return ok, result.get('error') or f"{result.get('events_failed')} events failed"
+    return _op
+
+
+def summarize(name, result):
+    latencies = result['latencies']
+    return {
+        'scenario': name,
+        'operations': len(latencies),
+        'failed': len(result['failures']),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': max(latencies) if latencies else 0.0,
+        'throughput': len(latencies) / result['wall'] if result['wall'] else 0.0,
+        'sample_failure': str(result['failures'][0]) if result['failures'] else None,
+    }
+
+
+def main():
+    args = parse_args()
+    server = start_fakes(args)
+    db_path = setup_django()
+
+    operations = {
+        'roadmap': roadmap_operation,
+        'agent': lambda: agent_operation(args.agent_mode),
+        'calendar': calendar_operation,
+        'resync': lambda: calendar_operation(resync=True, total=args.requests),
+    }
+
+    rows = []
+    try:
+        for name in args.scenarios:
+            print(f"Running {name}: {args.requests} operations, concurrency {args.concurrency}...", file=sys.stderr)
+            rows.append(summarize(name, run_load(operations[name](), args.requests, args.concurrency)))
+    finally:
+        server.stop()
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+    if args.json:
+        print(json.dumps({'results': rows, 'fake_requests': server.requests}, indent=2))
+        return
+
+    print()
+    print(f"{'scenario':<10} {'ops':>5} {'failed':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'ops/s':>8}")
+    for row in rows:
+        print(f"{row['scenario']:<10} {row['operations']:5d} {row['failed']:6d} "
+              f"{row['p50'] * 1000:6.0f}ms {row['p95'] * 1000:6.0f}ms {row['p99'] * 1000:6.0f}ms "
+              f"{row['max'] * 1000:6.0f}ms {row['throughput']:8.2f}")
+        if row['sample_failure']:
+            print(f"{'':<10} e.g. {row['sample_failure'][:100]}")
+
+    print("\nRequests received by the fake APIs:")
+    for endpoint, count in sorted(server.requests.items()):
+        print(f"  {count:6d}  {endpoint}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""
+Settings for benchmarks/offline.py: the project settings with a throwaway
+SQLite database, so benchmark runs never touch db.sqlite3.
+"""
+
+import os
+import tempfile
+
+from MalumAI.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('OFFLINE_BENCH_DB', os.path.join(tempfile.gettempdir(), 'malumai_offline_bench.sqlite3')),
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+# Django's test client sends Host: testserver; query logging would skew timings
+ALLOWED_HOSTS = ALLOWED_HOSTS + ['testserver']  # noqa: F405
+DEBUG = False
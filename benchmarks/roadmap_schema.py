@@ -0,0 +1,102 @@
+"""
+================================================================================
+BENCHMARK - FULL VS COMPACT ROADMAP SCHEMA
+================================================================================
+
+Compares roadmap generation with the full JSON schema (fixed 8000 max_tokens,
+the previous behaviour) against the compact schema with a plan-sized budget.
+
+WHAT IS MEASURED:
+  - Wall-clock time of one roadmap completion
+  - Completion tokens (from response.usage)
+  - Whether the expanded result parsed cleanly and how many items it has
+
+The roadmap cache is bypassed: completions are requested directly with the
+same prompts generate_roadmap would send.
+
+REQUIREMENTS:
+Real Groq calls are made with GROQ_API_KEY, so each run costs tokens.
+
+USAGE:
+  python benchmarks/roadmap_schema.py
+  python benchmarks/roadmap_schema.py --runs 5 --skillset "Python" \
+      --interest "data engineering" --goal "get a junior data job"
+
+================================================================================
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MalumAI.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from api_features import views  # noqa: E402
+from api_features.services import roadmap_schema  # noqa: E402
+
+
+def run_variant(name, prompt, max_tokens, runs):
+    rows = []
+    for idx in range(runs):
+        started = time.perf_counter()
+        response = views.roadmap_client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=[
+                {"role": "system", "content": views.ROADMAP_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=max_tokens
+        )
+        elapsed = time.perf_counter() - started
+        result = views.parse_roadmap_response(response.choices[0].message.content or '')
+        ok = views.is_cacheable_roadmap(result)
+        tokens = response.usage.completion_tokens if response.usage else 0
+        rows.append((elapsed, tokens, ok, views.roadmap_item_count(result)))
+        print(f"  {name} run {idx + 1}: {elapsed:.2f}s, {tokens} completion tokens, "
+              f"{'ok' if ok else 'incomplete'}, {rows[-1][3]} items")
+    return rows
+
+
+def summarize(name, max_tokens, rows):
+    print(f"{name:<8} max_tokens {max_tokens:5d}  "
+          f"median {statistics.median(r[0] for r in rows):6.2f}s  "
+          f"completion {statistics.mean(r[1] for r in rows):7.0f}  "
+          f"items {statistics.mean(r[3] for r in rows):5.1f}  "
+          f"ok {sum(r[2] for r in rows)}/{len(rows)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--skillset', default='Python, Django')
+    parser.add_argument('--interest', default='web applications')
+    parser.add_argument('--goal', default='become a backend developer')
+    args = parser.parse_args()
+
+    plan = roadmap_schema.plan_size(args.skillset, args.interest, args.goal)
+    variants = {
+        'full': (views.build_roadmap_prompt(args.skillset, args.interest, args.goal, plan=plan, compact=False), 8000),
+        'compact': (views.build_roadmap_prompt(args.skillset, args.interest, args.goal, plan=plan, compact=True),
+                    roadmap_schema.token_budget(plan, compact=True)),
+    }
+
+    results = {}
+    for name, (prompt, max_tokens) in variants.items():
+        print(f"Running {name} schema ({args.runs} runs)...")
+        results[name] = run_variant(name, prompt, max_tokens, args.runs)
+
+    print()
+    for name, rows in results.items():
+        summarize(name, variants[name][1], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+================================================================================
+BENCHMARK - PROFILE SIMILARITY INDEX
+================================================================================
+
+Measures the MinHash/LSH index behind near-duplicate roadmap reuse
+(services/similarity_index.py) on a synthetic corpus of user profiles.
+
+WHAT IS MEASURED:
+  - Build time and per-profile insert cost
+  - Lookup latency (p50 / p99 / max) for reworded versions of stored
+    profiles (same tokens) and for versions with one extra skill
+  - Recall: how often the index returns a profile at least as similar as the
+    best one found by a brute-force scan over a sample of the corpus
+
+Profiles are drawn from fixed vocabularies with a seeded RNG, so runs are
+comparable. No database or network access.
+
+USAGE:
+  python benchmarks/similarity_index.py
+  python benchmarks/similarity_index.py --profiles 100000 --queries 2000 --threshold 0.8
+
+================================================================================
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_features.services.similarity_index import (  # noqa: E402
+    SimilarityIndex, jaccard, profile_tokens
+)
+
+SKILLS = [
+    'python', 'django', 'flask', 'fastapi', 'javascript', 'react', 'vue', 'angular', 'svelte', 'node',
+    'express', 'typescript', 'java', 'spring', 'kotlin', 'scala', 'go', 'rust', 'c', 'c++', 'c#',
+    '.net', 'php', 'laravel', 'ruby', 'rails', 'elixir', 'haskell', 'swift', 'objective-c', 'dart',
+    'flutter', 'sql', 'postgresql', 'mysql', 'sqlite', 'mongodb', 'redis', 'kafka', 'rabbitmq',
+    'docker', 'kubernetes', 'terraform', 'ansible', 'aws', 'gcp', 'azure', 'linux', 'bash', 'git',
+    'html', 'css', 'sass', 'tailwind', 'graphql', 'rest', 'grpc', 'pandas', 'numpy', 'scipy',
+    'matplotlib', 'pytorch', 'tensorflow', 'keras', 'scikit-learn', 'spark', 'hadoop', 'airflow',
+    'dbt', 'tableau', 'power-bi', 'excel', 'r', 'matlab', 'figma', 'photoshop', 'blender', 'unity',
+    'unreal', 'opengl', 'arduino', 'raspberry-pi', 'verilog', 'solidity', 'selenium', 'jest',
+    'cypress', 'jenkins', 'github-actions', 'nginx', 'elasticsearch', 'prometheus', 'grafana',
+    'websockets', 'oauth', 'jwt', 'regex', 'algorithms', 'statistics', 'linear-algebra',
+]
+INTERESTS = [
+    'web apps', 'mobile apps', 'data science', 'machine learning', 'devops', 'game development',
+    'cyber security', 'cloud infrastructure', 'embedded systems', 'ui design', 'open source',
+    'fintech', 'healthcare software', 'e-commerce', 'robotics', 'computer vision', 'nlp',
+    'blockchain', 'iot', 'distributed systems', 'compilers', 'databases', 'audio software',
+    'education tools', 'developer tooling', 'automation scripts', 'chat bots', 'ar vr',
+    'scientific computing', 'networking', 'operating systems', 'search engines', 'recommendation systems',
+    'data visualization', 'bioinformatics', 'climate tech', 'music tech', 'sports analytics',
+]
+GOALS = [
+    'backend developer', 'frontend developer', 'data analyst job', 'ml engineer', 'freelancing',
+    'startup founder', 'full-stack developer', '', 'sre role', 'mobile developer', 'internship',
+    'senior engineer', 'tech lead', 'research scientist', 'teaching', 'open source maintainer',
+    'game studio job', 'security analyst', 'cloud architect', 'data engineer', 'side income',
+    'career switch', 'pass interviews', 'build a portfolio', 'contribute to linux', 'phd admission',
+]
+FILLER = ['and', 'dev', 'basics', 'some', 'with']
+
+
+def random_profile(rng):
+    skills = rng.sample(SKILLS, rng.randint(2, 5))
+    return ', '.join(skills), rng.choice(INTERESTS), rng.choice(GOALS)
+
+
+def reword(rng, profile):
+    """Same profile with shuffled skills and filler words, as a user might retype it"""
+    skills = profile[0].split(', ')
+    rng.shuffle(skills)
+    return f" {rng.choice(FILLER)} ".join(skills), profile[1], profile[2]
+
+
+def extend(rng, profile):
+    """Same profile with one extra skill: similar, but not an exact token match"""
+    extra = rng.choice([skill for skill in SKILLS if skill not in profile[0].split(', ')])
+    return f"{profile[0]}, {extra}", profile[1], profile[2]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[3])
+    parser.add_argument('--profiles', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--threshold', type=float, default=0.8)
+    parser.add_argument('--recall-sample', type=int, default=200,
+                        help='queries checked against a brute-force scan')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    profiles = [random_profile(rng) for _ in range(args.profiles)]
+    tokens = [profile_tokens(*profile) for profile in profiles]
+
+    index = SimilarityIndex()
+    started = time.perf_counter()
+    for idx, profile_set in enumerate(tokens):
+        index.add(idx, profile_set)
+    build = time.perf_counter() - started
+    print(f"Indexed {len(index)} profiles in {build:.2f}s ({build / len(index) * 1e6:.1f} us each)")
+
+    for label, variant in (('reworded', reword), ('extra skill', extend)):
+        queries = [profile_tokens(*variant(rng, profiles[rng.randrange(len(profiles))]))
+                   for _ in range(args.queries)]
+        latencies, found = [], 0
+        for query in queries:
+            started = time.perf_counter()
+            match = index.query(query, args.threshold)
+            latencies.append(time.perf_counter() - started)
+            found += match is not None
+
+        print(f"{label:<12} lookups: p50 {percentile(latencies, 50) * 1000:.3f} ms, "
+              f"p99 {percentile(latencies, 99) * 1000:.3f} ms, max {max(latencies) * 1000:.3f} ms, "
+              f"{found}/{len(queries)} matched at >= {args.threshold}")
+
+    hits = 0
+    sample = queries[:args.recall_sample]
+    for query in sample:
+        best = max(jaccard(query, stored) for stored in tokens)
+        match = index.query(query, args.threshold)
+        if best < args.threshold or (match is not None and match[1] >= best):
+            hits += 1
+    print(f"Recall vs brute force: {hits}/{len(sample)}")
+
+
+if __name__ == '__main__':
+    main()